@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Agreement between the local adjective classifier and the LLM's labels.
+
+Compares the fast adjective mode (`services/adjective_lexicon.py`) against a
+labelled corpus of adjective lemmas, by default the LLM labels accumulated
+in the adjective label store (ADJECTIVE_LABEL_STORE_PATH). A JSONL file of
+`{"lemma": ..., "qualitative": true|false}` objects, e.g. hand-labelled, can
+be used instead.
+
+Lemma-level agreement labels every lemma out of context. With --articles,
+the articles of a JSONL file are annotated with Stanza and every adjective
+occurrence with a reference label is compared too, using the context rules
+(degree, intensifiers) of the classifier; this is what the metric counts.
+
+Reports accuracy, Cohen's kappa, precision/recall/F1 of the qualitative
+class and the most frequent disagreements. Exits with status 1 when kappa is
+below --min-kappa.
+
+Usage:
+    python benchmarks/adjective_agreement.py
+    python benchmarks/adjective_agreement.py --labels labels.jsonl --articles articles.jsonl
+"""
+
+import argparse
+import json
+import sqlite3
+import sys
+from collections import Counter
+from typing import Dict, Iterable, List, Tuple
+
+from mediaparty_trust_api.core.config import config
+from mediaparty_trust_api.services.adjective_lexicon import lemma_label, qualitative_mask
+from mediaparty_trust_api.services.adjective_store import AdjectiveLabelStore
+
+# (reference label, predicted label) of every compared item
+Pair = Tuple[bool, bool]
+
+
+def load_labels(path: str) -> Dict[str, bool]:
+    """Read reference labels from a JSONL file or an adjective label store."""
+    if path.endswith(".jsonl"):
+        labels = {}
+        with open(path, "r") as f:
+            for line in f:
+                if line.strip():
+                    item = json.loads(line)
+                    labels[item["lemma"].strip().lower()] = bool(item["qualitative"])
+        return labels
+    try:
+        return AdjectiveLabelStore(path=path).all_labels()
+    except sqlite3.Error as e:
+        sys.exit(f"Could not read labels from {path}: {e}")
+
+
+def agreement(pairs: List[Pair]) -> Dict[str, float]:
+    """Accuracy, Cohen's kappa and qualitative-class precision/recall/F1."""
+    total = len(pairs)
+    counts = Counter(pairs)
+    true_pos, false_pos = counts[(True, True)], counts[(False, True)]
+    false_neg = counts[(True, False)]
+    observed = (true_pos + counts[(False, False)]) / total
+
+    reference_rate = (true_pos + false_neg) / total
+    predicted_rate = (true_pos + false_pos) / total
+    expected = reference_rate * predicted_rate + (1 - reference_rate) * (1 - predicted_rate)
+    kappa = (observed - expected) / (1 - expected) if expected < 1 else 1.0
+
+    precision = true_pos / (true_pos + false_pos) if true_pos + false_pos else 0.0
+    recall = true_pos / (true_pos + false_neg) if true_pos + false_neg else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return {
+        "items": total,
+        "accuracy": observed,
+        "kappa": kappa,
+        "precision": precision,
+        "recall": recall,
+        "f1": f1,
+        "reference_qualitative": reference_rate,
+        "predicted_qualitative": predicted_rate,
+    }
+
+
+def print_report(title: str, pairs: List[Pair], disagreements: Counter, top: int) -> float:
+    """Print the agreement figures of one comparison and return its kappa."""
+    result = agreement(pairs)
+    print(f"\n{title}")
+    print(f"  items:        {result['items']}")
+    print(f"  accuracy:     {result['accuracy']:.1%}")
+    print(f"  kappa:        {result['kappa']:.3f}")
+    print(
+        f"  qualitative:  precision {result['precision']:.1%}, recall {result['recall']:.1%}, "
+        f"F1 {result['f1']:.1%}"
+    )
+    print(
+        f"  share judged qualitative: reference {result['reference_qualitative']:.1%}, "
+        f"classifier {result['predicted_qualitative']:.1%}"
+    )
+    if disagreements:
+        print(f"  most frequent disagreements (lemma: reference -> classifier):")
+        for (lemma, reference), count in disagreements.most_common(top):
+            print(f"    {lemma}: {reference} -> {not reference} ({count}x)")
+    return result["kappa"]
+
+
+def compare_lemmas(labels: Dict[str, bool]) -> Tuple[List[Pair], Counter]:
+    """Compare out-of-context lemma labels; lemmas without evidence count as not qualitative."""
+    pairs, disagreements = [], Counter()
+    for lemma, reference in labels.items():
+        predicted = bool(lemma_label(lemma))
+        pairs.append((reference, predicted))
+        if predicted != reference:
+            disagreements[(lemma, reference)] += 1
+    return pairs, disagreements
+
+
+def compare_occurrences(
+    labels: Dict[str, bool], texts: Iterable[str], args: argparse.Namespace
+) -> Tuple[List[Pair], Counter]:
+    """Compare every labelled adjective occurrence of the annotated texts."""
+    from mediaparty_trust_api.services.stanza_service import StanzaService
+
+    service = StanzaService()
+    processors = "tokenize,mwt,pos,lemma"
+    service.initialize(processors=processors, model_dir=args.model_dir, offline=args.offline)
+    pairs, disagreements = [], Counter()
+    for text in texts:
+        table = service.create_table(text, processors=processors)
+        adjectives = table.upos_mask("ADJ")
+        predicted_labels = qualitative_mask(table)[adjectives].tolist()
+        for lemma, predicted in zip(table.lemmas(adjectives), predicted_labels):
+            if lemma not in labels:
+                continue
+            pairs.append((labels[lemma], predicted))
+            if predicted != labels[lemma]:
+                disagreements[(lemma, labels[lemma])] += 1
+    return pairs, disagreements
+
+
+def read_articles(path: str) -> Iterable[str]:
+    """Yield the analyzed text (title. body) of every article of a JSONL file."""
+    with open(path, "r") as f:
+        for line in f:
+            if line.strip():
+                article = json.loads(line)
+                yield f"{article['title']}. {article['body']}"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Agreement between the local adjective classifier and reference labels"
+    )
+    parser.add_argument("-l", "--labels", default=config.adjective_label_store_path,
+                        help="Adjective label store (SQLite) or JSONL file of reference labels "
+                             f"(default: {config.adjective_label_store_path})")
+    parser.add_argument("-a", "--articles", default=None,
+                        help="JSONL file of articles whose adjective occurrences are compared "
+                             "too (needs the Stanza models)")
+    parser.add_argument("--top", type=int, default=20,
+                        help="Number of disagreements listed (default: 20)")
+    parser.add_argument("--min-kappa", type=float, default=None,
+                        help="Exit with status 1 if a kappa is below this value")
+    parser.add_argument("--model-dir", default=config.stanza_model_dir, help="Stanza model directory")
+    parser.add_argument("--offline", action="store_true", default=config.stanza_offline,
+                        help="Load Stanza models from --model-dir without downloading")
+    args = parser.parse_args()
+
+    if not args.labels:
+        parser.error("--labels is required when ADJECTIVE_LABEL_STORE_PATH is unset")
+    labels = load_labels(args.labels)
+    if not labels:
+        sys.exit(f"No labels found in {args.labels}")
+
+    kappas = [
+        print_report("Lemmas (out of context)", *compare_lemmas(labels), top=args.top)
+    ]
+    if args.articles:
+        pairs, disagreements = compare_occurrences(labels, read_articles(args.articles), args)
+        if pairs:
+            kappas.append(
+                print_report("Adjective occurrences (in context)", pairs, disagreements, args.top)
+            )
+        else:
+            print("\nNo adjective occurrence of the articles has a reference label.")
+
+    if args.min_kappa is not None and min(kappas) < args.min_kappa:
+        print(f"\nAgreement below the minimum kappa of {args.min_kappa}.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Stage-level benchmarks of the analysis pipeline.
+
+Times every stage of an analysis separately over a small corpus of Spanish
+news articles (the examples in test/ plus short and long synthetic
+variants):
+
+- pipeline construction and warm-up (`StanzaService.initialize`)
+- annotation into token tables the way the endpoint does it: through the
+  paragraph cache with the configured chunking, cold (every paragraph
+  annotated) and warm (every paragraph found in memory)
+- every metric function of the analysis, including the LLM path of the
+  adjective metric against a stubbed OpenRouter endpoint (with the LLM
+  batching window disabled, so only the call itself is timed)
+- JSON serialization of the response, with the endpoint's serializer
+
+Results can be saved as a baseline; later runs are compared against it and
+the script exits with status 1 when a stage got slower than the threshold.
+
+Requires the Stanza Spanish models (downloaded on first run unless --offline).
+
+Usage:
+    python benchmarks/bench_stages.py --save-baseline
+    python benchmarks/bench_stages.py --threshold 0.2
+"""
+
+import argparse
+import asyncio
+import inspect
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from functools import partial
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import mediaparty_trust_api.services.metrics as metrics
+from mediaparty_trust_api.api.v1.endpoints import _METRICS_JSON
+from mediaparty_trust_api.core.config import config
+from mediaparty_trust_api.services.adjective_store import AdjectiveLabelStore
+from mediaparty_trust_api.services.analysis import processors_for
+from mediaparty_trust_api.services.annotation_store import AnnotationStore
+from mediaparty_trust_api.services.paragraph_cache import ParagraphCache
+from mediaparty_trust_api.services.registry import select_metrics
+from mediaparty_trust_api.services.stanza_service import StanzaService
+
+from llm_stub import stub_llm
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+
+# Number of copies of the long example article joined into the "long" variant
+LONG_ARTICLE_COPIES = 8
+
+
+def build_corpus() -> Dict[str, str]:
+    """Return the benchmark texts by name, as the API builds them (title. body)."""
+    corpus = {}
+    for name, path in (
+        ("example", ROOT / "test" / "input_example.json"),
+        ("espert", ROOT / "test" / "input_example_espert.json"),
+    ):
+        with open(path, "r") as f:
+            article = json.load(f)
+        corpus[name] = f"{article['title']}. {article['body']}"
+
+    first_sentence = corpus["example"].split(". ")[1]
+    corpus["short"] = f"{corpus['example'].split('. ')[0]}. {first_sentence}."
+    corpus["long"] = "\n\n".join([corpus["espert"]] * LONG_ARTICLE_COPIES)
+    return corpus
+
+
+async def time_call(func: Callable, *args, repeat: int, setup: Callable = None) -> List[float]:
+    """Time a (sync or async) call `repeat` times and return the durations."""
+    samples = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        result = func(*args)
+        if inspect.isawaitable(result):
+            await result
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """Median and worst sample of a stage."""
+    return {"median": statistics.median(samples), "max": max(samples), "runs": len(samples)}
+
+
+def fresh_label_store() -> None:
+    """Start from an empty in-memory label store so every run calls the LLM."""
+    metrics.adjective_label_store = AdjectiveLabelStore(path=None)
+
+
+async def run_benchmarks(args: argparse.Namespace) -> Dict[str, Dict[str, float]]:
+    """Run every stage and return their timings by stage name."""
+    corpus = build_corpus()
+    stages: Dict[str, Dict[str, float]] = {}
+    stub_llm(args.llm_latency)
+    # Send LLM calls right away: the batching window only waits for other
+    # requests' lemmas, and would add its full length to every adjective run
+    metrics.adjective_label_batcher.window_seconds = 0.0
+
+    selected = select_metrics()
+    processors = processors_for(selected)
+    service = StanzaService()
+    service.initialize(processors=processors, model_dir=args.model_dir, offline=args.offline)
+    for phase in ("load", "warm_up"):
+        stages[f"pipeline/{phase}"] = summarize([service.startup_timings[phase]])
+
+    # The endpoint's annotation path: new paragraphs of a text go to the
+    # pipeline in one chunked call, then the paragraph tables are joined.
+    # The stores are disabled, and so is the memory tier of the cold cache,
+    # so cold runs always annotate every paragraph.
+    annotate = partial(
+        service.create_tables,
+        processors=processors,
+        max_chunk_chars=config.annotation_chunk_chars,
+        chunks_in_flight=config.annotation_chunks_in_flight,
+    )
+    max_call_chars = config.annotation_chunk_chars * config.annotation_chunks_in_flight
+    cold_cache = ParagraphCache(AnnotationStore(path=None), max_size=0, max_call_chars=max_call_chars)
+    cache = ParagraphCache(
+        AnnotationStore(path=None),
+        max_size=config.paragraph_cache_size,
+        max_call_chars=max_call_chars,
+    )
+
+    for name, text in corpus.items():
+        print(f"Benchmarking '{name}' ({len(text)} chars)...")
+        stages[f"annotate/{name}"] = summarize(
+            await time_call(cold_cache.create_table, text, processors, annotate, repeat=args.repeat)
+        )
+
+        table = cache.create_table(text, processors, annotate)
+        stages[f"annotate_cached/{name}"] = summarize(
+            await time_call(cache.create_table, text, processors, annotate, repeat=args.repeat)
+        )
+
+        results = []
+        for metric in selected:
+            for func in filter(None, (metric.func, metric.fallback)):
+                setup = fresh_label_store if func is metrics.get_adjective_count else None
+                stages[f"metric/{func.__name__}/{name}"] = summarize(
+                    await time_call(func, table, repeat=args.repeat, setup=setup)
+                )
+            result = metric.func(table, metric_id=metric.metric_id)
+            results.append(await result if inspect.isawaitable(result) else result)
+
+        stages[f"serialize/{name}"] = summarize(
+            await time_call(_METRICS_JSON.dump_json, results, repeat=args.repeat)
+        )
+
+    return stages
+
+
+def compare(
+    stages: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Dict[str, float]],
+    threshold: float,
+    min_delta: float,
+) -> List[str]:
+    """
+    Print current vs baseline medians and return the stages that regressed.
+
+    A stage regresses when its median is more than `threshold` (relative)
+    and more than `min_delta` seconds (absolute, to ignore noise on very
+    fast stages) above its baseline median.
+    """
+    regressions = []
+    print(f"\n{'stage':<55} {'baseline':>10} {'current':>10} {'change':>8}")
+    for name, result in stages.items():
+        current = result["median"]
+        base = baseline.get(name, {}).get("median")
+        if base is None:
+            print(f"{name:<55} {'-':>10} {current:>10.4f} {'new':>8}")
+            continue
+        change = (current - base) / base if base > 0 else 0.0
+        marker = ""
+        if change > threshold and current - base > min_delta:
+            regressions.append(name)
+            marker = "  REGRESSION"
+        print(f"{name:<55} {base:>10.4f} {current:>10.4f} {change:>+8.1%}{marker}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Stage-level benchmarks of the analysis pipeline")
+    parser.add_argument("-n", "--repeat", type=int, default=5,
+                        help="Runs per stage; the median is compared (default: 5)")
+    parser.add_argument("-b", "--baseline", type=Path, default=DEFAULT_BASELINE,
+                        help=f"Baseline file (default: {DEFAULT_BASELINE.relative_to(ROOT)})")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="Write the results as the new baseline instead of comparing")
+    parser.add_argument("-t", "--threshold", type=float, default=0.25,
+                        help="Allowed relative slowdown per stage (default: 0.25)")
+    parser.add_argument("--min-delta", type=float, default=0.001,
+                        help="Ignore slowdowns smaller than this many seconds (default: 0.001)")
+    parser.add_argument("--llm-latency", type=float, default=0.0,
+                        help="Simulated latency of the stubbed LLM endpoint in seconds (default: 0)")
+    parser.add_argument("--model-dir", default=None, help="Stanza model directory")
+    parser.add_argument("--offline", action="store_true",
+                        help="Load Stanza models from --model-dir without downloading")
+    args = parser.parse_args()
+
+    stages = asyncio.run(run_benchmarks(args))
+
+    if args.save_baseline or not args.baseline.exists():
+        with open(args.baseline, "w") as f:
+            json.dump(
+                {
+                    "environment": {
+                        "python": platform.python_version(),
+                        "machine": platform.machine(),
+                        "processor": platform.processor(),
+                        "cpus": os.cpu_count(),
+                    },
+                    "stages": stages,
+                },
+                f,
+                indent=4,
+            )
+        compare(stages, {}, args.threshold, args.min_delta)
+        print(f"\nBaseline saved to {args.baseline}")
+        return
+
+    with open(args.baseline, "r") as f:
+        baseline = json.load(f)["stages"]
+    regressions = compare(stages, baseline, args.threshold, args.min_delta)
+    if regressions:
+        print(f"\n{len(regressions)} stage(s) regressed more than {args.threshold:.0%}:")
+        for name in regressions:
+            print(f"  {name}")
+        sys.exit(1)
+    print("\nNo regressions.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+In-process stand-in for the OpenRouter endpoint, shared by the benchmarks.
+
+Imported by the benchmark scripts, which run with this directory on the
+module path (python benchmarks/<script>.py).
+"""
+
+import asyncio
+import json
+import os
+
+import httpx
+
+import mediaparty_trust_api.services.llm as llm
+from mediaparty_trust_api.services.openrouter import OpenRouterClient
+
+
+def stub_llm(latency_seconds: float) -> None:
+    """
+    Route the API's LLM calls to an in-process stub endpoint.
+
+    The stub labels every adjective of a chat completion as non-qualitative
+    after the given latency, so benchmarks cover prompt formatting, the
+    HTTP client and response parsing without the network.
+
+    Args:
+        latency_seconds: Simulated latency of every call
+    """
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if latency_seconds:
+            await asyncio.sleep(latency_seconds)
+        prompt = json.loads(request.content)["messages"][-1]["content"]
+        lemmas = prompt.split("[[ ## adjectives ## ]]\n", 1)[1].split("\n\n", 1)[0].split(", ")
+        content = (
+            "[[ ## reasoning ## ]]\nStub answer.\n\n"
+            f"[[ ## labels ## ]]\n{json.dumps({lemma: False for lemma in lemmas})}\n\n"
+            "[[ ## completed ## ]]"
+        )
+        return httpx.Response(200, json={"choices": [{"message": {"content": content}}]})
+
+    os.environ.setdefault("OPENROUTER_API_KEY", "benchmark-stub")
+    llm.openrouter_client = OpenRouterClient(
+        base_url="http://llm-stub", transport=httpx.MockTransport(handler)
+    )
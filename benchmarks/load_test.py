@@ -0,0 +1,450 @@
+#!/usr/bin/env python3
+"""
+End-to-end load generator for the analysis endpoint.
+
+Replays a corpus of articles against POST /api/v1/articles/analyze, either
+with a fixed number of concurrent clients (--concurrency, closed loop) or
+at a target request rate (--rate, open loop: requests are sent on schedule
+whether or not earlier ones have finished). The corpus is the article
+examples in test/ plus synthetic articles assembled from their sentences.
+
+Reports throughput, latency percentiles, the status code breakdown, error
+and rejection (429/503) rates, and the server-side stage timings read from
+the Server-Timing header of every response.
+
+With --in-process the API runs inside this process (through httpx's ASGI
+transport) with the OpenRouter endpoint stubbed, so the whole stack can be
+load-tested on a box without network access (the Stanza models must then
+be available locally, see --model-dir/--offline). Client and server share
+one event loop in this mode, so absolute latencies are pessimistic.
+
+Usage:
+    python benchmarks/load_test.py --url http://localhost:8000 --concurrency 8 --requests 200
+    python benchmarks/load_test.py --url http://localhost:8000 --rate 20 --duration 60
+    python benchmarks/load_test.py --in-process --offline --model-dir /models/stanza --concurrency 4
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import math
+import random
+import re
+import statistics
+import sys
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+import httpx
+
+ROOT = Path(__file__).resolve().parent.parent
+ANALYZE_PATH = "/api/v1/articles/analyze"
+
+# Statuses counted as rejections by an overloaded server
+REJECTION_STATUSES = (429, 503)
+
+_SENTENCE_BREAK = re.compile(r"(?<=[.!?])\s+")
+_SERVER_TIMING_ENTRY = re.compile(r"\s*([^;,\s]+)\s*;\s*dur=([0-9.]+)")
+
+
+class Sample:
+    """Outcome of one request."""
+
+    __slots__ = ("status", "latency", "stages", "error")
+
+    def __init__(
+        self,
+        status: Optional[int],
+        latency: float,
+        stages: Optional[Dict[str, float]] = None,
+        error: Optional[str] = None,
+    ):
+        self.status = status
+        self.latency = latency
+        self.stages = stages or {}
+        self.error = error
+
+
+def load_examples() -> List[dict]:
+    """Read the article examples in test/ (files holding a non-empty article)."""
+    articles = []
+    for path in sorted((ROOT / "test").glob("*.json")):
+        with open(path, "r") as f:
+            data = json.load(f)
+        if isinstance(data, dict) and data.get("title") and data.get("body"):
+            articles.append(data)
+    return articles
+
+
+def generate_articles(examples: List[dict], count: int, seed: int) -> List[dict]:
+    """
+    Assemble synthetic articles from the sentences of the examples.
+
+    Articles get 1 to 12 paragraphs of 1 to 6 sentences each, so the corpus
+    covers short notes as well as long pieces.
+    """
+    rng = random.Random(seed)
+    sentences = [
+        sentence
+        for article in examples
+        for sentence in _SENTENCE_BREAK.split(article["body"])
+        if len(sentence.split()) > 3
+    ]
+    if not sentences:
+        return []
+    articles = []
+    for index in range(count):
+        paragraphs = [
+            " ".join(rng.choices(sentences, k=rng.randint(1, 6)))
+            for _ in range(rng.randint(1, 12))
+        ]
+        articles.append(
+            {
+                "title": f"Artículo generado {index}: {rng.choice(sentences)[:80]}",
+                "body": "\n\n".join(paragraphs),
+                "author": "Generador de carga",
+                "link": f"https://example.com/load-test/{index}",
+                "date": "2024-01-01",
+                "media_type": "article",
+            }
+        )
+    return articles
+
+
+def parse_server_timing(header: Optional[str]) -> Dict[str, float]:
+    """Stage durations (in seconds) from a Server-Timing header, summed by stage."""
+    stages: Dict[str, float] = defaultdict(float)
+    for name, duration in _SERVER_TIMING_ENTRY.findall(header or ""):
+        stages[name] += float(duration) / 1000
+    return dict(stages)
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+@contextlib.asynccontextmanager
+async def in_process_client(args: argparse.Namespace) -> AsyncIterator[httpx.AsyncClient]:
+    """Start the API in this process and yield a client bound to it."""
+    import mediaparty_trust_api.services.metrics as metrics
+    from mediaparty_trust_api.core.config import config
+    from mediaparty_trust_api.main import app
+    from mediaparty_trust_api.services.adjective_store import AdjectiveLabelStore
+
+    from llm_stub import stub_llm
+
+    config.stanza_model_dir = args.model_dir or config.stanza_model_dir
+    config.stanza_offline = args.offline or config.stanza_offline
+    stub_llm(args.llm_latency)
+    # Labels stay in memory, so every run starts cold and leaves no file behind
+    metrics.adjective_label_store = AdjectiveLabelStore(path=None)
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://api", timeout=args.timeout
+        ) as client:
+            await wait_until_ready(client, args.ready_timeout)
+            yield client
+
+
+async def wait_until_ready(client: httpx.AsyncClient, timeout: float) -> None:
+    """Poll /ready until the API has loaded its models."""
+    deadline = time.perf_counter() + timeout
+    while True:
+        try:
+            response = await client.get("/ready")
+            if response.status_code == 200:
+                return
+            if response.json().get("status") == "failed":
+                sys.exit(f"API failed to start: {response.json().get('error')}")
+        except httpx.TransportError:
+            pass
+        if time.perf_counter() > deadline:
+            sys.exit(f"API not ready after {timeout:.0f}s")
+        await asyncio.sleep(0.5)
+
+
+async def send(
+    client: httpx.AsyncClient, article: dict, params: Dict[str, str]
+) -> Sample:
+    """Send one analysis request and record its outcome."""
+    started = time.perf_counter()
+    try:
+        response = await client.post(ANALYZE_PATH, json=article, params=params)
+    except httpx.HTTPError as e:
+        return Sample(None, time.perf_counter() - started, error=type(e).__name__)
+    return Sample(
+        response.status_code,
+        time.perf_counter() - started,
+        parse_server_timing(response.headers.get("server-timing")),
+    )
+
+
+class Workload:
+    """Hands out the articles to send, cycling through the corpus."""
+
+    def __init__(self, corpus: List[dict], fresh: bool, total: Optional[int], deadline: float):
+        self.corpus = corpus
+        self.fresh = fresh
+        self.total = total
+        self.deadline = deadline
+        self.sent = 0
+
+    def next(self) -> Optional[dict]:
+        """The next article, or None once the request count or duration is reached."""
+        if self.total is not None and self.sent >= self.total:
+            return None
+        if time.perf_counter() >= self.deadline:
+            return None
+        article = self.corpus[self.sent % len(self.corpus)]
+        if self.fresh:
+            # A unique closing sentence defeats the result cache
+            article = {**article, "body": f"{article['body']}\n\nSolicitud número {self.sent}."}
+        self.sent += 1
+        return article
+
+
+async def run_closed_loop(
+    client: httpx.AsyncClient, workload: Workload, params: Dict[str, str], concurrency: int
+) -> List[Sample]:
+    """Keep `concurrency` requests in flight until the workload is exhausted."""
+    samples: List[Sample] = []
+
+    async def worker() -> None:
+        while (article := workload.next()) is not None:
+            samples.append(await send(client, article, params))
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return samples
+
+
+async def run_open_loop(
+    client: httpx.AsyncClient,
+    workload: Workload,
+    params: Dict[str, str],
+    rate: float,
+    poisson: bool,
+    max_in_flight: int,
+) -> Tuple[List[Sample], int]:
+    """
+    Send requests at a target rate regardless of response times.
+
+    Returns the samples and the number of requests skipped because
+    max_in_flight requests were already waiting (the server fell behind).
+    """
+    samples: List[Sample] = []
+    tasks = set()
+    skipped = 0
+    rng = random.Random(0)
+    next_send = time.perf_counter()
+
+    async def request(article: dict) -> None:
+        samples.append(await send(client, article, params))
+
+    while (article := workload.next()) is not None:
+        delay = next_send - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if len(tasks) >= max_in_flight:
+            skipped += 1
+        else:
+            task = asyncio.ensure_future(request(article))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        next_send += rng.expovariate(rate) if poisson else 1 / rate
+
+    if tasks:
+        await asyncio.gather(*tasks)
+    return samples, skipped
+
+
+def summarize(samples: List[Sample], elapsed: float, skipped: int) -> Dict[str, object]:
+    """Aggregate the samples of a run into a report."""
+    statuses = Counter(
+        str(sample.status) if sample.status is not None else sample.error for sample in samples
+    )
+    succeeded = [sample for sample in samples if sample.status is not None and sample.status < 400]
+    rejected = sum(1 for sample in samples if sample.status in REJECTION_STATUSES)
+    latencies = [sample.latency for sample in succeeded]
+    total = len(samples)
+
+    stage_values: Dict[str, List[float]] = defaultdict(list)
+    for sample in succeeded:
+        for name, seconds in sample.stages.items():
+            stage_values[name].append(seconds)
+
+    return {
+        "requests": total,
+        "skipped": skipped,
+        "elapsed_seconds": elapsed,
+        "throughput_rps": len(succeeded) / elapsed if elapsed > 0 else 0.0,
+        "statuses": dict(statuses),
+        "error_rate": (total - len(succeeded)) / total if total else 0.0,
+        "rejection_rate": rejected / total if total else 0.0,
+        "rate_429": statuses.get("429", 0) / total if total else 0.0,
+        "latency_seconds": {
+            "mean": statistics.fmean(latencies),
+            "p50": percentile(latencies, 0.50),
+            "p90": percentile(latencies, 0.90),
+            "p95": percentile(latencies, 0.95),
+            "p99": percentile(latencies, 0.99),
+            "max": max(latencies),
+        }
+        if latencies
+        else {},
+        "server_stages_seconds": {
+            name: {
+                "requests": len(values),
+                "mean": statistics.fmean(values),
+                "p50": percentile(values, 0.50),
+                "p95": percentile(values, 0.95),
+            }
+            for name, values in sorted(stage_values.items())
+        },
+    }
+
+
+def print_report(report: Dict[str, object]) -> None:
+    """Print a run report in a readable form."""
+    print(
+        f"\nRequests:   {report['requests']} in {report['elapsed_seconds']:.1f}s "
+        f"({report['throughput_rps']:.2f} successful req/s)"
+    )
+    if report["skipped"]:
+        print(f"Skipped:    {report['skipped']} (too many requests already in flight)")
+    statuses = ", ".join(f"{status}: {count}" for status, count in sorted(report["statuses"].items()))
+    print(f"Statuses:   {statuses}")
+    print(
+        f"Errors:     {report['error_rate']:.1%} "
+        f"(rejected 429/503: {report['rejection_rate']:.1%}, 429: {report['rate_429']:.1%})"
+    )
+    latency = report["latency_seconds"]
+    if latency:
+        print(
+            "Latency:    "
+            + "  ".join(f"{name} {latency[name] * 1000:.0f}ms" for name in ("mean", "p50", "p90", "p95", "p99", "max"))
+        )
+    stages = report["server_stages_seconds"]
+    if stages:
+        print("\nServer stages (ms, successful requests reporting them):")
+        print(f"  {'stage':<32} {'requests':>8} {'mean':>9} {'p50':>9} {'p95':>9}")
+        for name, values in stages.items():
+            print(
+                f"  {name:<32} {values['requests']:>8} {values['mean'] * 1000:>9.1f} "
+                f"{values['p50'] * 1000:>9.1f} {values['p95'] * 1000:>9.1f}"
+            )
+
+
+async def run(args: argparse.Namespace) -> Dict[str, object]:
+    """Build the corpus, run the load and return the report."""
+    examples = load_examples()
+    corpus = examples + generate_articles(examples, args.generated, args.seed)
+    if not corpus:
+        sys.exit("No articles found in test/")
+    params = {}
+    if args.metrics:
+        params["metrics"] = args.metrics
+    if args.adjective_mode:
+        params["adjective_mode"] = args.adjective_mode
+
+    if args.in_process:
+        client_context = in_process_client(args)
+    else:
+        client_context = httpx.AsyncClient(
+            base_url=args.url,
+            timeout=args.timeout,
+            limits=httpx.Limits(max_connections=None, max_keepalive_connections=None),
+        )
+
+    async with client_context as client:
+        mode = f"{args.rate} req/s" if args.rate else f"concurrency {args.concurrency}"
+        print(
+            f"Sending {'up to ' + str(args.requests) if args.requests else 'requests'} "
+            f"for up to {args.duration:.0f}s ({mode}) to "
+            f"{'the in-process API' if args.in_process else args.url}, "
+            f"corpus of {len(corpus)} articles",
+            file=sys.stderr,
+        )
+        workload = Workload(
+            corpus, args.fresh, args.requests, time.perf_counter() + args.duration
+        )
+        started = time.perf_counter()
+        skipped = 0
+        if args.rate:
+            samples, skipped = await run_open_loop(
+                client, workload, params, args.rate, args.poisson, args.max_in_flight
+            )
+        else:
+            samples = await run_closed_loop(client, workload, params, args.concurrency)
+        elapsed = time.perf_counter() - started
+
+    return summarize(samples, elapsed, skipped)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="End-to-end load generator for the analysis endpoint")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("-u", "--url", default="http://localhost:8000",
+                        help="Base URL of a running API (default: http://localhost:8000)")
+    target.add_argument("--in-process", action="store_true",
+                        help="Run the API inside this process with a stubbed LLM (no network)")
+    load = parser.add_mutually_exclusive_group()
+    load.add_argument("-c", "--concurrency", type=int, default=4,
+                      help="Concurrent clients sending back-to-back requests (default: 4)")
+    load.add_argument("-r", "--rate", type=float, default=None,
+                      help="Target request rate in requests/s, regardless of response times")
+    parser.add_argument("-n", "--requests", type=int, default=None,
+                        help="Number of requests to send (default: until --duration)")
+    parser.add_argument("-d", "--duration", type=float, default=30.0,
+                        help="Maximum duration of the run in seconds (default: 30)")
+    parser.add_argument("--poisson", action="store_true",
+                        help="With --rate, space requests randomly (Poisson arrivals) instead of evenly")
+    parser.add_argument("--max-in-flight", type=int, default=1000,
+                        help="With --rate, requests skipped while this many are in flight (default: 1000)")
+    parser.add_argument("-g", "--generated", type=int, default=50,
+                        help="Synthetic articles added to the test/ examples (default: 50)")
+    parser.add_argument("--fresh", action="store_true",
+                        help="Make every request's article unique, so the result cache never answers")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the synthetic articles (default: 0)")
+    parser.add_argument("-m", "--metrics", default=None,
+                        help="Value of the metrics query parameter (default: all metrics)")
+    parser.add_argument("--adjective-mode", choices=["fast", "llm", "raw"], default=None,
+                        help="Value of the adjective_mode query parameter")
+    parser.add_argument("--timeout", type=float, default=60.0,
+                        help="Timeout of every request in seconds (default: 60)")
+    parser.add_argument("--llm-latency", type=float, default=0.5,
+                        help="With --in-process, latency of the stubbed LLM in seconds (default: 0.5)")
+    parser.add_argument("--ready-timeout", type=float, default=600.0,
+                        help="With --in-process, time allowed for the models to load (default: 600)")
+    parser.add_argument("--model-dir", default=None, help="With --in-process, Stanza model directory")
+    parser.add_argument("--offline", action="store_true",
+                        help="With --in-process, load Stanza models from --model-dir without downloading")
+    parser.add_argument("-o", "--output", default=None, help="Also write the report to this JSON file")
+    parser.add_argument("--max-error-rate", type=float, default=None,
+                        help="Exit with status 1 if the error rate is above this fraction")
+    args = parser.parse_args()
+
+    if args.requests is not None and args.requests <= 0:
+        parser.error("--requests must be positive")
+    if args.rate is not None and args.rate <= 0:
+        parser.error("--rate must be positive")
+
+    report = asyncio.run(run(args))
+    print_report(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=4)
+        print(f"\nReport saved to {args.output}")
+    if args.max_error_rate is not None and report["error_rate"] > args.max_error_rate:
+        print(f"\nError rate above the maximum of {args.max_error_rate:.1%}.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
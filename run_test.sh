@@ -1,2 +1,2 @@
-uv run python test_api.py --input test/input_example.json
-#python test_api.py --input test/input_example_espert.json
+uv run python benchmarks/load_test.py --url http://localhost:8000 --concurrency 4 --requests 100
+#uv run python benchmarks/load_test.py --in-process --adjective-mode llm --rate 5 --duration 60
@@ -1,2 +1,6 @@
 def main() -> None:
-    print("Hello from mediaparty-trust-api!")
+    """Run the bulk analysis command line (see mediaparty_trust_api.cli)."""
+    # Imported here so that importing the package stays cheap
+    from mediaparty_trust_api.cli import main as cli_main
+
+    cli_main()
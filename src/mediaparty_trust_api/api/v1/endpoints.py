@@ -1,63 +1,578 @@
 """Article analysis endpoints."""
 
-from typing import List
+import asyncio
+import json
+import logging
+from functools import partial
+from typing import AsyncIterator, Dict, List, Optional, Union
 
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Header, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
 
-from mediaparty_trust_api.models import ArticleInput, Metric
+from mediaparty_trust_api.core.config import config
+from mediaparty_trust_api.models import ArticleInput, BatchItemResult, Metric
+from mediaparty_trust_api.services.admission import (
+    AdmissionRejectedError,
+    ArticleTooLargeError,
+    admission_controller,
+)
+from mediaparty_trust_api.services.analysis import compute_metrics, iter_metrics, processors_for
+from mediaparty_trust_api.services.cache import (
+    article_cache_key,
+    etag_cache_key,
+    result_cache,
+    result_etag,
+)
+from mediaparty_trust_api.services.executor import ExecutorBusyError, nlp_executor
 from mediaparty_trust_api.services.metrics import (
-    get_adjective_count,
-    get_sentence_complexity,
-    get_verb_tense_analysis,
-    get_word_count,
+    AdjectiveMode,
+    adjective_mode_scope,
+    current_adjective_mode,
+    effective_adjective_mode,
 )
+from mediaparty_trust_api.services.paragraph_cache import paragraph_cache
+from mediaparty_trust_api.services.registry import METRIC_REGISTRY, MetricSpec, select_metrics
+from mediaparty_trust_api.services.single_flight import analysis_flight
 from mediaparty_trust_api.services.stanza_service import stanza_service
+from mediaparty_trust_api.services.telemetry import telemetry
+from mediaparty_trust_api.services.token_table import TokenTable
 
 router = APIRouter()
 
+# Configure logger
+logger = logging.getLogger(__name__)
+
+# Chunking of long articles during annotation
+_CHUNKING_OPTIONS = {
+    "max_chunk_chars": config.annotation_chunk_chars,
+    "chunks_in_flight": config.annotation_chunks_in_flight,
+}
+
+# Query parameter selecting the metrics to compute
+_METRICS_QUERY = Query(
+    None,
+    description=(
+        "Comma-separated metric names and/or cost classes (cheap, nlp, llm) to "
+        "compute, e.g. `word_count,verb_tense` or `cheap`. Every metric when "
+        "omitted. See GET /api/v1/articles/metrics."
+    ),
+)
+
+# Query parameter overriding the deployment's adjective mode
+_ADJECTIVE_MODE_QUERY = Query(
+    None,
+    description=(
+        "How qualitative adjectives are judged: `llm` (OpenRouter labels), `fast` "
+        "(local lexicon, no network call) or `raw` (every adjective counts). "
+        "ADJECTIVE_MODE when omitted."
+    ),
+)
+
+# Media type of the streaming endpoint: one JSON document per line
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# Serializers writing responses straight to JSON bytes (pydantic-core),
+# instead of FastAPI's validation and jsonable_encoder pass
+_METRICS_JSON = TypeAdapter(List[Metric])
+_BATCH_JSON = TypeAdapter(List[BatchItemResult])
+
+# A result never changes for a given ETag: clients may keep it, but must
+# revalidate it (a cheap If-None-Match request) before reusing it
+_CACHE_CONTROL = "private, no-cache"
+
+# Documentation of the conditional responses
+_NOT_MODIFIED_RESPONSE = {304: {"description": "The result held by the client (If-None-Match) is current"}}
+
+
+def _article_text(article: ArticleInput) -> str:
+    """Combine title and body for full text analysis."""
+    return f"{article.title}. {article.body}"
+
+
+def _run_pipeline_batch(texts: List[str], processors: str) -> List[Union[TokenTable, Exception]]:
+    """Annotate texts in one pipeline call, retrying one by one if it fails."""
+    try:
+        return stanza_service.create_tables(texts, processors=processors, **_CHUNKING_OPTIONS)
+    except Exception:
+        # Retry one by one so a single bad article only fails its own item
+        tables = []
+        for text in texts:
+            try:
+                tables.append(
+                    stanza_service.create_table(
+                        text, processors=processors, **_CHUNKING_OPTIONS
+                    )
+                )
+            except Exception as e:
+                tables.append(e)
+        return tables
+
 
-@router.post("/analyze", status_code=status.HTTP_200_OK, response_model=List[Metric])
-async def analyze_article(article: ArticleInput) -> List[Metric]:
+async def _annotate_texts(texts: List[str], processors: str) -> List[Union[TokenTable, Exception]]:
+    """
+    Annotate texts and extract their token tables, once the memory budget admits them.
+
+    Only paragraphs missing from the paragraph cache are annotated. With
+    batching, every new paragraph joins the batcher on its own and waits
+    for its batch on the event loop rather than on an executor thread, so
+    the new paragraphs of all concurrent requests share pipeline calls.
+    Cache lookups and the final join run on the NLP executor. Without
+    batching, the new paragraphs are annotated on the executor. Failures
+    are returned in place of the table of the text that caused them
+    instead of being raised.
+    """
+    # The whole articles are recorded, however few of their paragraphs are new
+    for text in texts:
+        telemetry.observe_text_length(len(text))
+    cost = sum(admission_controller.estimate(text) for text in texts)
+    async with admission_controller.admit(cost):
+        if not stanza_service.is_batching:
+            return await nlp_executor.run(
+                paragraph_cache.create_tables,
+                texts,
+                processors,
+                partial(_run_pipeline_batch, processors=processors),
+            )
+        lookup = await nlp_executor.run(paragraph_cache.lookup, texts, processors)
+        paragraphs = list(lookup.missing.values())
+        annotated = await stanza_service.create_tables_batched(
+            paragraphs, processors=processors, **_CHUNKING_OPTIONS
+        )
+        return await nlp_executor.run(paragraph_cache.complete, lookup, processors, annotated)
+
+
+async def _annotate_text(text: str, processors: str) -> TokenTable:
+    """Annotate one article (see _annotate_texts()), raising the failure of any of its paragraphs."""
+    table = (await _annotate_texts([text], processors))[0]
+    if isinstance(table, Exception):
+        raise table
+    return table
+
+
+async def _compute_metrics_or_error(
+    table: Union[TokenTable, Exception], selected: List[MetricSpec]
+) -> Union[List[Metric], Exception]:
+    """Calculate metrics for one batch item, returning failures instead of raising."""
+    if isinstance(table, Exception):
+        return table
+    try:
+        return await compute_metrics(table, selected)
+    except Exception as e:
+        return e
+
+
+async def _analyze_uncached(
+    article: ArticleInput,
+    selected: List[MetricSpec],
+    cache_key: str,
+    adjective_mode: Optional[AdjectiveMode],
+) -> List[Metric]:
+    """Annotate an article, calculate its metrics and cache them unless degraded."""
+    # Check if Stanza is initialized
+    _ensure_stanza_initialized()
+
+    # Annotate off the event loop with only the processors the selected
+    # metrics need, then calculate metrics (the LLM call is async)
+    table = await _annotate_text(_article_text(article), processors_for(selected))
+    with adjective_mode_scope(adjective_mode):
+        results = await compute_metrics(table, selected)
+
+    # Degraded results are not cached, so the next request gets the full analysis
+    if not any(metric.degraded for metric in results):
+        await result_cache.aset(cache_key, results)
+    return results
+
+
+def _select_metrics(selection: Optional[str]) -> List[MetricSpec]:
+    """Resolve the `metrics` query parameter, rejecting unknown names with a 422 error."""
+    try:
+        return select_metrics(selection)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
+def _cache_key(
+    article: ArticleInput, selected: List[MetricSpec], adjective_mode: Optional[AdjectiveMode]
+) -> str:
+    """Cache key of an article analyzed with some metric selection and adjective mode."""
+    # Keyed by the mode actually used, so lexicon results computed for llm
+    # mode without an API key are never served as LLM results
+    mode = effective_adjective_mode(adjective_mode or current_adjective_mode())
+    return article_cache_key(
+        article, [spec.name for spec in selected], {"adjective_mode": mode.value}
+    )
+
+
+def _check_article_size(article: ArticleInput) -> None:
+    """Reject articles above the per-article size cap with a 413 error."""
+    try:
+        admission_controller.check_size(_article_text(article))
+    except ArticleTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
+
+def _admission_rejected(error: AdmissionRejectedError) -> HTTPException:
+    """Build the rejection returned when the annotation memory budget stays exhausted."""
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Server is at its memory limit analyzing other articles. Please retry later.",
+        headers={"Retry-After": str(error.retry_after_seconds)},
+    )
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header lists an entity tag (weak comparison)."""
+    if not if_none_match:
+        return False
+    key = etag_cache_key(etag)
+    return any(etag_cache_key(tag) == key for tag in if_none_match.split(","))
+
+
+def _not_modified(etag: str) -> Response:
+    """Build the 304 response telling the client its copy of a result is current."""
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": _CACHE_CONTROL},
+    )
+
+
+def _metrics_response(metrics: List[Metric], etag: str) -> Response:
+    """Build the JSON response of a metric list, with its ETag unless degraded."""
+    if any(metric.degraded for metric in metrics):
+        # The full result will differ, so it must not be reused
+        headers = {"Cache-Control": "no-store"}
+    else:
+        headers = {"ETag": etag, "Cache-Control": _CACHE_CONTROL}
+    return Response(
+        content=_METRICS_JSON.dump_json(metrics), media_type="application/json", headers=headers
+    )
+
+
+def _batch_response(results: List[BatchItemResult]) -> Response:
+    """Build the JSON response of a batch analysis."""
+    return Response(content=_BATCH_JSON.dump_json(results), media_type="application/json")
+
+
+def _executor_busy(error: ExecutorBusyError) -> HTTPException:
+    """Build the fast rejection returned when the NLP executor is saturated."""
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Server is busy analyzing other articles. Please retry later.",
+        headers={"Retry-After": str(error.retry_after_seconds)},
+    )
+
+
+def _ensure_stanza_initialized() -> None:
+    """Raise a 503 error while the NLP service is not ready."""
+    if not stanza_service.is_ready:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="NLP service not initialized. Please try again later.",
+        )
+
+
+@router.get("/metrics")
+async def list_metrics() -> List[Dict[str, object]]:
+    """
+    List the metrics that can be requested with the `metrics` parameter.
+
+    Returns:
+        Id, name, cost class and annotation layers of every registered metric
+    """
+    return [
+        {
+            "id": spec.metric_id,
+            "name": spec.name,
+            "cost": spec.cost.value,
+            "layers": list(spec.layers),
+        }
+        for spec in sorted(METRIC_REGISTRY.values(), key=lambda spec: spec.metric_id)
+    ]
+
+
+@router.get(
+    "/results/{etag}",
+    status_code=status.HTTP_200_OK,
+    response_model=List[Metric],
+    responses=_NOT_MODIFIED_RESPONSE,
+)
+async def check_result(
+    etag: str,
+    if_none_match: Optional[str] = Header(None),
+) -> Response:
+    """
+    Check or fetch an analysis result by its ETag, without sending the article.
+
+    A client holding a result sends its ETag (with or without quotes), and
+    gets a 304 if the result is still current, i.e. if it was computed by
+    the current metric set version. Without If-None-Match, the result is
+    returned if the server still has it cached. Nothing is annotated: a 404
+    means the article must be sent to /analyze again.
+
+    Args:
+        etag: ETag of an /analyze response
+        if_none_match: If-None-Match header
+
+    Returns:
+        304 response, or the cached list of Metric objects
+    """
+    key = etag_cache_key(etag)
+    if key is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Unknown or outdated result. Please analyze the article again.",
+        )
+    current = result_etag(key)
+    if _etag_matches(if_none_match, current):
+        return _not_modified(current)
+    cached_metrics = await result_cache.aget(key)
+    if cached_metrics is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Result not cached. Please analyze the article again.",
+        )
+    return _metrics_response(cached_metrics, current)
+
+
+@router.post(
+    "/analyze",
+    status_code=status.HTTP_200_OK,
+    response_model=List[Metric],
+    responses=_NOT_MODIFIED_RESPONSE,
+)
+async def analyze_article(
+    article: ArticleInput,
+    metrics: Optional[str] = _METRICS_QUERY,
+    adjective_mode: Optional[AdjectiveMode] = _ADJECTIVE_MODE_QUERY,
+    if_none_match: Optional[str] = Header(None),
+) -> Response:
     """
     Analyze an article for trust and credibility.
 
     This endpoint receives article data and returns analysis results as a list of metrics.
+    Results are cached by article content, so repeated requests for the same
+    article skip the NLP pipeline and the metric calculations. Identical
+    articles arriving while one is being analyzed wait for that analysis
+    instead of starting their own. Metrics run concurrently under a latency
+    budget; a metric that misses it comes back in its degraded form, with
+    `degraded` set.
+
+    The `metrics` parameter restricts the analysis to some metrics; Stanza
+    processors and LLM calls that no selected metric needs are skipped. The
+    `adjective_mode` parameter picks how qualitative adjectives are judged.
+
+    Articles longer than MAX_ARTICLE_CHARS are rejected with a 413 error.
+    Annotation waits while the memory budget is used by other requests, and
+    is rejected with a 503 error if it stays exhausted.
+
+    Non-degraded responses carry a strong ETag derived from the article
+    content, the metric selection and options and the metric set version.
+    A request whose If-None-Match lists it gets a 304 as soon as the
+    article is hashed, without annotation or a cache lookup.
 
     Args:
         article: ArticleInput model containing article details
+        metrics: Comma-separated metric names and/or cost classes (all when None)
+        adjective_mode: Adjective mode (the deployment default when None)
+        if_none_match: If-None-Match header
 
     Returns:
         List of Metric objects with analysis results for different criteria
     """
+    selected = _select_metrics(metrics)
+    _check_article_size(article)
     try:
-        # Check if Stanza is initialized
-        if not stanza_service.is_initialized:
-            raise HTTPException(
-                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                detail="NLP service not initialized. Please try again later.",
-            )
-
-        # Combine title and body for full text analysis
-        full_text = f"{article.title}. {article.body}"
+        cache_key = _cache_key(article, selected, adjective_mode)
+        etag = result_etag(cache_key)
+        if _etag_matches(if_none_match, etag):
+            return _not_modified(etag)
 
-        # Create Stanza document
-        doc = stanza_service.create_doc(full_text)
+        # Serve repeated articles straight from the result cache
+        cached_metrics = await result_cache.aget(cache_key)
+        if cached_metrics is not None:
+            return _metrics_response(cached_metrics, etag)
 
-        # Calculate metrics using Stanza analysis
-        metrics = [
-            get_adjective_count(doc, metric_id=0),
-            get_word_count(doc, metric_id=1),
-            get_sentence_complexity(doc, metric_id=2),
-            get_verb_tense_analysis(doc, metric_id=3),
-        ]
-
-        return metrics
+        # Share one computation between concurrent requests for the same article
+        results = await analysis_flight.do(
+            cache_key, lambda: _analyze_uncached(article, selected, cache_key, adjective_mode)
+        )
+        return _metrics_response(results, etag)
 
     except HTTPException:
         # Re-raise HTTPException as-is
         raise
+    except ExecutorBusyError as e:
+        raise _executor_busy(e)
+    except AdmissionRejectedError as e:
+        raise _admission_rejected(e)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error processing article: {str(e)}",
+        )
+
+
+async def _stream_metrics(
+    table: TokenTable,
+    selected: List[MetricSpec],
+    cache_key: str,
+    adjective_mode: Optional[AdjectiveMode],
+) -> AsyncIterator[str]:
+    """Serialize metrics as NDJSON lines as they complete, caching the full result."""
+    results: List[Metric] = []
+    try:
+        with adjective_mode_scope(adjective_mode):
+            async for metric in iter_metrics(table, selected):
+                results.append(metric)
+                yield metric.model_dump_json() + "\n"
+    except Exception as e:
+        # The status code is already sent; report the failure in-band
+        logger.error(f"Error streaming metrics: {e}")
+        yield json.dumps({"error": f"Error processing article: {str(e)}"}) + "\n"
+        return
+
+    if not any(metric.degraded for metric in results):
+        await result_cache.aset(cache_key, sorted(results, key=lambda metric: metric.id))
+
+
+@router.post(
+    "/analyze/stream",
+    status_code=status.HTTP_200_OK,
+    response_class=StreamingResponse,
+    responses={200: {"content": {NDJSON_MEDIA_TYPE: {}}}},
+)
+async def analyze_article_stream(
+    article: ArticleInput,
+    metrics: Optional[str] = _METRICS_QUERY,
+    adjective_mode: Optional[AdjectiveMode] = _ADJECTIVE_MODE_QUERY,
+) -> StreamingResponse:
+    """
+    Analyze an article, streaming each metric as soon as it is computed.
+
+    The response is NDJSON: one Metric object per line, in completion
+    order. The metrics that only need the Stanza annotation arrive first;
+    the LLM-backed ones follow when they finish or when the latency budget
+    runs out. If a metric fails after the response has started, a final
+    `{"error": ...}` line is sent instead of an HTTP error.
+
+    Args:
+        article: ArticleInput model containing article details
+        metrics: Comma-separated metric names and/or cost classes (all when None)
+        adjective_mode: Adjective mode (the deployment default when None)
+
+    Returns:
+        Streaming NDJSON response of Metric objects
+    """
+    selected = _select_metrics(metrics)
+    _check_article_size(article)
+    cache_key = _cache_key(article, selected, adjective_mode)
+    cached_metrics = await result_cache.aget(cache_key)
+    if cached_metrics is not None:
+        lines = [metric.model_dump_json() + "\n" for metric in cached_metrics]
+        return StreamingResponse(iter(lines), media_type=NDJSON_MEDIA_TYPE)
+
+    _ensure_stanza_initialized()
+
+    # Annotate before the response starts, so failures still get a status code
+    try:
+        table = await _annotate_text(_article_text(article), processors_for(selected))
+    except ExecutorBusyError as e:
+        raise _executor_busy(e)
+    except AdmissionRejectedError as e:
+        raise _admission_rejected(e)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error processing article: {str(e)}",
         )
+
+    return StreamingResponse(
+        _stream_metrics(table, selected, cache_key, adjective_mode),
+        media_type=NDJSON_MEDIA_TYPE,
+    )
+
+
+@router.post(
+    "/analyze/batch",
+    status_code=status.HTTP_200_OK,
+    response_model=List[BatchItemResult],
+)
+async def analyze_articles_batch(
+    articles: List[ArticleInput],
+    metrics: Optional[str] = _METRICS_QUERY,
+    adjective_mode: Optional[AdjectiveMode] = _ADJECTIVE_MODE_QUERY,
+) -> Response:
+    """
+    Analyze several articles in a single request.
+
+    The new paragraphs of all articles that are not already cached are
+    annotated together, in shared Stanza pipeline calls. Failures are reported per article, so one
+    bad article does not fail the whole batch; articles longer than
+    MAX_ARTICLE_CHARS are reported as failed without being analyzed.
+
+    Args:
+        articles: List of ArticleInput models
+        metrics: Comma-separated metric names and/or cost classes (all when None)
+        adjective_mode: Adjective mode (the deployment default when None)
+
+    Returns:
+        One BatchItemResult per input article, in the same order
+    """
+    if len(articles) > config.max_batch_size:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Batch too large: {len(articles)} articles (maximum {config.max_batch_size}).",
+        )
+
+    selected = _select_metrics(metrics)
+    results: List[BatchItemResult] = [BatchItemResult(index=i) for i in range(len(articles))]
+    cache_keys = [_cache_key(article, selected, adjective_mode) for article in articles]
+
+    # Serve cached articles first; identical articles in the batch are annotated once
+    pending: Dict[str, List[int]] = {}
+    for index, cache_key in enumerate(cache_keys):
+        try:
+            admission_controller.check_size(_article_text(articles[index]))
+        except ArticleTooLargeError as e:
+            results[index].error = str(e)
+            continue
+        if cache_key in pending:
+            pending[cache_key].append(index)
+            continue
+        cached_metrics = await result_cache.aget(cache_key)
+        if cached_metrics is not None:
+            results[index].metrics = cached_metrics
+        else:
+            pending[cache_key] = [index]
+
+    if not pending:
+        return _batch_response(results)
+
+    _ensure_stanza_initialized()
+
+    keys = list(pending)
+    texts = [_article_text(articles[pending[key][0]]) for key in keys]
+    try:
+        tables = await _annotate_texts(texts, processors_for(selected))
+    except ExecutorBusyError as e:
+        raise _executor_busy(e)
+    except AdmissionRejectedError as e:
+        raise _admission_rejected(e)
+
+    with adjective_mode_scope(adjective_mode):
+        outcomes = await asyncio.gather(
+            *(_compute_metrics_or_error(table, selected) for table in tables)
+        )
+
+    for key, outcome in zip(keys, outcomes):
+        if isinstance(outcome, Exception):
+            for index in pending[key]:
+                results[index].error = f"Error processing article: {str(outcome)}"
+            continue
+        if not any(metric.degraded for metric in outcome):
+            await result_cache.aset(key, outcome)
+        for index in pending[key]:
+            results[index].metrics = outcome
+
+    return _batch_response(results)
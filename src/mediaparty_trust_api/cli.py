@@ -0,0 +1,394 @@
+"""Bulk analysis command line: JSONL articles in, JSONL metric results out."""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+from itertools import islice
+from typing import IO, Dict, Iterator, List, Optional, Tuple, Union
+
+from pydantic import ValidationError
+
+from mediaparty_trust_api.core.config import config
+from mediaparty_trust_api.models import ArticleInput
+from mediaparty_trust_api.services.analysis import compute_metrics, processors_for
+from mediaparty_trust_api.services.annotation_store import AnnotationStore
+from mediaparty_trust_api.services.metrics import AdjectiveMode, adjective_mode_scope
+from mediaparty_trust_api.services.paragraph_cache import ParagraphCache
+from mediaparty_trust_api.services.registry import MetricSpec, select_metrics
+from mediaparty_trust_api.services.stanza_service import stanza_service
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+# One input line: its 1-based line number and the parsed article, or the
+# reason it could not be parsed
+Record = Tuple[int, Union[ArticleInput, str]]
+
+
+def read_records(stream: IO[bytes], skip: int = 0) -> Iterator[Record]:
+    """
+    Lazily parse JSONL ArticleInput records from a binary stream.
+
+    Args:
+        stream: UTF-8 input stream with one JSON article per line
+        skip: Number of leading lines to skip (already processed)
+
+    Articles longer than MAX_ARTICLE_CHARS are reported as errors.
+
+    Yields:
+        (line number, ArticleInput or error message) for every non-skipped line
+    """
+    for line_number, line in enumerate(stream, start=1):
+        if line_number <= skip:
+            continue
+        if not line.strip():
+            yield line_number, "Empty line"
+            continue
+        try:
+            article = ArticleInput.model_validate_json(line)
+        except ValidationError as e:
+            yield line_number, f"Invalid article: {e.errors(include_url=False, include_input=False)}"
+            continue
+        chars = len(article.title) + len(article.body) + 2
+        if chars > config.max_article_chars:
+            yield line_number, (
+                f"Article too large: {chars} characters (maximum {config.max_article_chars})."
+            )
+            continue
+        yield line_number, article
+
+
+def _run_pipeline(texts: List[str], processors: str) -> list:
+    """Annotate texts on the Stanza worker pool, one table or failure per text."""
+    options = {
+        "processors": processors,
+        "max_chunk_chars": config.annotation_chunk_chars,
+        "chunks_in_flight": config.annotation_chunks_in_flight,
+    }
+    try:
+        return stanza_service.create_tables(texts, **options)
+    except Exception:
+        # Retry one by one so a single bad article only fails its own record
+        tables = []
+        for text in texts:
+            try:
+                tables.append(stanza_service.create_table(text, **options))
+            except Exception as e:
+                tables.append(e)
+        return tables
+
+
+def _annotate_batch(
+    articles: List[ArticleInput], processors: str, paragraphs: ParagraphCache, rescore: bool
+) -> list:
+    """
+    Return the token table of every article of a batch, one result per article.
+
+    Paragraph tables are read from the paragraph cache and its annotation
+    store when present. Missing ones are annotated (and stored), or reported
+    as failures in rescore mode.
+    """
+    texts = [f"{article.title}. {article.body}" for article in articles]
+    if rescore:
+        def annotate(missing: List[str]) -> list:
+            return [LookupError("No stored annotation for this article")] * len(missing)
+    else:
+        def annotate(missing: List[str]) -> list:
+            return _run_pipeline(missing, processors)
+    return paragraphs.create_tables(texts, processors, annotate)
+
+
+class Checkpoint:
+    """
+    Progress of a bulk run, saved after every written batch.
+
+    Stores how many input lines were fully processed and the size of the
+    output file at that point, so a resumed run can drop any partially
+    written batch and skip the lines already done.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def load(self) -> Dict[str, int]:
+        """Return the saved progress, or zero progress when there is none."""
+        if not os.path.exists(self.path):
+            return {"lines_done": 0, "output_bytes": 0}
+        with open(self.path, "r") as f:
+            return json.load(f)
+
+    def save(self, lines_done: int, output_bytes: int) -> None:
+        """Atomically replace the saved progress."""
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump({"lines_done": lines_done, "output_bytes": output_bytes}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
+
+
+def check_output(output_path: str, checkpoint: Checkpoint, overwrite: bool = False) -> None:
+    """
+    Refuse to replace the results of an earlier run by accident.
+
+    Args:
+        output_path: JSONL output file
+        checkpoint: Checkpoint of the run
+        overwrite: Allow replacing an output file that has no checkpoint
+
+    Raises:
+        FileExistsError: If the output file is not empty, there is no
+            checkpoint to resume from and overwrite is not set
+    """
+    if overwrite or checkpoint.load()["lines_done"]:
+        return
+    if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
+        raise FileExistsError(
+            f"{output_path} already exists and there is no checkpoint to resume from; "
+            "use --overwrite to replace it"
+        )
+
+
+class Progress:
+    """Periodic progress and throughput report on stderr."""
+
+    def __init__(self, interval_seconds: float, total_bytes: Optional[int] = None):
+        self.interval_seconds = interval_seconds
+        self.total_bytes = total_bytes
+        self.started = time.perf_counter()
+        self._last_report = self.started
+        self.articles = 0
+        self.errors = 0
+
+    def update(
+        self,
+        articles: int,
+        errors: int,
+        bytes_read: Optional[int] = None,
+        final: bool = False,
+    ) -> None:
+        """Count processed articles and report if the interval has elapsed."""
+        self.articles += articles
+        self.errors += errors
+        now = time.perf_counter()
+        if not final and now - self._last_report < self.interval_seconds:
+            return
+        self._last_report = now
+        elapsed = now - self.started
+        rate = self.articles / elapsed if elapsed > 0 else 0.0
+        done = ""
+        if self.total_bytes and bytes_read is not None:
+            done = f" ({bytes_read / self.total_bytes:.1%} of input)"
+        print(
+            f"{'Done' if final else 'Progress'}: {self.articles} articles{done}, "
+            f"{self.errors} errors, {rate:.1f} articles/s, {elapsed:.0f}s elapsed",
+            file=sys.stderr,
+            flush=True,
+        )
+
+
+async def run_bulk(
+    input_path: str,
+    output_path: str,
+    selected: List[MetricSpec],
+    batch_size: int = 64,
+    checkpoint_path: Optional[str] = None,
+    progress_interval: float = 10.0,
+    store: Optional[AnnotationStore] = None,
+    rescore: bool = False,
+    adjective_mode: Optional[AdjectiveMode] = None,
+    metrics_concurrency: int = 32,
+    overwrite: bool = False,
+) -> None:
+    """
+    Analyze a JSONL file of articles, writing JSONL results as it goes.
+
+    Input is read lazily and processed in batches, so memory use does not
+    depend on the input size. While the metrics of one batch are computed,
+    the next batch is already being annotated. The metrics of the articles
+    of a batch are computed concurrently, so their LLM lookups share
+    batched calls. Results are written in input order; after every batch
+    the output is flushed and the checkpoint saved.
+
+    Args:
+        input_path: JSONL file of ArticleInput records
+        output_path: JSONL file receiving one result per input line
+        selected: Metrics to compute
+        batch_size: Number of articles annotated together
+        checkpoint_path: File recording progress; an existing one resumes the run
+        progress_interval: Seconds between progress reports
+        store: Annotation store to read tables from and save new ones to
+        rescore: Only read tables from the store, never running Stanza
+        adjective_mode: How qualitative adjectives are judged (ADJECTIVE_MODE when None)
+        metrics_concurrency: Maximum number of articles whose metrics are computed at once
+        overwrite: Replace an existing output file when there is no checkpoint
+
+    Raises:
+        FileExistsError: If the output file is not empty, there is no
+            checkpoint to resume from and overwrite is not set
+    """
+    processors = processors_for(selected)
+    paragraphs = ParagraphCache(
+        store or AnnotationStore(),
+        max_size=config.paragraph_cache_size,
+        max_call_chars=config.annotation_chunk_chars * config.annotation_chunks_in_flight,
+    )
+    checkpoint = Checkpoint(checkpoint_path or f"{output_path}.checkpoint")
+    check_output(output_path, checkpoint, overwrite)
+    state = checkpoint.load()
+    if state["lines_done"]:
+        print(f"Resuming after line {state['lines_done']}", file=sys.stderr)
+    semaphore = asyncio.Semaphore(metrics_concurrency)
+
+    with open(input_path, "rb") as input_file, open(
+        output_path, "a+b"
+    ) as output_file:
+        # Drop anything written after the last checkpoint (a partial batch)
+        output_file.truncate(state["output_bytes"])
+        output_file.seek(state["output_bytes"])
+
+        progress = Progress(progress_interval, os.fstat(input_file.fileno()).st_size)
+        records = read_records(input_file, skip=state["lines_done"])
+        lines_done = state["lines_done"]
+
+        def next_batch() -> List[Record]:
+            return list(islice(records, batch_size))
+
+        async def analyze(
+            line_number: int, item: Union[ArticleInput, str], table
+        ) -> Tuple[str, bool]:
+            """Compute the metrics of one record, returning its output line and whether it failed."""
+            result: Dict[str, object] = {"line": line_number}
+            error = item if isinstance(item, str) else None
+            if error is None:
+                result["link"] = item.link
+                try:
+                    if isinstance(table, Exception):
+                        raise table
+                    async with semaphore:
+                        with adjective_mode_scope(adjective_mode):
+                            metrics = await compute_metrics(table, selected)
+                    result["metrics"] = [metric.model_dump() for metric in metrics]
+                except Exception as e:
+                    error = f"Error processing article: {e}"
+            if error is not None:
+                result["error"] = error
+            return json.dumps(result, ensure_ascii=False) + "\n", error is not None
+
+        async def annotate(batch: List[Record]) -> list:
+            articles = [item for _, item in batch if isinstance(item, ArticleInput)]
+            if not articles:
+                return []
+            return await asyncio.to_thread(_annotate_batch, articles, processors, paragraphs, rescore)
+
+        batch = next_batch()
+        pending = asyncio.ensure_future(annotate(batch))
+        while batch:
+            tables = iter(await pending)
+            following = next_batch()
+            # Annotate the next batch while this one's metrics are computed
+            pending = asyncio.ensure_future(annotate(following))
+
+            # gather() keeps input order, whatever order the metrics finish in
+            outcomes = await asyncio.gather(
+                *(
+                    analyze(line_number, item, None if isinstance(item, str) else next(tables))
+                    for line_number, item in batch
+                )
+            )
+            lines = [line for line, _ in outcomes]
+            errors = sum(failed for _, failed in outcomes)
+
+            output_file.write("".join(lines).encode("utf-8"))
+            output_file.flush()
+            os.fsync(output_file.fileno())
+            lines_done = batch[-1][0]
+            checkpoint.save(lines_done, output_file.tell())
+            progress.update(len(batch), errors, input_file.tell())
+            batch = following
+
+        await pending
+        progress.update(0, 0, final=True)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Entry point of the `mediaparty-trust-api` command."""
+    parser = argparse.ArgumentParser(
+        prog="mediaparty-trust-api",
+        description="Analyze a JSONL file of articles offline, writing JSONL metric results.",
+    )
+    parser.add_argument("input", help="JSONL file with one ArticleInput object per line")
+    parser.add_argument("-o", "--output", default="results.jsonl",
+                        help="JSONL output file (default: results.jsonl)")
+    parser.add_argument("-m", "--metrics", default=None,
+                        help="Comma-separated metric names and/or cost classes (default: all)")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1,
+                        help="Stanza worker processes, 0 to annotate in-process (default: CPU count)")
+    parser.add_argument("-b", "--batch-size", type=int, default=64,
+                        help="Articles annotated together (default: 64)")
+    parser.add_argument("--checkpoint", default=None,
+                        help="Checkpoint file (default: OUTPUT.checkpoint); an existing one resumes the run")
+    parser.add_argument("--overwrite", action="store_true",
+                        help="Replace an existing OUTPUT when there is no checkpoint to resume from")
+    parser.add_argument("--metrics-concurrency", type=int, default=32,
+                        help="Articles whose metrics are computed at once (default: 32)")
+    parser.add_argument("--progress-interval", type=float, default=10.0,
+                        help="Seconds between progress reports (default: 10)")
+    parser.add_argument("--model-dir", default=config.stanza_model_dir, help="Stanza model directory")
+    parser.add_argument("--offline", action="store_true", default=config.stanza_offline,
+                        help="Load Stanza models from --model-dir without downloading")
+    parser.add_argument("--adjective-mode", choices=[mode.value for mode in AdjectiveMode],
+                        default=None,
+                        help="How qualitative adjectives are judged (default: ADJECTIVE_MODE, llm)")
+    parser.add_argument("--annotation-store", default=config.annotation_store_path,
+                        help="Directory of stored annotations, read before running Stanza "
+                             "and filled with new ones")
+    parser.add_argument("--rescore", action="store_true",
+                        help="Recompute metrics from --annotation-store only, without loading "
+                             "Stanza; articles without a stored annotation are reported as errors")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+    try:
+        selected = select_metrics(args.metrics)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.rescore and not args.annotation_store:
+        parser.error("--rescore requires --annotation-store")
+    try:
+        check_output(
+            args.output, Checkpoint(args.checkpoint or f"{args.output}.checkpoint"), args.overwrite
+        )
+    except FileExistsError as e:
+        parser.error(str(e))
+
+    if not args.rescore:
+        print("Initializing Stanza Spanish model...", file=sys.stderr)
+        stanza_service.initialize(
+            processors=processors_for(selected),
+            num_workers=args.workers,
+            model_dir=args.model_dir,
+            offline=args.offline,
+        )
+    try:
+        asyncio.run(
+            run_bulk(
+                args.input,
+                args.output,
+                selected,
+                batch_size=args.batch_size,
+                checkpoint_path=args.checkpoint,
+                progress_interval=args.progress_interval,
+                store=AnnotationStore(args.annotation_store),
+                rescore=args.rescore,
+                adjective_mode=AdjectiveMode(args.adjective_mode) if args.adjective_mode else None,
+                metrics_concurrency=args.metrics_concurrency,
+                overwrite=args.overwrite,
+            )
+        )
+    finally:
+        stanza_service.shutdown()
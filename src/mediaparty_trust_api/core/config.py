@@ -1,3 +1,5 @@
+from typing import Literal, Optional
+
 from dotenv import load_dotenv
 from pydantic_settings import BaseSettings
 
@@ -8,5 +10,101 @@ class Config(BaseSettings):
     app_name: str = "MediaPartyTrustAPI"
     debug: bool = False
 
+    # Analysis result cache: in-memory LRU with TTL, plus an optional SQLite
+    # tier that survives restarts (disabled when no path is configured).
+    result_cache_size: int = 1024
+    result_cache_ttl_seconds: float = 3600.0
+    result_cache_path: Optional[str] = None
+
+    # Maximum number of articles accepted by the batch analysis endpoint
+    max_batch_size: int = 50
+
+    # Hard caps on request size: the analyzed text (title and body) of one
+    # article, in characters, and the request body, in bytes (from
+    # Content-Length). Larger requests are rejected with a 413.
+    max_article_chars: int = 200000
+    max_request_bytes: int = 10_000_000
+
+    # Responses larger than this many bytes are gzip-compressed for clients
+    # accepting it (streamed NDJSON responses never are); 0 disables compression
+    gzip_minimum_size: int = 1000
+
+    # Memory budget shared by all annotations in flight. Each annotation
+    # reserves an estimate of its peak memory from the character and token
+    # counts of its text; annotations that do not fit wait for up to
+    # admission_max_wait_seconds (at most admission_max_waiting of them)
+    # and are then rejected with a 503.
+    admission_budget_bytes: int = 2 * 1024**3
+    admission_bytes_per_char: int = 16
+    admission_bytes_per_token: int = 4096
+    admission_max_wait_seconds: float = 10.0
+    admission_max_waiting: int = 64
+
+    # Time allowed for the metrics of a request after annotation. Metrics still
+    # running (i.e. waiting on the LLM) are replaced by their degraded fallback.
+    metric_budget_seconds: float = 5.0
+
+    # Executor for Stanza and LLM work. Requests beyond the worker count wait
+    # in a bounded queue; once it is full they are rejected with a 503.
+    nlp_executor_workers: int = 2
+    nlp_executor_queue_size: int = 16
+    nlp_retry_after_seconds: int = 1
+
+    # Number of forked Stanza annotation worker processes sharing the models
+    # loaded by the API process (0 annotates inside the API process)
+    stanza_workers: int = 0
+
+    # Stanza model directory. In offline mode models and resources.json are
+    # only read from this pre-baked directory and nothing is downloaded.
+    stanza_model_dir: Optional[str] = None
+    stanza_offline: bool = False
+
+    # Batch the annotations of concurrent requests: a batch waits
+    # up to stanza_batch_window_seconds for more texts (only while texts
+    # arrive faster than that) and stops growing at stanza_batch_max_tokens
+    # estimated tokens. Once stanza_batch_max_pending texts (paragraphs) are
+    # waiting for or in a batch, requests adding more are rejected with a 503.
+    stanza_batching: bool = True
+    stanza_batch_window_seconds: float = 0.005
+    stanza_batch_max_tokens: int = 8000
+    stanza_batch_max_pending: int = 256
+
+    # Texts longer than this many characters are annotated in chunks split at
+    # paragraph boundaries (0 annotates every text whole), with at most
+    # annotation_chunks_in_flight chunks held by Stanza at any time
+    annotation_chunk_chars: int = 20000
+    annotation_chunks_in_flight: int = 8
+
+    # Directory storing the token table of every annotated paragraph, so metrics
+    # can be recomputed without running Stanza again (disabled when unset)
+    annotation_store_path: Optional[str] = None
+
+    # Token tables of this many recently annotated paragraphs are kept in
+    # memory, so an edited article only re-annotates its changed paragraphs
+    paragraph_cache_size: int = 8192
+
+    # SQLite file with the LLM's qualitative/non-qualitative label for every
+    # adjective lemma seen so far (labels are kept in memory only when unset)
+    adjective_label_store_path: Optional[str] = "adjective_labels.sqlite3"
+
+    # Default way of judging qualitative adjectives: "llm" (OpenRouter labels),
+    # "fast" (local lexicon classifier) or "raw" (every adjective counts).
+    # Requests can override it with the adjective_mode query parameter.
+    adjective_mode: Literal["fast", "llm", "raw"] = "llm"
+
+    # Unknown adjective lemmas of concurrent requests are collected for this
+    # long and sent to the LLM together, in calls of at most llm_batch_max_size
+    llm_batch_window_seconds: float = 0.05
+    llm_batch_max_size: int = 64
+
+    # OpenRouter client. The base URL can point at a local stand-in server.
+    openrouter_base_url: str = "https://openrouter.ai/api/v1"
+    openrouter_model: str = "google/gemma-2-9b-it:free"
+    openrouter_timeout_seconds: float = 10.0
+    openrouter_max_concurrency: int = 8
+    openrouter_max_retries: int = 2
+    openrouter_circuit_failure_threshold: int = 5
+    openrouter_circuit_reset_seconds: float = 30.0
+
 
 config = Config()
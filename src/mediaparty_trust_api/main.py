@@ -1,15 +1,73 @@
 """Main FastAPI application entry point."""
 
+import asyncio
+import logging
 from contextlib import asynccontextmanager
+from typing import Optional
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, status
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
+from starlette.types import Receive, Scope, Send
 
 from mediaparty_trust_api.api.v1 import router as api_v1_router
 from mediaparty_trust_api.core.config import config  # Load .env variables
-from mediaparty_trust_api.services.stanza_service import stanza_service
+from mediaparty_trust_api.services.admission import admission_controller
+from mediaparty_trust_api.services.adjective_store import adjective_label_store
+from mediaparty_trust_api.services.annotation_store import annotation_store
+from mediaparty_trust_api.services.cache import result_cache
+from mediaparty_trust_api.services.executor import nlp_executor
+from mediaparty_trust_api.services.metrics import adjective_label_batcher
+from mediaparty_trust_api.services.openrouter import openrouter_client
+from mediaparty_trust_api.services.paragraph_cache import paragraph_cache
+from mediaparty_trust_api.services.registry import required_layers
+from mediaparty_trust_api.services.single_flight import analysis_flight
+from mediaparty_trust_api.services.stanza_service import resolve_processors, stanza_service
+from mediaparty_trust_api.services.telemetry import server_timing, telemetry
 
 # from fastapi.middleware.cors import CORSMiddleware
 
+# Configure logger
+logger = logging.getLogger(__name__)
+
+# Error raised while loading the NLP models in the background, if any
+_startup_error: Optional[Exception] = None
+
+
+def _initialize_nlp(load: bool = True, warm_up: bool = True) -> None:
+    """
+    Load (and fork) and/or warm up the Stanza pipeline.
+
+    Errors are kept for /ready instead of being raised; once a phase has
+    failed, later phases are skipped.
+    """
+    global _startup_error
+    if _startup_error is not None:
+        return
+    try:
+        if load:
+            print("Initializing Stanza Spanish model...")
+            stanza_service.load(
+                # Every registered metric can be requested, so load all their layers
+                processors=resolve_processors(required_layers()),
+                num_workers=config.stanza_workers,
+                model_dir=config.stanza_model_dir,
+                offline=config.stanza_offline,
+            )
+        if warm_up:
+            stanza_service.complete_startup(
+                batch_window_seconds=(
+                    config.stanza_batch_window_seconds if config.stanza_batching else None
+                ),
+                batch_max_tokens=config.stanza_batch_max_tokens,
+                batch_max_pending=config.stanza_batch_max_pending,
+                retry_after_seconds=config.nlp_retry_after_seconds,
+            )
+            print("Stanza model initialized successfully!")
+    except Exception as e:
+        _startup_error = e
+        logger.exception("Stanza initialization failed")
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -17,17 +75,32 @@ async def lifespan(app: FastAPI):
     Application lifespan manager.
 
     Handles startup and shutdown events for the FastAPI application.
-    Downloads and initializes the Stanza Spanish model on startup.
+    Downloads and initializes the Stanza Spanish model on startup, loading
+    only the processors needed by the declared metrics. Loading and warm-up
+    run in the background: `/health` answers right away, while `/ready`
+    only reports ready once the models are warm.
+
+    In worker-pool mode the models are loaded and the workers forked here,
+    before the server accepts connections, so the fork never happens from
+    a background thread while requests are handled; only the warm-up runs
+    in the background.
     """
     # Startup: Initialize Stanza Spanish model
-    print("Initializing Stanza Spanish model...")
-    stanza_service.initialize()
-    print("Stanza model initialized successfully!")
+    fork_before_serving = config.stanza_workers > 0
+    if fork_before_serving:
+        _initialize_nlp(warm_up=False)
+    startup = asyncio.create_task(
+        asyncio.to_thread(_initialize_nlp, load=not fork_before_serving)
+    )
 
     yield
 
     # Shutdown: cleanup if needed
     print("Shutting down...")
+    await startup
+    nlp_executor.shutdown()
+    stanza_service.shutdown()
+    await openrouter_client.aclose()
 
 
 app = FastAPI(
@@ -39,6 +112,50 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+
+@app.middleware("http")
+async def add_server_timing(request: Request, call_next):
+    """Return the timing spans of the request in a Server-Timing header."""
+    with telemetry.track_request() as spans:
+        response = await call_next(request)
+    if spans:
+        # Streaming responses only include the spans recorded before streaming started
+        response.headers["Server-Timing"] = server_timing(spans)
+    return response
+
+
+@app.middleware("http")
+async def limit_request_size(request: Request, call_next):
+    """Reject requests whose declared body is larger than MAX_REQUEST_BYTES with a 413."""
+    content_length = request.headers.get("content-length")
+    if content_length is not None and content_length.isdigit():
+        if int(content_length) > config.max_request_bytes:
+            return JSONResponse(
+                status_code=413,
+                content={
+                    "detail": (
+                        f"Request body too large: {content_length} bytes "
+                        f"(maximum {config.max_request_bytes})."
+                    )
+                },
+            )
+    return await call_next(request)
+
+
+class StreamingAwareGZipMiddleware(GZipMiddleware):
+    """Gzip responses, except streamed NDJSON, which the compressor would hold back."""
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and scope["path"].endswith("/stream"):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+
+if config.gzip_minimum_size > 0:
+    app.add_middleware(StreamingAwareGZipMiddleware, minimum_size=config.gzip_minimum_size)
+
+
 # # Configure CORS
 # app.add_middleware(
 #     CORSMiddleware,
@@ -65,5 +182,212 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/ready")
+async def readiness_check():
+    """
+    Readiness check endpoint.
+
+    Returns 503 until the NLP models are loaded and warmed up, so that
+    orchestrators only route traffic to a warm instance.
+    """
+    if stanza_service.is_ready:
+        return {"status": "ready", "startup_timings": stanza_service.startup_timings}
+
+    content = {"status": "starting"}
+    if _startup_error is not None:
+        content = {"status": "failed", "error": str(_startup_error)}
+    return JSONResponse(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, content=content)
+
+
+@app.get("/stats")
+async def stats():
+    """Runtime statistics endpoint, used to size caches and pools."""
+    return {
+        "cache": result_cache.stats(),
+        "executor": nlp_executor.stats(),
+        "stanza": stanza_service.stats(),
+        "adjective_labels": adjective_label_store.stats(),
+        "openrouter": openrouter_client.stats(),
+        "llm_batcher": adjective_label_batcher.stats(),
+        "single_flight": analysis_flight.stats(),
+        "annotation_store": annotation_store.stats(),
+        "paragraph_cache": paragraph_cache.stats(),
+        "admission": admission_controller.stats(),
+    }
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """
+    Prometheus metrics endpoint.
+
+    Exposes the stage duration and text length histograms plus the queue,
+    cache and upstream counters in the Prometheus text exposition format.
+    """
+    cache = result_cache.stats()
+    executor = nlp_executor.stats()
+    openrouter = openrouter_client.stats()
+    annotations = annotation_store.stats()
+    paragraphs = paragraph_cache.stats()
+    batcher = adjective_label_batcher.stats()
+    admission = admission_controller.stats()
+    stanza_batching = stanza_service.stats()["batching"] or {"pending": 0, "rejected": 0}
+    samples = [
+        (
+            "mediaparty_executor_queue_depth",
+            "gauge",
+            "Jobs waiting for an NLP executor worker.",
+            executor["queue_depth"],
+        ),
+        (
+            "mediaparty_executor_running",
+            "gauge",
+            "Jobs running on the NLP executor.",
+            executor["running"],
+        ),
+        (
+            "mediaparty_executor_rejected_total",
+            "counter",
+            "Jobs rejected because the executor queue was full.",
+            executor["rejected"],
+        ),
+        (
+            "mediaparty_stanza_batch_pending",
+            "gauge",
+            "Paragraphs waiting for or in a Stanza batch.",
+            stanza_batching["pending"],
+        ),
+        (
+            "mediaparty_stanza_batch_rejected_total",
+            "counter",
+            "Requests rejected because the Stanza batcher queue was full.",
+            stanza_batching["rejected"],
+        ),
+        (
+            "mediaparty_admission_budget_bytes",
+            "gauge",
+            "Memory budget shared by the annotations in flight.",
+            admission["budget_bytes"],
+        ),
+        (
+            "mediaparty_admission_in_use_bytes",
+            "gauge",
+            "Estimated memory reserved by the annotations in flight.",
+            admission["in_use_bytes"],
+        ),
+        (
+            "mediaparty_admission_waiting",
+            "gauge",
+            "Annotations waiting for memory budget.",
+            admission["waiting"],
+        ),
+        (
+            "mediaparty_admission_rejected_total",
+            "counter",
+            "Annotations rejected because the memory budget stayed exhausted.",
+            admission["rejected"],
+        ),
+        (
+            "mediaparty_admission_too_large_total",
+            "counter",
+            "Articles rejected for exceeding the per-article size cap.",
+            admission["too_large"],
+        ),
+        (
+            "mediaparty_cache_hits_total",
+            "counter",
+            "Result cache hits.",
+            cache["hits"],
+        ),
+        (
+            "mediaparty_cache_misses_total",
+            "counter",
+            "Result cache misses.",
+            cache["misses"],
+        ),
+        (
+            "mediaparty_cache_size",
+            "gauge",
+            "Results held in the in-memory cache.",
+            cache["size"],
+        ),
+        (
+            "mediaparty_coalesced_requests_total",
+            "counter",
+            "Requests that joined an identical in-flight analysis.",
+            analysis_flight.stats()["coalesced"],
+        ),
+        (
+            "mediaparty_annotation_store_hits_total",
+            "counter",
+            "Texts whose annotation was read from the annotation store.",
+            annotations["hits"],
+        ),
+        (
+            "mediaparty_annotation_store_misses_total",
+            "counter",
+            "Texts annotated because the annotation store had no table for them.",
+            annotations["misses"],
+        ),
+        (
+            "mediaparty_paragraph_cache_hits_total",
+            "counter",
+            "Paragraphs whose annotation was reused (from memory or the annotation store).",
+            paragraphs["hits"] + paragraphs["store_hits"],
+        ),
+        (
+            "mediaparty_paragraph_cache_misses_total",
+            "counter",
+            "Paragraphs annotated because no annotation of them was kept.",
+            paragraphs["misses"],
+        ),
+        (
+            "mediaparty_openrouter_calls_total",
+            "counter",
+            "OpenRouter chat calls.",
+            openrouter["calls"],
+        ),
+        (
+            "mediaparty_openrouter_failures_total",
+            "counter",
+            "OpenRouter chat calls that failed after retries.",
+            openrouter["failures"],
+        ),
+        (
+            "mediaparty_llm_batch_requests_total",
+            "counter",
+            "Requests that needed adjective labels from the LLM.",
+            batcher["requests"],
+        ),
+        (
+            "mediaparty_llm_batch_calls_total",
+            "counter",
+            "Batched LLM labelling calls sent upstream.",
+            batcher["upstream_calls"],
+        ),
+        (
+            "mediaparty_llm_batch_items_total",
+            "counter",
+            "Distinct adjective lemmas sent to the LLM in batched calls.",
+            batcher["items_sent"],
+        ),
+        (
+            "mediaparty_openrouter_circuit_open",
+            "gauge",
+            "1 while the OpenRouter circuit breaker is not closed.",
+            int(openrouter["circuit_state"] != "closed"),
+        ),
+        (
+            "mediaparty_adjective_labels",
+            "gauge",
+            "Adjective lemmas with a stored label.",
+            adjective_label_store.stats()["labels"],
+        ),
+    ]
+    return PlainTextResponse(
+        telemetry.render(samples), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
 # Include API v1 routes
 app.include_router(api_v1_router, prefix="/api/v1")
@@ -1,4 +1,4 @@
-from typing import Literal
+from typing import List, Literal, Optional
 
 from pydantic import BaseModel, Field
 
@@ -45,6 +45,13 @@ class Metric(BaseModel):
         description="Flag indicating the result: -1 (negative), 0 (neutral), 1 (positive)",
     )
     score: float = Field(..., ge=0.0, le=1.0, description="Score between 0.0 and 1.0")
+    degraded: bool = Field(
+        False,
+        description=(
+            "True when the metric was computed in a degraded mode, e.g. without the LLM "
+            "because it failed or missed the per-request latency budget"
+        ),
+    )
 
     class Config:
         json_schema_extra = {
@@ -54,5 +61,40 @@ class Metric(BaseModel):
                 "explanation": "The inverted pyramid criteria for good journalism is not respected.",
                 "flag": -1,
                 "score": 0.2,
+                "degraded": False,
+            }
+        }
+
+
+class BatchItemResult(BaseModel):
+    """
+    Result of analyzing one article of a batch request.
+
+    Exactly one of `metrics` or `error` is set, so a failing article does
+    not fail the rest of the batch.
+    """
+
+    index: int = Field(..., description="Position of the article in the request")
+    metrics: Optional[List[Metric]] = Field(
+        None, description="Analysis results, when the article was processed"
+    )
+    error: Optional[str] = Field(
+        None, description="Error message, when the article could not be processed"
+    )
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "index": 0,
+                "metrics": [
+                    {
+                        "id": 1,
+                        "criteria_name": "Word Count",
+                        "explanation": "The article has 450 words, which is adequate.",
+                        "flag": 0,
+                        "score": 0.6,
+                    }
+                ],
+                "error": None,
             }
         }
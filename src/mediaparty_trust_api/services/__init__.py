@@ -1,17 +1,35 @@
 """Services module for MediaParty Trust API."""
 
+from mediaparty_trust_api.services.annotation_store import annotation_store
+from mediaparty_trust_api.services.cache import result_cache
 from mediaparty_trust_api.services.metrics import (
     get_adjective_count,
     get_sentence_complexity,
     get_verb_tense_analysis,
     get_word_count,
 )
+from mediaparty_trust_api.services.paragraph_cache import paragraph_cache
+from mediaparty_trust_api.services.registry import (
+    METRIC_REGISTRY,
+    CostClass,
+    register_fallback,
+    register_metric,
+    select_metrics,
+)
 from mediaparty_trust_api.services.stanza_service import stanza_service
 
 __all__ = [
     "stanza_service",
+    "result_cache",
+    "annotation_store",
+    "paragraph_cache",
     "get_adjective_count",
     "get_word_count",
     "get_sentence_complexity",
     "get_verb_tense_analysis",
+    "METRIC_REGISTRY",
+    "CostClass",
+    "register_metric",
+    "register_fallback",
+    "select_metrics",
 ]
@@ -0,0 +1,157 @@
+"""Local classifier of Spanish qualitative adjectives, used instead of (or behind) the LLM."""
+
+from functools import lru_cache
+from typing import Optional
+
+import numpy as np
+
+from mediaparty_trust_api.services.token_table import TokenTable
+
+# Adjective lemmas that express opinion or judgment in news writing
+QUALITATIVE_LEMMAS = frozenset(
+    """
+    absurdo abusivo aceptable acertado admirable alarmante alentador amable
+    amargo ambicioso angustiante asombroso atroz audaz auténtico bárbaro bello
+    bonito brillante brutal bueno caótico catastrófico celebrado cínico clave
+    cobarde cómodo complejo complicado contundente controvertido conveniente
+    correcto corrupto costoso crítico cruel cuestionable curioso decepcionante
+    decisivo delicado deplorable desafortunado desastroso desesperado
+    desmesurado despiadado destacado devastador difícil digno dramático dudoso
+    duro eficaz eficiente elegante emblemático emocionante emotivo encomiable
+    enorme errado erróneo escandaloso escaso espantoso espectacular estúpido
+    estupendo excelente excepcional excesivo exitoso extraordinario fabuloso
+    falso fantástico fatal favorable feliz feo férreo fiel flagrante formidable
+    fracasado frágil fuerte funesto generoso genial genuino gigantesco glorioso
+    grave gravísimo grosero grotesco hermoso heroico histórico honesto horrible
+    hostil ilegítimo impactante impecable imperdonable implacable importante
+    impresionante impresentable inaceptable inadmisible incapaz incómodo
+    increíble indignante inédito ineficaz inepto inesperado inexplicable
+    infame injusto inmenso inolvidable inquietante insólito insoportable
+    inteligente intenso interesante intolerable inútil irresponsable
+    irrisorio justo lamentable leal lento lujoso magnífico malo maravilloso
+    mediocre mejor memorable mentiroso mezquino miserable modesto monstruoso
+    necesario negativo nefasto noble notable novedoso obsceno obvio odioso
+    ominoso oportuno optimista orgulloso osado peligroso peor perfecto
+    perverso pésimo pobre polémico positivo precario preciso preocupante
+    prestigioso privilegiado prodigioso profundo prometedor prudente
+    querido radical rápido razonable relevante resonante responsable
+    ridículo riesgoso rotundo ruinoso sabio salvaje sangriento sencillo
+    sensacional sensato sensible serio severo significativo simple sincero
+    siniestro sólido sorprendente sospechoso sublime sucio sutil temerario
+    terrible terrorífico tímido torpe tóxico trágico tremendo triste triunfal
+    turbio urgente valiente valioso verdadero vergonzoso veraz violento vital
+    vulgar
+    """.split()
+)
+
+# Relational, classifying or determiner-like adjectives that state a fact
+# rather than a judgment (nationality, domain, order, time)
+NON_QUALITATIVE_LEMMAS = frozenset(
+    """
+    académico actual administrativo aéreo agrícola agropecuario alemán
+    ambiental americano anterior anual argentino artístico asiático
+    automotor bancario bonaerense brasileño británico bursátil cambiario
+    carcelario católico central chileno chino científico civil climático
+    colombiano comercial constitucional cordobés cultural demográfico
+    deportivo diario digital disponible diplomático económico educativo eléctrico
+    electoral energético escolar español estadístico estadounidense estatal
+    europeo ex exterior farmacéutico federal fiscal financiero forestal
+    francés futbolístico general geográfico global gubernamental ganadero
+    hídrico hospitalario impositivo industrial informático inmobiliario
+    interanual interior internacional italiano judicial jurídico laboral
+    latinoamericano legal legislativo literario local marítimo mayor médico
+    mendocino menor mensual mexicano migratorio militar minero ministerial
+    monetario mundial municipal musical nacional nuclear oficial oficialista
+    opositor otro parlamentario partidario penal penitenciario peronista
+    pesquero petrolero policial político porteño portuario posible presidencial
+    presupuestario previo previsional primero principal privado probable próximo
+    provincial público regional religioso rural ruso salarial sanitario
+    santafesino segundo semanal siguiente sindical social tecnológico
+    tercero total trimestral tributario turístico universitario urbano
+    uruguayo venezolano vial último
+    """.split()
+)
+
+# Suffixes of Spanish evaluative adjectives (absolute superlatives and
+# "full of" / "worthy of" derivations)
+QUALITATIVE_SUFFIXES = ("ísimo", "ísima", "érrimo", "oso", "osa", "able", "ible")
+
+# Degree words: an adjective modified by one of them is gradable, which
+# relational adjectives are not
+INTENSIFIERS = frozenset(
+    """
+    muy tan demasiado sumamente realmente bastante extremadamente
+    increíblemente absolutamente totalmente tremendamente más menos
+    """.split()
+)
+
+
+@lru_cache(maxsize=65536)
+def lemma_label(lemma: str) -> Optional[bool]:
+    """
+    Label an adjective lemma out of context.
+
+    Looks the lemma up in the lexicons, then falls back to evaluative
+    suffixes. Most adjectives missing from both lexicons are descriptive or
+    relational, so no evidence means "not qualitative" unless the context
+    says otherwise (see qualitative_mask()).
+
+    Args:
+        lemma: Lowercased adjective lemma
+
+    Returns:
+        True if qualitative, False if not, None if the lemma gives no evidence
+    """
+    if lemma in QUALITATIVE_LEMMAS:
+        return True
+    if lemma in NON_QUALITATIVE_LEMMAS:
+        return False
+    if lemma.endswith(QUALITATIVE_SUFFIXES):
+        return True
+    return None
+
+
+def qualitative_mask(table: TokenTable) -> np.ndarray:
+    """
+    Classify every adjective of a token table as qualitative or not.
+
+    Each distinct lemma is labelled once with lemma_label(). Adjectives whose
+    lemma gives no evidence count as qualitative only when used gradably:
+    in comparative or superlative form (Degree feature), or right after an
+    intensifier such as "muy" in the same sentence.
+
+    Args:
+        table: TokenTable extracted from the annotated document
+
+    Returns:
+        Boolean mask over the table's words, True for qualitative adjectives
+    """
+    adjectives = table.upos_mask("ADJ")
+    if not adjectives.any():
+        return adjectives
+
+    # Label every distinct adjective lemma: 1 qualitative, 0 not, -1 unknown
+    codes, inverse = np.unique(table.lemma[adjectives], return_inverse=True)
+    vocab = table.vocab
+    lemma_labels = np.array(
+        [{True: 1, False: 0, None: -1}[lemma_label(vocab[code])] for code in codes.tolist()],
+        dtype=np.int8,
+    )
+    labels = lemma_labels[inverse]
+
+    # Gradable use: Degree feature, or an intensifier right before the
+    # adjective (never across a sentence boundary)
+    gradable = table.feature_mask("Degree=Cmp") | table.feature_mask("Degree=Sup")
+    if table.num_words > 1:
+        intensifier_codes = [
+            code for code, word in enumerate(vocab) if word in INTENSIFIERS
+        ]
+        after_intensifier = np.zeros(table.num_words, dtype=bool)
+        after_intensifier[1:] = np.isin(table.lemma[:-1], intensifier_codes)
+        sentence_starts = table.sentence_offsets[:-1]
+        after_intensifier[sentence_starts[sentence_starts < table.num_words]] = False
+        gradable |= after_intensifier
+
+    mask = np.zeros(table.num_words, dtype=bool)
+    mask[adjectives] = (labels == 1) | ((labels == -1) & gradable[adjectives])
+    return mask
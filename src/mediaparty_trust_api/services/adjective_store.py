@@ -0,0 +1,118 @@
+"""Persistent store of qualitative/non-qualitative labels for adjective lemmas."""
+
+import logging
+import sqlite3
+import threading
+from typing import Dict, Iterable, Optional
+
+from mediaparty_trust_api.core.config import config
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+
+class AdjectiveLabelStore:
+    """
+    Labels assigned by the LLM to adjective lemmas, kept across restarts.
+
+    Every lemma is judged by the LLM once; later requests read the label
+    from here. Labels are mirrored in memory and persisted in a SQLite file
+    (memory only when no path is configured). All methods are thread-safe.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Initialize the store. The SQLite file is opened on first use.
+
+        Args:
+            path: SQLite file holding the labels, or None to keep them in memory only
+        """
+        self.path = path
+        self._labels: Optional[Dict[str, bool]] = None
+        self._db: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def _load(self) -> Dict[str, bool]:
+        """Open the SQLite file and load every label into memory on first use."""
+        if self._labels is None:
+            self._labels = {}
+            if self.path is not None:
+                self._db = sqlite3.connect(self.path, check_same_thread=False)
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS adjective_labels ("
+                    "lemma TEXT PRIMARY KEY, qualitative INTEGER NOT NULL)"
+                )
+                self._db.commit()
+                for lemma, qualitative in self._db.execute(
+                    "SELECT lemma, qualitative FROM adjective_labels"
+                ):
+                    self._labels[lemma] = bool(qualitative)
+        return self._labels
+
+    def get_many(self, lemmas: Iterable[str]) -> Dict[str, bool]:
+        """
+        Look up the labels of several lemmas.
+
+        Args:
+            lemmas: Lowercased adjective lemmas
+
+        Returns:
+            Mapping from lemma to "is qualitative" for the lemmas already labelled
+        """
+        with self._lock:
+            labels = self._load()
+            found = {}
+            for lemma in lemmas:
+                label = labels.get(lemma)
+                if label is None:
+                    self._misses += 1
+                else:
+                    self._hits += 1
+                    found[lemma] = label
+            return found
+
+    def all_labels(self) -> Dict[str, bool]:
+        """Return a copy of every stored label, by lemma."""
+        with self._lock:
+            return dict(self._load())
+
+    def set_many(self, labels: Dict[str, bool]) -> None:
+        """
+        Store labels for several lemmas.
+
+        Args:
+            labels: Mapping from lowercased lemma to "is qualitative"
+        """
+        if not labels:
+            return
+        with self._lock:
+            self._load().update(labels)
+            if self._db is not None:
+                try:
+                    self._db.executemany(
+                        "INSERT OR REPLACE INTO adjective_labels (lemma, qualitative) VALUES (?, ?)",
+                        [(lemma, int(label)) for lemma, label in labels.items()],
+                    )
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    logger.error(f"Could not persist adjective labels: {e}")
+
+    def stats(self) -> Dict[str, object]:
+        """Return the number of stored labels and lookup counters."""
+        with self._lock:
+            labels = self._load()
+            lookups = self._hits + self._misses
+            return {
+                "labels": len(labels),
+                "qualitative": sum(labels.values()),
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": self._hits / lookups if lookups else 0.0,
+                "persistent": self.path is not None,
+            }
+
+
+# Global instance to be used across the application
+adjective_label_store = AdjectiveLabelStore(path=config.adjective_label_store_path)
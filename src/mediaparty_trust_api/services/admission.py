@@ -0,0 +1,214 @@
+"""Memory-aware admission control for annotation work, keyed on article size."""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Dict, Tuple
+
+from mediaparty_trust_api.core.config import config
+from mediaparty_trust_api.services.stanza_batcher import estimate_tokens
+
+
+class ArticleTooLargeError(ValueError):
+    """Raised when an article is longer than the hard per-article cap."""
+
+    def __init__(self, chars: int, max_chars: int):
+        super().__init__(
+            f"Article too large: {chars} characters (maximum {max_chars})."
+        )
+        self.chars = chars
+        self.max_chars = max_chars
+
+
+class AdmissionRejectedError(RuntimeError):
+    """Raised when the memory budget stays exhausted for too long."""
+
+    def __init__(self, retry_after_seconds: int):
+        super().__init__("Annotation memory budget is exhausted.")
+        self.retry_after_seconds = retry_after_seconds
+
+
+class AdmissionController:
+    """
+    Global in-flight memory budget for annotation work.
+
+    Every annotation reserves its estimated peak memory (from the character
+    and token counts of its text) before it starts and releases it when it
+    ends. Work that does not fit waits, first come first served, for up to
+    `max_wait_seconds`; it is rejected right away when `max_waiting` others
+    are already waiting, or once the wait runs out. Work estimated above the
+    whole budget is admitted alone. Articles above `max_article_chars` are
+    refused outright.
+
+    Admission is driven from the event loop; the counters may be read from
+    any thread.
+    """
+
+    def __init__(
+        self,
+        budget_bytes: int,
+        bytes_per_char: int = 16,
+        bytes_per_token: int = 4096,
+        max_article_chars: int = 200000,
+        max_wait_seconds: float = 10.0,
+        max_waiting: int = 64,
+        retry_after_seconds: int = 1,
+    ):
+        """
+        Initialize the controller.
+
+        Args:
+            budget_bytes: Memory shared by all annotations in flight
+            bytes_per_char: Estimated peak memory per character of text
+            bytes_per_token: Estimated peak memory per token (Stanza's word
+                objects, tensors and the token table)
+            max_article_chars: Hard cap on the text of one article
+            max_wait_seconds: Longest time work waits for budget
+            max_waiting: Maximum amount of work waiting for budget
+            retry_after_seconds: Value of the Retry-After hint given to rejected clients
+        """
+        self.budget_bytes = budget_bytes
+        self.bytes_per_char = bytes_per_char
+        self.bytes_per_token = bytes_per_token
+        self.max_article_chars = max_article_chars
+        self.max_wait_seconds = max_wait_seconds
+        self.max_waiting = max_waiting
+        self.retry_after_seconds = retry_after_seconds
+        self._waiters: Deque[Tuple[int, asyncio.Future]] = deque()
+        self._lock = threading.Lock()
+        self._in_use = 0
+        self._in_flight = 0
+        self._admitted = 0
+        self._queued = 0
+        self._rejected = 0
+        self._too_large = 0
+        self._wait_seconds_max = 0.0
+
+    def check_size(self, text: str) -> None:
+        """
+        Enforce the per-article cap.
+
+        Args:
+            text: Analyzed text of one article
+
+        Raises:
+            ArticleTooLargeError: If the text is longer than max_article_chars
+        """
+        if len(text) > self.max_article_chars:
+            with self._lock:
+                self._too_large += 1
+            raise ArticleTooLargeError(len(text), self.max_article_chars)
+
+    def estimate(self, text: str) -> int:
+        """Estimated peak memory of annotating a text, in bytes."""
+        return len(text) * self.bytes_per_char + estimate_tokens(text) * self.bytes_per_token
+
+    @asynccontextmanager
+    async def admit(self, cost: int) -> AsyncIterator[None]:
+        """
+        Reserve budget for the enclosed work.
+
+        Args:
+            cost: Estimated peak memory of the work, in bytes
+
+        Raises:
+            AdmissionRejectedError: If the budget cannot be reserved in time
+        """
+        # Work larger than the whole budget runs alone
+        cost = min(cost, self.budget_bytes)
+        await self._acquire(cost)
+        try:
+            yield
+        finally:
+            self._release(cost)
+
+    async def _acquire(self, cost: int) -> None:
+        with self._lock:
+            # Waiters are served in order, so newcomers never overtake them
+            if not self._waiters and self._in_use + cost <= self.budget_bytes:
+                self._reserve(cost)
+                return
+            if len(self._waiters) >= self.max_waiting:
+                self._rejected += 1
+                raise AdmissionRejectedError(self.retry_after_seconds)
+            future = asyncio.get_running_loop().create_future()
+            waiter = (cost, future)
+            self._waiters.append(waiter)
+            self._queued += 1
+
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(asyncio.shield(future), self.max_wait_seconds)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            with self._lock:
+                if future.done() and not future.cancelled():
+                    # Admitted just as the wait ended: hand the budget back
+                    self._in_use -= cost
+                    self._in_flight -= 1
+                    self._admitted -= 1
+                elif waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                if isinstance(e, asyncio.TimeoutError):
+                    self._rejected += 1
+                self._wake()
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            raise AdmissionRejectedError(self.retry_after_seconds)
+        with self._lock:
+            self._wait_seconds_max = max(self._wait_seconds_max, time.perf_counter() - started)
+
+    def _reserve(self, cost: int) -> None:
+        """Account admitted work. Must hold the lock."""
+        self._in_use += cost
+        self._in_flight += 1
+        self._admitted += 1
+
+    def _wake(self) -> None:
+        """Admit waiting work, in order, while it fits. Must hold the lock."""
+        while self._waiters:
+            cost, future = self._waiters[0]
+            if future.done():
+                self._waiters.popleft()
+                continue
+            if self._in_use + cost > self.budget_bytes:
+                break
+            self._waiters.popleft()
+            self._reserve(cost)
+            future.set_result(None)
+
+    def _release(self, cost: int) -> None:
+        with self._lock:
+            self._in_use -= cost
+            self._in_flight -= 1
+            self._wake()
+
+    def stats(self) -> Dict[str, object]:
+        """Return budget use and admission counters."""
+        with self._lock:
+            return {
+                "budget_bytes": self.budget_bytes,
+                "in_use_bytes": self._in_use,
+                "utilization": self._in_use / self.budget_bytes if self.budget_bytes else 0.0,
+                "in_flight": self._in_flight,
+                "waiting": len(self._waiters),
+                "admitted": self._admitted,
+                "queued": self._queued,
+                "rejected": self._rejected,
+                "too_large": self._too_large,
+                "max_article_chars": self.max_article_chars,
+                "max_wait_seconds": self._wait_seconds_max,
+            }
+
+
+# Global instance to be used across the application
+admission_controller = AdmissionController(
+    budget_bytes=config.admission_budget_bytes,
+    bytes_per_char=config.admission_bytes_per_char,
+    bytes_per_token=config.admission_bytes_per_token,
+    max_article_chars=config.max_article_chars,
+    max_wait_seconds=config.admission_max_wait_seconds,
+    max_waiting=config.admission_max_waiting,
+    retry_after_seconds=config.nlp_retry_after_seconds,
+)
@@ -0,0 +1,178 @@
+"""Concurrent metric execution under a per-request latency budget."""
+
+import asyncio
+import inspect
+import logging
+from contextlib import aclosing
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from mediaparty_trust_api.core.config import config
+from mediaparty_trust_api.models import Metric
+# Importing the metrics module registers the built-in metrics
+from mediaparty_trust_api.services import metrics as _metrics  # noqa: F401
+from mediaparty_trust_api.services.registry import MetricSpec, required_layers, select_metrics
+from mediaparty_trust_api.services.stanza_service import resolve_processors
+from mediaparty_trust_api.services.telemetry import telemetry
+from mediaparty_trust_api.services.token_table import TokenTable
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+
+def processors_for(metrics: List[MetricSpec]) -> str:
+    """
+    Return the Stanza processors needed to compute some metrics.
+
+    Args:
+        metrics: Selected metrics
+
+    Returns:
+        Comma-separated processor list, with prerequisites, in pipeline order
+    """
+    return resolve_processors(required_layers(metrics))
+
+
+async def _metric_results(
+    table: TokenTable,
+    metrics: List[MetricSpec],
+    budget_seconds: Optional[float] = None,
+) -> AsyncIterator[Tuple[int, Metric]]:
+    """
+    Calculate some metrics, yielding each one as soon as it is ready.
+
+    Synchronous metrics come first, then async ones in completion order,
+    with their fallback for those that fail or miss the budget.
+
+    Args:
+        table: TokenTable extracted from the annotated document
+        metrics: Metrics to calculate
+        budget_seconds: Time allowed for the async metrics (config default when None)
+
+    Yields:
+        Tuples of the metric position in `metrics` and its result
+    """
+    if budget_seconds is None:
+        budget_seconds = config.metric_budget_seconds
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + budget_seconds
+    tasks: Dict[asyncio.Future, int] = {}
+    for index, metric in enumerate(metrics):
+        if inspect.iscoroutinefunction(metric.func):
+            task = asyncio.ensure_future(_timed_async(metric, table))
+            tasks[task] = index
+
+    try:
+        for index, metric in enumerate(metrics):
+            if not inspect.iscoroutinefunction(metric.func):
+                with telemetry.span(f"metric.{metric.func.__name__}"):
+                    result = metric.func(table, metric_id=metric.metric_id)
+                yield index, result
+
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(
+                pending,
+                timeout=max(deadline - loop.time(), 0),
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            if not done:
+                break
+            for task in done:
+                yield tasks[task], _task_result(task, table, metrics[tasks[task]])
+
+        for task in pending:
+            metric = metrics[tasks[task]]
+            error = TimeoutError(
+                f"Metric {metric.func.__name__} missed the {budget_seconds}s budget"
+            )
+            logger.warning(f"{error}; using its fallback")
+            yield tasks[task], _fallback(metric, table, error)
+    finally:
+        # Also reached when a metric fails, the consumer stops early or the
+        # caller is cancelled
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+
+async def _timed_async(metric: MetricSpec, table: TokenTable) -> Metric:
+    """Run an async metric under a timing span."""
+    with telemetry.span(f"metric.{metric.func.__name__}"):
+        return await metric.func(table, metric_id=metric.metric_id)
+
+
+def _task_result(task: asyncio.Future, table: TokenTable, metric: MetricSpec) -> Metric:
+    """Return the result of a finished async metric, or its fallback if it failed."""
+    if task.exception() is None:
+        return task.result()
+    error = task.exception()
+    logger.error(f"Metric {metric.func.__name__} failed: {error}; using its fallback")
+    return _fallback(metric, table, error)
+
+
+def _fallback(metric: MetricSpec, table: TokenTable, error: BaseException) -> Metric:
+    """Compute the degraded fallback of a metric, re-raising the error if it has none."""
+    if metric.fallback is None:
+        raise error
+    with telemetry.span(f"metric.{metric.fallback.__name__}"):
+        fallback = metric.fallback(table, metric_id=metric.metric_id)
+    return fallback.model_copy(update={"degraded": True})
+
+
+async def iter_metrics(
+    table: TokenTable,
+    metrics: Optional[List[MetricSpec]] = None,
+    budget_seconds: Optional[float] = None,
+) -> AsyncIterator[Metric]:
+    """
+    Calculate metrics for an annotated document, yielding them as they complete.
+
+    The cheap synchronous metrics are yielded right away, before the async
+    (LLM) ones, which follow in completion order. The budget and fallbacks
+    are the same as in compute_metrics().
+
+    Args:
+        table: TokenTable extracted from the annotated document
+        metrics: Metrics to calculate (every registered metric when None)
+        budget_seconds: Time allowed for the async metrics (config default when None)
+
+    Yields:
+        Metric objects in completion order
+    """
+    if metrics is None:
+        metrics = select_metrics()
+    async with aclosing(_metric_results(table, metrics, budget_seconds)) as results:
+        async for _, metric in results:
+            yield metric
+
+
+async def compute_metrics(
+    table: TokenTable,
+    metrics: Optional[List[MetricSpec]] = None,
+    budget_seconds: Optional[float] = None,
+) -> List[Metric]:
+    """
+    Calculate metrics for an annotated document.
+
+    Async metrics (those calling the LLM) run concurrently as tasks, while
+    the synchronous ones, which only reduce NumPy arrays, run inline in the
+    meantime. Async metrics still running when the budget expires are
+    cancelled and replaced by their fallback, marked as degraded, so the
+    response never waits longer than the budget for them.
+
+    Args:
+        table: TokenTable extracted from the annotated document
+        metrics: Metrics to calculate (every registered metric when None)
+        budget_seconds: Time allowed for the async metrics (config default when None)
+
+    Returns:
+        List of Metric objects in the order of `metrics` (by id by default)
+    """
+    if metrics is None:
+        metrics = select_metrics()
+    results: List[Optional[Metric]] = [None] * len(metrics)
+    async with aclosing(_metric_results(table, metrics, budget_seconds)) as metric_results:
+        async for index, metric in metric_results:
+            results[index] = metric
+    return results
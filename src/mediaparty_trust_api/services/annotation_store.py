@@ -0,0 +1,236 @@
+"""On-disk store of token tables, so metrics can be recomputed without running Stanza."""
+
+import hashlib
+import logging
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import stanza
+
+from mediaparty_trust_api.core.config import config
+from mediaparty_trust_api.services.cache import normalize_text
+from mediaparty_trust_api.services.token_table import FEATURES, UPOS_TAGS, TokenTable
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+# File layout: magic, three uint64 counts (words, sentence offsets, vocab
+# bytes), then the arrays below in this order, little-endian and each starting
+# at an 8-byte boundary, then the vocabulary as NUL-separated UTF-8
+_MAGIC = b"TTABLE01"
+_ARRAYS = (
+    ("upos", np.uint8),
+    ("feats", np.uint32),
+    ("text", np.int32),
+    ("lemma", np.int32),
+    ("sentence_offsets", np.int64),
+)
+_COUNTS_DTYPE = np.dtype("<u8")
+
+# Version of the stored table schema: changes whenever the UPOS or feature
+# encodings change, since stored codes would then be read wrongly
+SCHEMA_VERSION = hashlib.sha256(
+    "\x00".join(UPOS_TAGS + ("|",) + FEATURES).encode("utf-8")
+).hexdigest()[:8]
+
+
+def _layout(num_words: int, num_offsets: int) -> Tuple[Dict[str, Tuple[int, int]], int]:
+    """Byte offset and length of every array, and where the vocabulary starts."""
+    position = len(_MAGIC) + 3 * _COUNTS_DTYPE.itemsize
+    layout = {}
+    for name, dtype in _ARRAYS:
+        count = num_offsets if name == "sentence_offsets" else num_words
+        position = (position + 7) // 8 * 8
+        layout[name] = (position, count)
+        position += count * np.dtype(dtype).itemsize
+    return layout, position
+
+
+def write_table(path: str, table: TokenTable) -> None:
+    """
+    Write a token table to a file, atomically.
+
+    Args:
+        path: Target file
+        table: Table to store
+    """
+    vocab = "\x00".join(table.vocab).encode("utf-8")
+    layout, vocab_start = _layout(table.num_words, len(table.sentence_offsets))
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(_MAGIC)
+        f.write(
+            np.array(
+                [table.num_words, len(table.sentence_offsets), len(vocab)], dtype=_COUNTS_DTYPE
+            ).tobytes()
+        )
+        for name, dtype in _ARRAYS:
+            f.write(b"\x00" * (layout[name][0] - f.tell()))
+            column = np.ascontiguousarray(getattr(table, name), dtype=np.dtype(dtype).newbyteorder("<"))
+            f.write(column.tobytes())
+        f.write(b"\x00" * (vocab_start - f.tell()))
+        f.write(vocab)
+    os.replace(temp_path, path)
+
+
+def read_table(path: str) -> TokenTable:
+    """
+    Read a stored token table.
+
+    The file is read in one call and the numeric columns are read-only
+    views on its bytes, so nothing is parsed or copied column by column.
+    The vocabulary is decoded. The file is closed on return: tables are
+    kept by the thousand in the paragraph cache, and a table holding a
+    memory mapping would hold a file descriptor with it.
+
+    Args:
+        path: File written by write_table()
+
+    Returns:
+        TokenTable backed by the file's bytes
+
+    Raises:
+        ValueError: If the file is not a stored token table
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    if data[: len(_MAGIC)] != _MAGIC:
+        raise ValueError(f"Not a stored token table: {path}")
+    num_words, num_offsets, vocab_bytes = np.frombuffer(
+        data, dtype=_COUNTS_DTYPE, count=3, offset=len(_MAGIC)
+    ).tolist()
+    layout, vocab_start = _layout(num_words, num_offsets)
+
+    columns = {}
+    for name, dtype in _ARRAYS:
+        offset, count = layout[name]
+        columns[name] = np.frombuffer(
+            data, dtype=np.dtype(dtype).newbyteorder("<"), count=count, offset=offset
+        )
+    vocab_data = data[vocab_start : vocab_start + vocab_bytes].decode("utf-8")
+    vocab = vocab_data.split("\x00") if vocab_bytes else []
+    return TokenTable(vocab=vocab, **columns)
+
+
+class AnnotationStore:
+    """
+    Token tables of annotated texts, stored on disk.
+
+    The API and the CLI store one table per paragraph (see ParagraphCache).
+
+    Tables are keyed by a hash of the normalized text, under a directory per
+    model version (Stanza version and table schema) and processor set, so a
+    Stanza upgrade never reads stale annotations. A lookup is also served by
+    a table annotated with more processors than requested. Each table is one
+    small binary file read in a single call, so metrics can be
+    recomputed over a stored corpus at I/O speed. Disabled (every lookup
+    misses) when no directory is configured.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Initialize the store.
+
+        Args:
+            path: Root directory of the store, or None to disable it
+        """
+        self.path = path
+        self.model_version = f"stanza-{stanza.__version__}_{SCHEMA_VERSION}"
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._writes = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.path is not None
+
+    @staticmethod
+    def _key(text: str) -> str:
+        return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+    def _file(self, key: str, processor_dir: str) -> str:
+        return os.path.join(self.path, self.model_version, processor_dir, key[:2], f"{key}.ttab")
+
+    def _processor_dirs(self, processors: str) -> List[str]:
+        """Directories holding tables usable for some processors, exact match first."""
+        requested = set(processors.split(","))
+        exact = "+".join(processors.split(","))
+        try:
+            stored = os.listdir(os.path.join(self.path, self.model_version))
+        except FileNotFoundError:
+            return []
+        supersets = sorted(
+            name for name in stored if name != exact and requested <= set(name.split("+"))
+        )
+        return ([exact] if exact in stored else []) + supersets
+
+    def get(self, text: str, processors: str) -> Optional[TokenTable]:
+        """
+        Look up the stored table of a text.
+
+        Args:
+            text: Annotated text
+            processors: Processors the text must have been annotated with (at least)
+
+        Returns:
+            The stored table, or None if absent (or the store is disabled)
+        """
+        if self.path is None:
+            return None
+        key = self._key(text)
+        table = None
+        for processor_dir in self._processor_dirs(processors):
+            path = self._file(key, processor_dir)
+            try:
+                table = read_table(path)
+                break
+            except FileNotFoundError:
+                continue
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable stored annotation {path}: {e}")
+        with self._lock:
+            if table is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+        return table
+
+    def put(self, text: str, processors: str, table: TokenTable) -> None:
+        """
+        Store the table of a text (no-op when the store is disabled).
+
+        Args:
+            text: Annotated text
+            processors: Processors the text was annotated with
+            table: Its token table
+        """
+        if self.path is None:
+            return
+        path = self._file(self._key(text), "+".join(processors.split(",")))
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            write_table(path, table)
+        except OSError as e:
+            logger.error(f"Could not store annotation {path}: {e}")
+            return
+        with self._lock:
+            self._writes += 1
+
+    def stats(self) -> Dict[str, object]:
+        """Return lookup and write counters."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "enabled": self.enabled,
+                "hits": self._hits,
+                "misses": self._misses,
+                "writes": self._writes,
+                "hit_ratio": self._hits / lookups if lookups else 0.0,
+            }
+
+
+# Global instance to be used across the application
+annotation_store = AnnotationStore(path=config.annotation_store_path)
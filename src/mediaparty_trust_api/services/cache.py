@@ -0,0 +1,327 @@
+"""Content-addressed cache for article analysis results."""
+
+import asyncio
+import hashlib
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from mediaparty_trust_api.core.config import config
+from mediaparty_trust_api.models import ArticleInput, Metric
+from mediaparty_trust_api.services.metrics import METRICS_VERSION
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+_HORIZONTAL_WHITESPACE = re.compile(r"[^\S\n]+")
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n+")
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalize text so that cosmetic differences do not change its hash.
+
+    Applies Unicode NFC normalization, collapses runs of spaces/tabs, strips
+    every line and reduces blank-line runs to a single paragraph break.
+    Paragraph breaks are preserved because Stanza never lets a sentence
+    cross them, so they can change the analysis result.
+
+    Args:
+        text: Raw text as received from the client
+
+    Returns:
+        Normalized text
+    """
+    text = unicodedata.normalize("NFC", text).replace("\r\n", "\n")
+    text = _HORIZONTAL_WHITESPACE.sub(" ", text)
+    text = "\n".join(line.strip() for line in text.split("\n"))
+    text = _PARAGRAPH_BREAK.sub("\n\n", text)
+    return text.strip()
+
+
+def article_cache_key(
+    article: ArticleInput,
+    metric_names: Iterable[str] = (),
+    options: Optional[Dict[str, str]] = None,
+) -> str:
+    """
+    Build the content-addressed cache key for an article.
+
+    Only the title and body take part in the analysis, so metadata such as
+    the author or link does not affect the key. The metric set version is
+    part of the key, so bumping it invalidates every stored result. So is
+    the metric selection, since different selections give different results,
+    and so are any options changing how a metric is computed.
+
+    Args:
+        article: ArticleInput model containing article details
+        metric_names: Names of the selected metrics
+        options: Metric options of the request, e.g. {"adjective_mode": "fast"}
+
+    Returns:
+        Hex-encoded SHA-256 digest
+    """
+    digest = hashlib.sha256()
+    selection = ",".join(sorted(metric_names))
+    option_values = ",".join(f"{name}={value}" for name, value in sorted((options or {}).items()))
+    for part in (
+        METRICS_VERSION,
+        selection,
+        option_values,
+        normalize_text(article.title),
+        normalize_text(article.body),
+    ):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+def result_etag(key: str) -> str:
+    """
+    Build the strong ETag of an analysis result.
+
+    The tag is the cache key, which already hashes the normalized content,
+    the metric selection and the options, prefixed with the metric set
+    version so a tag can be checked without the article.
+
+    Args:
+        key: Cache key from article_cache_key()
+
+    Returns:
+        Quoted entity tag, e.g. '"3.9f86d0..."'
+    """
+    return f'"{METRICS_VERSION}.{key}"'
+
+
+def etag_cache_key(etag: str) -> Optional[str]:
+    """
+    Recover the cache key from an entity tag of the current metric set version.
+
+    Args:
+        etag: Entity tag, quoted or not, optionally weak (W/ prefix)
+
+    Returns:
+        The cache key, or None when the tag is malformed or from another version
+    """
+    tag = etag.strip()
+    if tag.startswith("W/"):
+        tag = tag[2:]
+    version, _, key = tag.strip('"').partition(".")
+    if version != METRICS_VERSION or len(key) != 64:
+        return None
+    return key
+
+
+class ResultCache:
+    """
+    Two-tier cache of analysis results keyed by article content hash.
+
+    The first tier is a size-bounded in-memory LRU with TTL. The optional
+    second tier is a SQLite file that survives restarts; entries found there
+    are promoted back into memory. All methods are thread-safe. Code on the
+    event loop uses aget() and aset(), which run SQLite reads and commits on
+    a worker thread; memory hits never leave the loop.
+
+    Expired rows are never returned, and are deleted from the file at most
+    once per `purge_interval_seconds`, by a write.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 1024,
+        ttl_seconds: float = 3600.0,
+        path: Optional[str] = None,
+        purge_interval_seconds: float = 60.0,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            max_size: Maximum number of entries kept in memory (0 disables the tier)
+            ttl_seconds: Time to live of an entry, in seconds
+            path: SQLite file for the on-disk tier, or None to disable it
+            purge_interval_seconds: Minimum time between deletions of expired rows
+        """
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.path = path
+        self.purge_interval_seconds = purge_interval_seconds
+        self._memory: "OrderedDict[str, Tuple[float, List[dict]]]" = OrderedDict()
+        # The memory tier and the counters, and the SQLite tier, have their
+        # own locks, so memory lookups never wait for disk I/O
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._last_purge = 0.0
+        self._hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        """Open the SQLite tier on first use. Must hold the database lock."""
+        if self.path is None:
+            return None
+        if self._db is None:
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "key TEXT PRIMARY KEY, created REAL NOT NULL, metrics TEXT NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS results_created ON results (created)")
+            self._db.commit()
+        return self._db
+
+    def _expired(self, created: float) -> bool:
+        return time.time() - created > self.ttl_seconds
+
+    def _get_memory(self, key: str) -> Optional[List[dict]]:
+        """Look a key up in memory, counting a hit."""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and self._expired(entry[0]):
+                del self._memory[key]
+                entry = None
+            if entry is None:
+                return None
+            self._memory.move_to_end(key)
+            self._hits += 1
+            return entry[1]
+
+    def _get_disk(self, key: str) -> Optional[List[dict]]:
+        """Look a key up in the SQLite tier, promoting a hit to memory and counting the outcome."""
+        payload = None
+        with self._db_lock:
+            db = self._connect()
+            if db is not None:
+                row = db.execute(
+                    "SELECT created, metrics FROM results WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and not self._expired(row[0]):
+                    created, payload = row[0], json.loads(row[1])
+        with self._lock:
+            if payload is None:
+                self._misses += 1
+                return None
+            self._store_in_memory(key, created, payload)
+            self._hits += 1
+            self._disk_hits += 1
+        return payload
+
+    def get(self, key: str) -> Optional[List[Metric]]:
+        """
+        Look up a cached result.
+
+        Args:
+            key: Cache key from article_cache_key()
+
+        Returns:
+            The cached list of metrics, or None on a miss
+        """
+        payload = self._get_memory(key)
+        if payload is None:
+            payload = self._get_disk(key)
+        return None if payload is None else [Metric(**item) for item in payload]
+
+    async def aget(self, key: str) -> Optional[List[Metric]]:
+        """Look up a cached result like get(), reading the SQLite tier off the event loop."""
+        payload = self._get_memory(key)
+        if payload is None:
+            if self.path is None:
+                payload = self._get_disk(key)
+            else:
+                payload = await asyncio.to_thread(self._get_disk, key)
+        return None if payload is None else [Metric(**item) for item in payload]
+
+    def _write_disk(self, key: str, created: float, payload: List[dict]) -> None:
+        """Write an entry to the SQLite tier, purging expired rows now and then."""
+        with self._db_lock:
+            db = self._connect()
+            if db is None:
+                return
+            try:
+                db.execute(
+                    "INSERT OR REPLACE INTO results (key, created, metrics) VALUES (?, ?, ?)",
+                    (key, created, json.dumps(payload)),
+                )
+                if created - self._last_purge >= self.purge_interval_seconds:
+                    db.execute(
+                        "DELETE FROM results WHERE created < ?",
+                        (created - self.ttl_seconds,),
+                    )
+                    self._last_purge = created
+                db.commit()
+            except sqlite3.Error as e:
+                logger.error(f"Could not write result to the disk cache: {e}")
+
+    def _set_memory(self, key: str, metrics: List[Metric]) -> Tuple[float, List[dict]]:
+        payload = [metric.model_dump() for metric in metrics]
+        created = time.time()
+        with self._lock:
+            self._store_in_memory(key, created, payload)
+        return created, payload
+
+    def set(self, key: str, metrics: List[Metric]) -> None:
+        """
+        Store a result in every enabled tier.
+
+        Args:
+            key: Cache key from article_cache_key()
+            metrics: Metrics computed for the article
+        """
+        created, payload = self._set_memory(key, metrics)
+        self._write_disk(key, created, payload)
+
+    async def aset(self, key: str, metrics: List[Metric]) -> None:
+        """Store a result like set(), writing the SQLite tier off the event loop."""
+        created, payload = self._set_memory(key, metrics)
+        if self.path is not None:
+            await asyncio.to_thread(self._write_disk, key, created, payload)
+
+    def _store_in_memory(self, key: str, created: float, payload: List[dict]) -> None:
+        """Add an entry to the memory tier, evicting the oldest. Must hold the lock."""
+        if self.max_size <= 0:
+            return
+        self._memory[key] = (created, payload)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_size:
+            self._memory.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop every entry from both tiers and reset the counters."""
+        with self._db_lock:
+            db = self._connect()
+            if db is not None:
+                db.execute("DELETE FROM results")
+                db.commit()
+        with self._lock:
+            self._memory.clear()
+            self._hits = self._disk_hits = self._misses = 0
+
+    def stats(self) -> Dict[str, object]:
+        """Return hit/miss counters and current occupancy."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "disk_hits": self._disk_hits,
+                "misses": self._misses,
+                "hit_ratio": self._hits / lookups if lookups else 0.0,
+                "size": len(self._memory),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "disk_enabled": self.path is not None,
+            }
+
+
+# Global instance to be used across the application
+result_cache = ResultCache(
+    max_size=config.result_cache_size,
+    ttl_seconds=config.result_cache_ttl_seconds,
+    path=config.result_cache_path,
+)
@@ -0,0 +1,56 @@
+"""Splitting of long texts into chunks that can be annotated independently."""
+
+import re
+from typing import List
+
+# Stanza starts a new paragraph at every blank line and never lets a sentence
+# cross one, so chunks made of whole paragraphs annotate exactly as the full text
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+
+
+def split_paragraphs(text: str) -> List[str]:
+    """
+    Split a text at blank lines into its non-empty paragraphs.
+
+    Args:
+        text: Text to split
+
+    Returns:
+        Paragraphs in text order (the whole text when it has none)
+    """
+    return [paragraph for paragraph in _PARAGRAPH_BREAK.split(text) if paragraph.strip()] or [text]
+
+
+def split_text(text: str, max_chars: int) -> List[str]:
+    """
+    Split a text into chunks of at most about max_chars characters.
+
+    Whole paragraphs are packed greedily into chunks. A paragraph longer
+    than max_chars becomes a chunk of its own: splitting it could cut a
+    sentence Stanza would keep whole (e.g. after an abbreviation such as
+    "Sr."), and the chunks would no longer annotate as the full text.
+
+    Args:
+        text: Text to split
+        max_chars: Target maximum chunk length (0 or less disables splitting)
+
+    Returns:
+        Chunks in text order (the whole text when it is short enough)
+    """
+    if max_chars <= 0 or len(text) <= max_chars:
+        return [text]
+
+    chunks: List[str] = []
+    for paragraph in _PARAGRAPH_BREAK.split(text):
+        if paragraph.strip():
+            _pack(chunks, paragraph, "\n\n", max_chars)
+
+    return chunks or [text]
+
+
+def _pack(chunks: List[str], piece: str, separator: str, max_chars: int) -> None:
+    """Append a piece to the last chunk, or start a new chunk when it would not fit."""
+    if chunks and len(chunks[-1]) + len(separator) + len(piece) <= max_chars:
+        chunks[-1] += separator + piece
+    else:
+        chunks.append(piece)
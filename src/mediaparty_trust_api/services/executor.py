@@ -0,0 +1,146 @@
+"""Bounded executor that keeps CPU-heavy and blocking work off the event loop."""
+
+import asyncio
+import contextvars
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+from mediaparty_trust_api.core.config import config
+from mediaparty_trust_api.services.telemetry import telemetry
+
+T = TypeVar("T")
+
+
+class ExecutorBusyError(RuntimeError):
+    """Raised when the executor queue is full and a job cannot be accepted."""
+
+    def __init__(self, retry_after_seconds: int):
+        super().__init__("NLP executor queue is full.")
+        self.retry_after_seconds = retry_after_seconds
+
+
+class BoundedExecutor:
+    """
+    Thread pool with a bounded queue for NLP and LLM work.
+
+    Jobs are rejected immediately with ExecutorBusyError once `max_workers`
+    jobs are running and `max_queue_size` more are waiting, so latency does
+    not pile up under overload. Queue depth and wait times are tracked for
+    reporting.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 2,
+        max_queue_size: int = 16,
+        retry_after_seconds: int = 1,
+    ):
+        """
+        Initialize the executor. Threads are started lazily on first use.
+
+        Args:
+            max_workers: Number of worker threads
+            max_queue_size: Maximum number of jobs waiting for a free worker
+            retry_after_seconds: Value of the Retry-After hint given to rejected clients
+        """
+        self.max_workers = max_workers
+        self.max_queue_size = max_queue_size
+        self.retry_after_seconds = retry_after_seconds
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._running = 0
+        self._completed = 0
+        self._rejected = 0
+        self._wait_seconds_total = 0.0
+        self._wait_seconds_max = 0.0
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="nlp-worker"
+            )
+        return self._pool
+
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        """
+        Run `func(*args)` on a worker thread and await its result.
+
+        The caller's context variables are visible inside the job.
+
+        Args:
+            func: Blocking callable to run
+            *args: Positional arguments for func
+
+        Returns:
+            The value returned by func
+
+        Raises:
+            ExecutorBusyError: If the queue is full
+        """
+        with self._lock:
+            if self._pending >= self.max_workers + self.max_queue_size:
+                self._rejected += 1
+                raise ExecutorBusyError(self.retry_after_seconds)
+            self._pending += 1
+            pool = self._get_pool()
+
+        submitted_at = time.perf_counter()
+        context = contextvars.copy_context()
+
+        def job() -> T:
+            waited = time.perf_counter() - submitted_at
+            with self._lock:
+                self._running += 1
+                self._wait_seconds_total += waited
+                self._wait_seconds_max = max(self._wait_seconds_max, waited)
+            context.run(telemetry.record, "executor.wait", waited)
+            try:
+                return context.run(func, *args)
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self._pending -= 1
+                    self._completed += 1
+
+        def release_if_cancelled(future: Future) -> None:
+            # A job cancelled before it started never runs its own cleanup
+            if future.cancelled():
+                with self._lock:
+                    self._pending -= 1
+
+        future = pool.submit(job)
+        future.add_done_callback(release_if_cancelled)
+        return await asyncio.wrap_future(future)
+
+    def stats(self) -> Dict[str, object]:
+        """Return queue depth, throughput counters and wait times."""
+        with self._lock:
+            started = self._completed + self._running
+            return {
+                "max_workers": self.max_workers,
+                "max_queue_size": self.max_queue_size,
+                "running": self._running,
+                "queue_depth": self._pending - self._running,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "avg_wait_seconds": self._wait_seconds_total / started if started else 0.0,
+                "max_wait_seconds": self._wait_seconds_max,
+            }
+
+    def shutdown(self) -> None:
+        """Stop the worker threads, waiting for running jobs to finish."""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
+
+
+# Global instance to be used across the application
+nlp_executor = BoundedExecutor(
+    max_workers=config.nlp_executor_workers,
+    max_queue_size=config.nlp_executor_queue_size,
+    retry_after_seconds=config.nlp_retry_after_seconds,
+)
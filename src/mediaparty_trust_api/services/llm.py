@@ -0,0 +1,98 @@
+"""LLM helpers for metrics: DSPy signatures sent through the shared OpenRouter client.
+
+Prompts are built and parsed with DSPy's chat adapter, while the request
+itself goes through the pooled async OpenRouter client. This module imports
+dspy, which is slow to import, so metrics import it lazily only when an LLM
+call is actually needed.
+"""
+
+import json
+import logging
+from typing import Dict, List
+
+import dspy
+
+from mediaparty_trust_api.services.openrouter import openrouter_client
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+
+class QualitativeAdjectiveLabels(dspy.Signature):
+    """Label every Spanish adjective lemma of a list as qualitative/calificative or not."""
+
+    adjectives: str = dspy.InputField(
+        desc="Comma-separated list of adjective lemmas extracted from a news article"
+    )
+    labels: str = dspy.OutputField(
+        desc=(
+            "JSON object with one entry for EVERY adjective of the input, copied exactly "
+            "as given, mapped to true if it is qualitative/calificative (it expresses "
+            "opinion or judgment) and to false otherwise."
+        )
+    )
+
+
+# Chain-of-thought variant of the signature (adds a reasoning output field)
+_LABELS_SIGNATURE = dspy.ChainOfThought(QualitativeAdjectiveLabels).predict.signature
+_adapter = dspy.ChatAdapter()
+
+# Completion budget of a labelling call: room for the reasoning, plus one
+# "lemma": bool entry per adjective, so long batches are not truncated
+_BASE_MAX_TOKENS = 400
+_MAX_TOKENS_PER_LEMMA = 16
+
+
+def _parse_labels(raw: str) -> Dict[str, bool]:
+    """Parse the LLM's lemma labels, tolerating non-JSON `lemma: true` lines."""
+    raw = raw.strip()
+    try:
+        parsed = json.loads(raw)
+        if isinstance(parsed, dict):
+            return {
+                str(lemma).strip().lower(): label
+                for lemma, label in parsed.items()
+                if isinstance(label, bool)
+            }
+    except json.JSONDecodeError:
+        pass
+    labels = {}
+    for entry in raw.strip("{}").replace("\n", ",").split(","):
+        lemma, separator, label = entry.partition(":")
+        label = label.strip(" \t'\"").lower()
+        if separator and label in ("true", "false"):
+            labels[lemma.strip(" \t'\"").lower()] = label == "true"
+    return labels
+
+
+async def label_adjectives(lemmas: List[str]) -> Dict[str, bool]:
+    """
+    Ask the LLM which adjective lemmas are qualitative.
+
+    The model labels every lemma explicitly. Lemmas its answer leaves out
+    (e.g. when it is cut short) are left out of the result too, so they
+    stay unknown instead of being taken for non-qualitative.
+
+    Args:
+        lemmas: Distinct, lowercased adjective lemmas
+
+    Returns:
+        Mapping from every input lemma the answer labels to "is qualitative"
+
+    Raises:
+        OpenRouterError: If the API call fails or the circuit breaker is open
+    """
+    messages = _adapter.format(
+        _LABELS_SIGNATURE, demos=[], inputs={"adjectives": ", ".join(lemmas)}
+    )
+    logger.info(f"Labelling {len(lemmas)} adjectives with LLM")
+    content = await openrouter_client.chat(
+        messages, max_tokens=_BASE_MAX_TOKENS + _MAX_TOKENS_PER_LEMMA * len(lemmas)
+    )
+    outputs = _adapter.parse(_LABELS_SIGNATURE, content)
+
+    labels = _parse_labels(str(outputs["labels"]))
+    covered = {lemma: labels[lemma] for lemma in lemmas if lemma in labels}
+    if len(covered) < len(lemmas):
+        logger.warning(f"LLM labelled {len(covered)} of {len(lemmas)} adjectives")
+    return covered
@@ -0,0 +1,155 @@
+"""Cross-request micro-batching of LLM labelling calls."""
+
+import asyncio
+import logging
+import threading
+from typing import Awaitable, Callable, Dict, Generic, Iterable, List, Optional, Set, TypeVar
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Result of an item the label function left out of its answer
+_UNLABELLED = object()
+
+
+class LLMBatcher(Generic[T]):
+    """
+    Collects the items that concurrent requests want labelled into shared LLM calls.
+
+    The first request to ask for an unknown item opens a short window; every
+    item requested by any request during the window is deduplicated and sent
+    in a single call of `label_func` (several calls of at most
+    `max_batch_size` items when there are more). Each request then gets the
+    labels of its own items, except those the call left unlabelled. A request asking for an item that is already
+    waiting or being labelled joins that call instead of adding it again.
+
+    Calls that are under way are not cancelled when a waiting request is,
+    so their results still reach the other requests (and whatever
+    `label_func` persists).
+    """
+
+    def __init__(
+        self,
+        label_func: Callable[[List[str]], Awaitable[Dict[str, T]]],
+        window_seconds: float = 0.05,
+        max_batch_size: int = 64,
+    ):
+        """
+        Initialize the batcher.
+
+        Args:
+            label_func: Labels a list of distinct items in one upstream call,
+                returning the labels it could give (items it leaves out stay
+                unlabelled)
+            window_seconds: How long a batch collects items before it is sent
+            max_batch_size: Maximum number of items per upstream call; a full
+                batch is sent without waiting for the window to end
+        """
+        self.label_func = label_func
+        self.window_seconds = window_seconds
+        self.max_batch_size = max(1, max_batch_size)
+        # Items collected for the next call, and items sent but not labelled yet
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._calls: Set[asyncio.Task] = set()
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._items_requested = 0
+        self._items_sent = 0
+        self._batches = 0
+        self._failures = 0
+
+    async def label(self, items: Iterable[str]) -> Dict[str, T]:
+        """
+        Label items, sharing upstream calls with concurrent requests.
+
+        Args:
+            items: Items to label (duplicates are ignored)
+
+        Returns:
+            Mapping from every labelled item to its label (unlabelled items are absent)
+
+        Raises:
+            Exception: Whatever `label_func` raised for a call covering one of the items
+        """
+        loop = asyncio.get_running_loop()
+        futures: Dict[str, asyncio.Future] = {}
+        for item in dict.fromkeys(items):
+            future = self._pending.get(item) or self._inflight.get(item)
+            if future is None:
+                future = loop.create_future()
+                self._pending[item] = future
+            futures[item] = future
+
+        with self._lock:
+            self._requests += 1
+            self._items_requested += len(futures)
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._pending and self._timer is None:
+            self._timer = loop.call_later(self.window_seconds, self._flush)
+
+        # Shielded: a cancelled request must not cancel a label others wait for
+        labels = await asyncio.gather(*(asyncio.shield(future) for future in futures.values()))
+        return {item: label for item, label in zip(futures, labels) if label is not _UNLABELLED}
+
+    def _flush(self) -> None:
+        """Send every collected item, in calls of at most max_batch_size items."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending = self._pending, {}
+        items = list(pending)
+        for start in range(0, len(items), self.max_batch_size):
+            batch = {item: pending[item] for item in items[start : start + self.max_batch_size]}
+            self._inflight.update(batch)
+            task = asyncio.ensure_future(self._send(batch))
+            self._calls.add(task)
+            task.add_done_callback(self._calls.discard)
+
+    async def _send(self, batch: Dict[str, asyncio.Future]) -> None:
+        """Make one upstream call and hand its labels to the waiting requests."""
+        with self._lock:
+            self._batches += 1
+            self._items_sent += len(batch)
+        try:
+            labels = await self.label_func(list(batch))
+            for item, future in batch.items():
+                if not future.done():
+                    future.set_result(labels.get(item, _UNLABELLED))
+        except Exception as e:
+            with self._lock:
+                self._failures += 1
+            logger.debug(f"Batched LLM call for {len(batch)} items failed: {e}")
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+                    # Mark it retrieved: every waiter may have been cancelled
+                    future.exception()
+        finally:
+            for item, future in batch.items():
+                if not future.done():
+                    future.cancel()
+                if self._inflight.get(item) is future:
+                    del self._inflight[item]
+
+    def stats(self) -> Dict[str, object]:
+        """Return batching counters, including upstream calls per request."""
+        with self._lock:
+            return {
+                "window_seconds": self.window_seconds,
+                "max_batch_size": self.max_batch_size,
+                "requests": self._requests,
+                "items_requested": self._items_requested,
+                "items_sent": self._items_sent,
+                "upstream_calls": self._batches,
+                "failed_calls": self._failures,
+                "calls_per_request": self._batches / self._requests if self._requests else 0.0,
+                "avg_batch_size": self._items_sent / self._batches if self._batches else 0.0,
+                "pending": len(self._pending),
+                "in_flight": len(self._inflight),
+            }
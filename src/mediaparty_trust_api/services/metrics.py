@@ -1,170 +1,91 @@
-"""Metric calculation functions using Stanza NLP analysis."""
+"""Metric calculation functions over token tables extracted from Stanza documents."""
 
-import json
+import contextvars
 import logging
 import os
-import re
-from typing import List
-
-import dspy
-import requests
-from stanza import Document
+from contextlib import contextmanager
+from enum import Enum
+from typing import Dict, Iterator, List, Optional
 
+from mediaparty_trust_api.core.config import config
 from mediaparty_trust_api.models import Metric
+from mediaparty_trust_api.services.adjective_lexicon import qualitative_mask
+from mediaparty_trust_api.services.adjective_store import adjective_label_store
+from mediaparty_trust_api.services.llm_batcher import LLMBatcher
+from mediaparty_trust_api.services.registry import CostClass, register_fallback, register_metric
+from mediaparty_trust_api.services.token_table import TokenTable
 
 # Configure logger
 logger = logging.getLogger(__name__)
 
+# Version of the metric set. Bump it whenever a metric, threshold or
+# explanation changes so that cached results computed by the old code
+# are no longer served.
+METRICS_VERSION = "3"
 
-class OpenRouterLM(dspy.LM):
-    """Custom DSPy LM that uses OpenRouter API directly."""
-
-    def __init__(self, model: str = "google/gemma-2-9b-it:free", **kwargs):
-        self.model = model
-        self.api_key = os.getenv("OPENROUTER_API_KEY")
-        if not self.api_key:
-            raise ValueError("OPENROUTER_API_KEY environment variable not set")
-        self.kwargs = kwargs
-        super().__init__(model=model)
-
-    def __call__(self, prompt=None, messages=None, **kwargs):
-        # Prepare messages
-        if messages is None:
-            messages = [{"role": "user", "content": prompt}]
-
-        logger.info(f"Calling OpenRouter API with model: {self.model}")
-        logger.debug(f"Request messages: {messages}")
-
-        response = requests.post(
-            url="https://openrouter.ai/api/v1/chat/completions",
-            headers={
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json",
-                "HTTP-Referer": os.getenv("SITE_URL", ""),
-                "X-Title": os.getenv("SITE_NAME", "MediaParty Trust API"),
-            },
-            json={
-                "model": self.model,
-                "messages": messages,
-                "temperature": kwargs.get("temperature", 0.1),
-                "top_p": kwargs.get("top_p", 0.9),
-                "max_tokens": kwargs.get("max_tokens", 500),
-            }
-        )
 
-        if response.status_code == 200:
-            result = response.json()
-            if 'choices' in result and len(result['choices']) > 0:
-                content = result['choices'][0]['message']['content']
-                logger.info(f"OpenRouter API call successful. Response length: {len(content)} chars")
-                logger.debug(f"Response content: {content}")
-                # Return in the format DSPy expects
-                return [content]
-            else:
-                logger.error("No response from model")
-                raise ValueError("No response from model")
-        else:
-            logger.error(f"OpenRouter API error: {response.status_code} - {response.text}")
-            raise ValueError(f"API error: {response.status_code} - {response.text}")
+class AdjectiveMode(str, Enum):
+    """How the Qualitative Adjectives metric decides which adjectives are qualitative."""
 
+    # Local lexicon and morphology classifier (see services.adjective_lexicon)
+    FAST = "fast"
+    # Labels from the LLM, cached per lemma
+    LLM = "llm"
+    # Every adjective counts as qualitative
+    RAW = "raw"
 
-class QualitativeAdjectiveFilter(dspy.Signature):
-    """Filter and count qualitative/calificative adjectives from a list."""
 
-    adjectives: str = dspy.InputField(
-        desc="Comma-separated list of adjectives extracted from a news article"
-    )
-    count: str = dspy.OutputField(
-        desc=(
-            "Return ONLY the integer number of qualitative/calificative adjectives. "
-            "No words, explanations, or units—just the integer as text."
-        )
-    )
+# Adjective mode of the current request (config.adjective_mode when unset)
+_adjective_mode: contextvars.ContextVar[Optional[AdjectiveMode]] = contextvars.ContextVar(
+    "adjective_mode", default=None
+)
 
 
-def get_adjective_count(doc: Document, metric_id: int = 1) -> Metric:
-    """
-    Calculate qualitative adjective ratio metric from Stanza document.
+def current_adjective_mode() -> AdjectiveMode:
+    """Adjective mode in effect: the request's, or the deployment default."""
+    return _adjective_mode.get() or AdjectiveMode(config.adjective_mode)
 
-    Analyzes the proportion of qualitative/calificative adjectives in the text.
-    Uses DSPy with OpenRouter LM to filter only subjective adjectives that express opinion or judgment.
-    A healthy ratio indicates objective writing, while too many qualitative adjectives
-    may suggest opinionated or sensationalist content.
 
-    Args:
-        doc: Stanza Document object with linguistic annotations
-        metric_id: Unique identifier for this metric
+def effective_adjective_mode(mode: Optional[AdjectiveMode] = None) -> AdjectiveMode:
+    """
+    Adjective mode actually used: llm runs as fast without an OpenRouter API key.
 
-    Returns:
-        Metric object with qualitative adjective analysis results
+    Args:
+        mode: Requested adjective mode (the one in effect when None)
     """
-    total_words = 0
-    adjectives: List[str] = []
+    mode = mode or current_adjective_mode()
+    if mode == AdjectiveMode.LLM and not os.getenv("OPENROUTER_API_KEY"):
+        return AdjectiveMode.FAST
+    return mode
 
-    # Iterate through all sentences and words to collect adjectives
-    for sentence in doc.sentences:
-        for word in sentence.words:
-            total_words += 1
-            # ADJ is the universal POS tag for adjectives
-            if word.upos == "ADJ":
-                adjectives.append(word.text)
 
-    # If no adjectives found, return early
-    if not adjectives:
-        return Metric(
-            id=metric_id,
-            criteria_name="Qualitative Adjectives",
-            explanation="No adjectives found in the text.",
-            flag=1,
-            score=1.0,
-        )
+@contextmanager
+def adjective_mode_scope(mode: Optional[AdjectiveMode]) -> Iterator[AdjectiveMode]:
+    """
+    Use an adjective mode for the metrics computed inside the block.
 
-    # Use DSPy with OpenRouter to filter qualitative adjectives
-    openrouter_api_key = os.getenv("OPENROUTER_API_KEY")
-    if not openrouter_api_key:
-        # No filtering - use all adjectives if no API key configured
-        qualitative_adjective_count = len(adjectives)
-        logger.warning("OPENROUTER_API_KEY not set, using all adjectives without filtering")
-    else:
-        logger.info("Attempting OpenRouter filtering for qualitative adjectives")
-        filtered_with_llm = False
-        try:
-            # Configure DSPy with custom OpenRouter LM inside a context so async tasks don't conflict
-            lm = OpenRouterLM(model="google/gemma-2-9b-it:free")
-            with dspy.context(lm=lm):
-                # Create DSPy module with signature for input/output validation
-                filter_module = dspy.ChainOfThought(QualitativeAdjectiveFilter)
-
-                # Call the module with adjectives
-                adjectives_str = ", ".join(adjectives)
-                logger.info(f"Filtering {len(adjectives)} adjectives with LLM")
-                result = filter_module(adjectives=adjectives_str)
-
-                # Extract the count from validated output; tolerate stray characters
-                raw_count = str(result.count).strip()
-                match = re.search(r"\d+", raw_count)
-                if not match:
-                    raise ValueError(
-                        f"LLM response did not contain an integer count: '{raw_count}'"
-                    )
-
-                qualitative_adjective_count = int(match.group())
-                filtered_with_llm = True
-                logger.info(
-                    f"LLM filtered to {qualitative_adjective_count} qualitative adjectives"
-                )
-        except Exception as e:
-            # Failover: if OpenRouter fails, skip filtering and use all adjectives
-            logger.error(f"OpenRouter API failed: {e}. Skipping adjective filtering, using all adjectives.")
-            qualitative_adjective_count = len(adjectives)
-        finally:
-            if filtered_with_llm:
-                logger.info("OpenRouter filtering succeeded; LLM-provided count will be used")
-            else:
-                logger.warning(
-                    "OpenRouter filtering unavailable, using raw adjective count instead"
-                )
+    Tasks started inside the block inherit the mode.
 
+    Args:
+        mode: Adjective mode, or None for the deployment default
+
+    Yields:
+        The adjective mode in effect
+    """
+    token = _adjective_mode.set(mode)
+    try:
+        yield current_adjective_mode()
+    finally:
+        _adjective_mode.reset(token)
+
+
+def _qualitative_adjective_metric(
+    qualitative_adjective_count: int,
+    total_words: int,
+    metric_id: int,
+    degraded: bool = False,
+) -> Metric:
+    """Turn a qualitative adjective count into the Qualitative Adjectives metric."""
     # Calculate ratio using qualitative adjectives only
     adjective_ratio = qualitative_adjective_count / total_words if total_words > 0 else 0
 
@@ -191,30 +112,193 @@ def get_adjective_count(doc: Document, metric_id: int = 1) -> Metric:
             f"suggesting opinionated or sensationalist content."
         )
 
+    if degraded:
+        explanation += (
+            " Adjective filtering by the LLM was unavailable, so unlabelled adjectives "
+            "were classified with the local lexicon."
+        )
+
     return Metric(
         id=metric_id,
         criteria_name="Qualitative Adjectives",
         explanation=explanation,
         flag=flag,
         score=score,
+        degraded=degraded,
+    )
+
+
+def _no_adjectives_metric(metric_id: int) -> Metric:
+    return Metric(
+        id=metric_id,
+        criteria_name="Qualitative Adjectives",
+        explanation="No adjectives found in the text.",
+        flag=1,
+        score=1.0,
+    )
+
+
+def _count_with_labels(table: TokenTable, labels: Dict[str, bool]) -> int:
+    """Count qualitative adjectives using per-lemma labels, or the local classifier without one."""
+    adjectives = table.upos_mask("ADJ")
+    local_labels = qualitative_mask(table)[adjectives].tolist()
+    return sum(
+        labels.get(lemma, local_label)
+        for lemma, local_label in zip(table.lemmas(adjectives), local_labels)
+    )
+
+
+async def _label_and_store(lemmas: List[str]) -> Dict[str, bool]:
+    """Label adjective lemmas with the LLM and persist the labels."""
+    # dspy is slow to import, so it is only loaded once an LLM call is needed
+    from mediaparty_trust_api.services.llm import label_adjectives
+
+    new_labels = await label_adjectives(lemmas)
+    adjective_label_store.set_many(new_labels)
+    return new_labels
+
+
+# Global batcher sending the unknown adjective lemmas of concurrent requests
+# to the LLM together
+adjective_label_batcher = LLMBatcher(
+    _label_and_store,
+    window_seconds=config.llm_batch_window_seconds,
+    max_batch_size=config.llm_batch_max_size,
+)
+
+
+@register_metric(0, "qualitative_adjectives", CostClass.LLM, layers=("lemma",))
+async def get_adjective_count(table: TokenTable, metric_id: int = 1) -> Metric:
+    """
+    Calculate qualitative adjective ratio metric from a token table.
+
+    Analyzes the proportion of qualitative/calificative adjectives in the text.
+    How adjectives are judged depends on the adjective mode (see AdjectiveMode):
+
+    - llm: DSPy prompts sent through the shared async OpenRouter client label
+      adjective lemmas as subjective (expressing opinion or judgment) or not.
+      Labels are kept in a persistent store, so only lemmas never seen before
+      are sent to the LLM and the count is computed locally. Lemmas the LLM
+      leaves unlabelled are not stored; they are classified with the local
+      lexicon (as on failure) and asked again next time. The unknown
+      lemmas of concurrent requests are batched into shared LLM calls. If
+      this metric is cancelled (e.g. it missed the latency budget), the LLM
+      call keeps running in the background so its labels are stored for the
+      next request. Without an API key, the fast mode is used instead
+      (see effective_adjective_mode()).
+    - fast: a local lexicon and morphology classifier, with no network call.
+    - raw: every adjective counts as qualitative.
+
+    A healthy ratio indicates objective writing, while too many qualitative adjectives
+    may suggest opinionated or sensationalist content.
+
+    Args:
+        table: TokenTable extracted from the annotated document
+        metric_id: Unique identifier for this metric
+
+    Returns:
+        Metric object with qualitative adjective analysis results
+    """
+    total_words = table.num_words
+    # ADJ is the universal POS tag for adjectives
+    adjective_lemmas: List[str] = table.lemmas(table.upos_mask("ADJ"))
+
+    # If no adjectives found, return early
+    if not adjective_lemmas:
+        return _no_adjectives_metric(metric_id)
+
+    requested_mode = current_adjective_mode()
+    mode = effective_adjective_mode(requested_mode)
+    if mode == AdjectiveMode.RAW:
+        return _qualitative_adjective_metric(len(adjective_lemmas), total_words, metric_id)
+
+    # Use DSPy with OpenRouter to label qualitative adjectives
+    if mode != requested_mode:
+        logger.warning("OPENROUTER_API_KEY not set, classifying adjectives with the local lexicon")
+    if mode == AdjectiveMode.FAST:
+        qualitative_adjective_count = int(qualitative_mask(table).sum())
+        return _qualitative_adjective_metric(qualitative_adjective_count, total_words, metric_id)
+
+    # Only lemmas never judged before go to the LLM
+    distinct_lemmas = sorted(set(adjective_lemmas))
+    labels = adjective_label_store.get_many(distinct_lemmas)
+    unknown_lemmas = [lemma for lemma in distinct_lemmas if lemma not in labels]
+    degraded = False
+
+    if unknown_lemmas:
+        logger.info(
+            f"Attempting OpenRouter labelling for {len(unknown_lemmas)} unknown adjectives"
+        )
+        try:
+            labels.update(await adjective_label_batcher.label(unknown_lemmas))
+            unlabelled = [lemma for lemma in unknown_lemmas if lemma not in labels]
+            if unlabelled:
+                # Left out of the LLM's answer: classified locally this time,
+                # and asked again by the next request
+                logger.warning(
+                    f"LLM left {len(unlabelled)} adjectives unlabelled. Classifying them locally."
+                )
+                degraded = True
+            else:
+                logger.info("OpenRouter labelling succeeded; labels stored for reuse")
+        except Exception as e:
+            # Failover: if OpenRouter fails or its circuit breaker is open,
+            # classify unknown adjectives with the local lexicon
+            logger.error(
+                f"OpenRouter API failed: {e}. Classifying {len(unknown_lemmas)} unlabelled adjectives locally."
+            )
+            degraded = True
+
+    # Count locally from the per-lemma labels
+    qualitative_adjective_count = _count_with_labels(table, labels)
+    return _qualitative_adjective_metric(
+        qualitative_adjective_count, total_words, metric_id, degraded=degraded
+    )
+
+
+@register_fallback("qualitative_adjectives")
+def get_adjective_count_fallback(table: TokenTable, metric_id: int = 1) -> Metric:
+    """
+    Degraded Qualitative Adjectives metric that never calls the LLM.
+
+    Uses the stored LLM labels where available and classifies unlabelled
+    adjectives with the local lexicon. Used when get_adjective_count misses
+    the latency budget.
+
+    Args:
+        table: TokenTable extracted from the annotated document
+        metric_id: Unique identifier for this metric
+
+    Returns:
+        Metric object marked as degraded
+    """
+    adjective_lemmas: List[str] = table.lemmas(table.upos_mask("ADJ"))
+    if not adjective_lemmas:
+        return _no_adjectives_metric(metric_id)
+
+    labels = adjective_label_store.get_many(set(adjective_lemmas))
+    qualitative_adjective_count = _count_with_labels(table, labels)
+    return _qualitative_adjective_metric(
+        qualitative_adjective_count, table.num_words, metric_id, degraded=True
     )
 
 
-def get_word_count(doc: Document, metric_id: int = 2) -> Metric:
+@register_metric(1, "word_count", CostClass.CHEAP, layers=("mwt",))
+def get_word_count(table: TokenTable, metric_id: int = 2) -> Metric:
     """
-    Calculate total word count metric from Stanza document.
+    Calculate total word count metric from a token table.
 
     Analyzes the length of the text. Longer articles tend to be more
     comprehensive and well-researched.
 
     Args:
-        doc: Stanza Document object with linguistic annotations
+        table: TokenTable extracted from the annotated document
         metric_id: Unique identifier for this metric
 
     Returns:
         Metric object with word count analysis results
     """
-    total_words = sum(len(sentence.words) for sentence in doc.sentences)
+    total_words = table.num_words
 
     # Define thresholds
     if total_words >= 500:
@@ -243,21 +327,22 @@ def get_word_count(doc: Document, metric_id: int = 2) -> Metric:
     )
 
 
-def get_sentence_complexity(doc: Document, metric_id: int = 3) -> Metric:
+@register_metric(2, "sentence_complexity", CostClass.CHEAP, layers=("mwt",))
+def get_sentence_complexity(table: TokenTable, metric_id: int = 3) -> Metric:
     """
-    Calculate average sentence length metric from Stanza document.
+    Calculate average sentence length metric from a token table.
 
     Analyzes sentence complexity through average word count per sentence.
     Moderate sentence length indicates readable and well-structured writing.
 
     Args:
-        doc: Stanza Document object with linguistic annotations
+        table: TokenTable extracted from the annotated document
         metric_id: Unique identifier for this metric
 
     Returns:
         Metric object with sentence complexity analysis results
     """
-    sentence_count = len(doc.sentences)
+    sentence_count = table.num_sentences
 
     if sentence_count == 0:
         return Metric(
@@ -268,7 +353,7 @@ def get_sentence_complexity(doc: Document, metric_id: int = 3) -> Metric:
             score=0.0,
         )
 
-    total_words = sum(len(sentence.words) for sentence in doc.sentences)
+    total_words = table.num_words
     avg_sentence_length = total_words / sentence_count
 
     # Define thresholds (ideal range: 15-25 words per sentence)
@@ -299,7 +384,8 @@ def get_sentence_complexity(doc: Document, metric_id: int = 3) -> Metric:
     )
 
 
-def get_verb_tense_analysis(doc: Document, metric_id: int = 4) -> Metric:
+@register_metric(3, "verb_tense", CostClass.NLP, layers=("pos",))
+def get_verb_tense_analysis(table: TokenTable, metric_id: int = 4) -> Metric:
     """
     Analyze verb tense distribution in the document.
 
@@ -307,23 +393,16 @@ def get_verb_tense_analysis(doc: Document, metric_id: int = 4) -> Metric:
     A healthy distribution suggests objective reporting.
 
     Args:
-        doc: Stanza Document object with linguistic annotations
+        table: TokenTable extracted from the annotated document
         metric_id: Unique identifier for this metric
 
     Returns:
         Metric object with verb tense analysis results
     """
-    verb_count = 0
-    past_tense_count = 0
-
-    for sentence in doc.sentences:
-        for word in sentence.words:
-            # VERB is the universal POS tag for verbs
-            if word.upos == "VERB":
-                verb_count += 1
-                # Check if verb is in past tense
-                if word.feats and "Tense=Past" in word.feats:
-                    past_tense_count += 1
+    # VERB is the universal POS tag for verbs
+    verbs = table.upos_mask("VERB")
+    verb_count = int(verbs.sum())
+    past_tense_count = int((verbs & table.feature_mask("Tense=Past")).sum())
 
     if verb_count == 0:
         return Metric(
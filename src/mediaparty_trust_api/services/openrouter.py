@@ -0,0 +1,312 @@
+"""Shared async OpenRouter client with pooling, deadlines, retries and a circuit breaker."""
+
+import asyncio
+import logging
+import os
+import random
+import time
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from mediaparty_trust_api.core.config import config
+from mediaparty_trust_api.services.telemetry import telemetry
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+# Status codes worth retrying: rate limiting and transient upstream failures
+_RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+
+
+class OpenRouterError(RuntimeError):
+    """Raised when an OpenRouter call fails after all retries."""
+
+
+class CircuitOpenError(OpenRouterError):
+    """Raised without calling upstream while the circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    After `failure_threshold` failed calls in a row the circuit opens and
+    calls are refused for `reset_seconds`. Then a single probe call is let
+    through (half-open): success closes the circuit, failure opens it again.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probing = False
+        self.times_opened = 0
+
+    @property
+    def state(self) -> str:
+        """One of "closed", "open" or "half_open"."""
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.reset_seconds:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        """Return whether a call may go upstream now."""
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+
+    def release_probe(self) -> None:
+        """Let another probe through after one was abandoned (e.g. cancelled)."""
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self._probing or self._failures >= self.failure_threshold:
+            if self._opened_at is None or self._probing:
+                self.times_opened += 1
+            self._opened_at = time.monotonic()
+            self._probing = False
+
+
+class OpenRouterClient:
+    """
+    Connection-pooled async client for the OpenRouter chat completions API.
+
+    One HTTP connection pool is shared by every request of the process, so
+    calls reuse TLS connections. Each call has a deadline covering all of
+    its retries, concurrency towards upstream is bounded, failed attempts
+    are retried with jittered exponential backoff, and a circuit breaker
+    fails calls fast while upstream is unhealthy.
+    """
+
+    def __init__(
+        self,
+        base_url: str = "https://openrouter.ai/api/v1",
+        model: str = "google/gemma-2-9b-it:free",
+        timeout_seconds: float = 10.0,
+        max_concurrency: int = 8,
+        max_retries: int = 2,
+        backoff_seconds: float = 0.25,
+        breaker: Optional[CircuitBreaker] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        """
+        Initialize the client. Connections are opened lazily.
+
+        Args:
+            base_url: API base URL; point it at a local stand-in server for tests
+            model: Model used when a call does not specify one
+            timeout_seconds: Default deadline of a call, retries included
+            max_concurrency: Maximum number of calls in flight towards upstream
+            max_retries: Retries after the first attempt of a call
+            backoff_seconds: Base delay of the exponential backoff between retries
+            breaker: Circuit breaker (a default one is created when None)
+            transport: Custom httpx transport, e.g. a mock in tests
+        """
+        self.base_url = base_url.rstrip("/")
+        self.model = model
+        self.timeout_seconds = timeout_seconds
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.breaker = breaker or CircuitBreaker()
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._calls = 0
+        self._attempts = 0
+        self._failures = 0
+        self._short_circuited = 0
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Return the pooled client of the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            # A client is bound to the loop it was created on
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                transport=self._transport,
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency,
+                ),
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._loop = loop
+        return self._client
+
+    def _backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff delay for a retry."""
+        return random.uniform(0, self.backoff_seconds * (2**attempt))
+
+    async def chat(
+        self,
+        messages: List[Dict[str, Any]],
+        model: Optional[str] = None,
+        timeout_seconds: Optional[float] = None,
+        **params: Any,
+    ) -> str:
+        """
+        Send a chat completion request and return the message content.
+
+        Args:
+            messages: Chat messages
+            model: Model name (the client default when None)
+            timeout_seconds: Deadline for the whole call, retries included
+            **params: Sampling parameters (temperature, top_p, max_tokens)
+
+        Returns:
+            Content of the first choice
+
+        Raises:
+            CircuitOpenError: If the circuit breaker is open
+            OpenRouterError: If every attempt failed or the deadline passed
+        """
+        api_key = os.getenv("OPENROUTER_API_KEY")
+        if not api_key:
+            raise OpenRouterError("OPENROUTER_API_KEY environment variable not set")
+
+        self._calls += 1
+        # Only the call let through as the half-open probe may release it
+        probe = self.breaker.state == "half_open"
+        if not self.breaker.allow():
+            self._short_circuited += 1
+            raise CircuitOpenError("OpenRouter circuit breaker is open")
+
+        deadline = time.monotonic() + (timeout_seconds or self.timeout_seconds)
+        payload = {
+            "model": model or self.model,
+            "messages": messages,
+            "temperature": params.get("temperature", 0.1),
+            "top_p": params.get("top_p", 0.9),
+            "max_tokens": params.get("max_tokens", 500),
+        }
+        headers = {
+            "Authorization": f"Bearer {api_key}",
+            "HTTP-Referer": os.getenv("SITE_URL", ""),
+            "X-Title": os.getenv("SITE_NAME", "MediaParty Trust API"),
+        }
+
+        logger.info(f"Calling OpenRouter API with model: {payload['model']}")
+        try:
+            with telemetry.span("llm.openrouter"):
+                return await self._post_with_retries(payload, headers, deadline)
+        finally:
+            # A half-open probe that ended without a verdict (cancelled, or an
+            # unexpected error) must not keep every later call out
+            if probe:
+                self.breaker.release_probe()
+
+    async def _post_with_retries(
+        self, payload: Dict[str, Any], headers: Dict[str, str], deadline: float
+    ) -> str:
+        """Post a request, retrying transient failures until the deadline."""
+        client = self._get_client()
+        last_error: Exception = OpenRouterError("OpenRouter call did not start")
+        for attempt in range(self.max_retries + 1):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            self._attempts += 1
+            retry_after = None
+            try:
+                async with self._semaphore:
+                    response = await client.post(
+                        "/chat/completions",
+                        json=payload,
+                        headers=headers,
+                        timeout=max(deadline - time.monotonic(), 0.001),
+                    )
+                if response.status_code == 200:
+                    content = self._content(response)
+                    self.breaker.record_success()
+                    logger.info(
+                        f"OpenRouter API call successful. Response length: {len(content)} chars"
+                    )
+                    return content
+                last_error = OpenRouterError(
+                    f"API error: {response.status_code} - {response.text}"
+                )
+                if response.status_code not in _RETRYABLE_STATUS:
+                    break
+                retry_after = response.headers.get("Retry-After")
+            except httpx.HTTPError as e:
+                last_error = OpenRouterError(f"{type(e).__name__}: {e}")
+            except OpenRouterError as e:
+                last_error = e
+                break
+
+            if attempt < self.max_retries:
+                delay = self._backoff(attempt)
+                if retry_after is not None and retry_after.isdigit():
+                    delay = max(delay, float(retry_after))
+                if time.monotonic() + delay >= deadline:
+                    break
+                logger.warning(f"OpenRouter attempt {attempt + 1} failed: {last_error}. Retrying")
+                await asyncio.sleep(delay)
+
+        self._failures += 1
+        self.breaker.record_failure()
+        logger.error(f"OpenRouter API error: {last_error}")
+        raise last_error
+
+    @staticmethod
+    def _content(response: httpx.Response) -> str:
+        """Extract the content of the first choice, failing on malformed bodies."""
+        try:
+            result = response.json()
+            choices = result.get("choices") if isinstance(result, dict) else None
+            if not choices:
+                raise OpenRouterError("No response from model")
+            content = choices[0]["message"]["content"]
+        except (ValueError, KeyError, IndexError, TypeError) as e:
+            raise OpenRouterError(f"Malformed response from model: {type(e).__name__}: {e}")
+        if not isinstance(content, str):
+            raise OpenRouterError("No response content from model")
+        return content
+
+    async def aclose(self) -> None:
+        """Close the pooled connections."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def stats(self) -> Dict[str, object]:
+        """Return call counters and the circuit breaker state."""
+        return {
+            "base_url": self.base_url,
+            "calls": self._calls,
+            "attempts": self._attempts,
+            "failures": self._failures,
+            "short_circuited": self._short_circuited,
+            "circuit_state": self.breaker.state,
+            "circuit_opened": self.breaker.times_opened,
+        }
+
+
+# Global instance to be used across the application
+openrouter_client = OpenRouterClient(
+    base_url=config.openrouter_base_url,
+    model=config.openrouter_model,
+    timeout_seconds=config.openrouter_timeout_seconds,
+    max_concurrency=config.openrouter_max_concurrency,
+    max_retries=config.openrouter_max_retries,
+    breaker=CircuitBreaker(
+        failure_threshold=config.openrouter_circuit_failure_threshold,
+        reset_seconds=config.openrouter_circuit_reset_seconds,
+    ),
+)
@@ -0,0 +1,242 @@
+"""Paragraph-level annotation cache, so edited articles only re-annotate what changed."""
+
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple, Union
+
+from mediaparty_trust_api.core.config import config
+from mediaparty_trust_api.services.annotation_store import AnnotationStore, annotation_store
+from mediaparty_trust_api.services.cache import normalize_text
+from mediaparty_trust_api.services.chunking import split_paragraphs
+from mediaparty_trust_api.services.token_table import TokenTable
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+# Annotates a list of paragraphs in one call, one table or failure per paragraph
+Annotate = Callable[[List[str]], List[Union[TokenTable, Exception]]]
+
+
+class ParagraphLookup(NamedTuple):
+    """Paragraphs of some texts found in the cache, and those still to annotate."""
+
+    # Paragraph keys of every text, in order
+    keys: List[List[str]]
+    # Tables of the paragraphs found, by key
+    tables: Dict[str, TokenTable]
+    # Paragraphs to annotate, by key (each distinct paragraph once)
+    missing: Dict[str, str]
+    # Characters of the texts covered by the paragraphs found
+    reused_chars: int
+
+
+class ParagraphCache:
+    """
+    Token tables of single paragraphs, joined into the tables of whole texts.
+
+    Stanza never lets a sentence cross a blank line, so the table of a text
+    is the concatenation of the tables of its paragraphs. Texts are split
+    into paragraphs, each one is looked up by the hash of its normalized
+    text (in memory, then in the annotation store) and only paragraphs never
+    seen before are annotated. A live blog gaining a paragraph, or a story
+    with a corrected sentence, costs the annotation of that paragraph alone.
+    """
+
+    def __init__(self, store: AnnotationStore, max_size: int = 8192, max_call_chars: int = 0):
+        """
+        Initialize the cache.
+
+        Args:
+            store: Annotation store used as the on-disk tier (may be disabled)
+            max_size: Maximum number of paragraph tables kept in memory (0 disables the tier)
+            max_call_chars: Maximum total length of the paragraphs annotated in
+                one call, which bounds memory (0 annotates all missing paragraphs at once)
+        """
+        self.store = store
+        self.max_size = max_size
+        self.max_call_chars = max_call_chars
+        self._memory: "OrderedDict[Tuple[str, str], TokenTable]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._store_hits = 0
+        self._misses = 0
+        self._annotated_chars = 0
+        self._reused_chars = 0
+
+    @staticmethod
+    def _key(paragraph: str) -> str:
+        return hashlib.sha256(normalize_text(paragraph).encode("utf-8")).hexdigest()
+
+    def _get(self, key: str, paragraph: str, processors: str) -> Optional[TokenTable]:
+        """Look a paragraph up in memory, then in the store (promoting it to memory)."""
+        with self._lock:
+            table = self._memory.get((processors, key))
+            if table is not None:
+                self._memory.move_to_end((processors, key))
+                self._hits += 1
+                return table
+        table = self.store.get(paragraph, processors)
+        if table is not None:
+            with self._lock:
+                self._store_hits += 1
+            self._remember(key, processors, table)
+        return table
+
+    def _remember(self, key: str, processors: str, table: TokenTable) -> None:
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._memory[(processors, key)] = table
+            self._memory.move_to_end((processors, key))
+            while len(self._memory) > self.max_size:
+                self._memory.popitem(last=False)
+
+    def _groups(self, paragraphs: List[str]) -> List[List[str]]:
+        """Pack paragraphs, in order, into annotation calls of at most max_call_chars."""
+        if self.max_call_chars <= 0:
+            return [paragraphs]
+        groups: List[List[str]] = []
+        size = 0
+        for paragraph in paragraphs:
+            if not groups or size + len(paragraph) > self.max_call_chars:
+                groups.append([])
+                size = 0
+            groups[-1].append(paragraph)
+            size += len(paragraph)
+        return groups
+
+    def lookup(self, texts: List[str], processors: str) -> ParagraphLookup:
+        """
+        Split texts into paragraphs and look every paragraph up.
+
+        Args:
+            texts: Texts to annotate
+            processors: Processors to annotate them with
+
+        Returns:
+            Tables found, and the distinct paragraphs to annotate
+        """
+        split = [split_paragraphs(text) for text in texts]
+        keys = [[self._key(paragraph) for paragraph in paragraphs] for paragraphs in split]
+
+        tables: Dict[str, TokenTable] = {}
+        missing: Dict[str, str] = {}
+        reused_chars = 0
+        for paragraphs, paragraph_keys in zip(split, keys):
+            for paragraph, key in zip(paragraphs, paragraph_keys):
+                if key in tables or key in missing:
+                    continue
+                table = self._get(key, paragraph, processors)
+                if table is None:
+                    missing[key] = paragraph
+                else:
+                    tables[key] = table
+                    reused_chars += len(paragraph)
+        return ParagraphLookup(keys, tables, missing, reused_chars)
+
+    def complete(
+        self,
+        lookup: ParagraphLookup,
+        processors: str,
+        annotated: List[Union[TokenTable, Exception]],
+    ) -> List[Union[TokenTable, Exception]]:
+        """
+        Keep newly annotated paragraphs and join the tables of whole texts.
+
+        Args:
+            lookup: Result of lookup() for the texts
+            processors: Processors the texts were annotated with
+            annotated: Table (or failure) of every missing paragraph, in the order of lookup.missing
+
+        Returns:
+            Tables (or the failure of one of their paragraphs), in input order
+        """
+        tables: Dict[str, Union[TokenTable, Exception]] = dict(lookup.tables)
+        annotated_chars = 0
+        for (key, paragraph), table in zip(lookup.missing.items(), annotated):
+            tables[key] = table
+            if isinstance(table, TokenTable):
+                annotated_chars += len(paragraph)
+                self._remember(key, processors, table)
+                self.store.put(paragraph, processors, table)
+
+        with self._lock:
+            self._misses += len(lookup.missing)
+            self._annotated_chars += annotated_chars
+            self._reused_chars += lookup.reused_chars
+
+        results: List[Union[TokenTable, Exception]] = []
+        for paragraph_keys in lookup.keys:
+            parts = [tables[key] for key in paragraph_keys]
+            failure = next((part for part in parts if isinstance(part, Exception)), None)
+            results.append(failure if failure is not None else TokenTable.concat(parts))
+        return results
+
+    def create_tables(
+        self, texts: List[str], processors: str, annotate: Annotate
+    ) -> List[Union[TokenTable, Exception]]:
+        """
+        Build the tables of several texts, annotating only their new paragraphs.
+
+        Paragraphs shared by several texts (or repeated in one) are annotated
+        once. Newly annotated paragraphs are kept in memory and in the store.
+
+        Args:
+            texts: Texts to annotate
+            processors: Processors to annotate them with
+            annotate: Annotates a list of paragraphs in one call (only called with misses)
+
+        Returns:
+            Tables (or the failure of one of their paragraphs), in input order
+        """
+        lookup = self.lookup(texts, processors)
+        annotated: List[Union[TokenTable, Exception]] = []
+        if lookup.missing:
+            for group in self._groups(list(lookup.missing.values())):
+                annotated.extend(annotate(group))
+        return self.complete(lookup, processors, annotated)
+
+    def create_table(self, text: str, processors: str, annotate: Annotate) -> TokenTable:
+        """
+        Build the table of a text, annotating only its new paragraphs.
+
+        Args:
+            text: Text to annotate
+            processors: Processors to annotate it with
+            annotate: Annotates a list of paragraphs in one call (only called with misses)
+
+        Returns:
+            TokenTable of the whole text
+
+        Raises:
+            Exception: The failure of the annotation of one of its paragraphs
+        """
+        table = self.create_tables([text], processors, annotate)[0]
+        if isinstance(table, Exception):
+            raise table
+        return table
+
+    def stats(self) -> Dict[str, object]:
+        """Return paragraph hit/miss counters and the share of text reused."""
+        with self._lock:
+            lookups = self._hits + self._store_hits + self._misses
+            chars = self._annotated_chars + self._reused_chars
+            return {
+                "hits": self._hits,
+                "store_hits": self._store_hits,
+                "misses": self._misses,
+                "hit_ratio": (self._hits + self._store_hits) / lookups if lookups else 0.0,
+                "reused_char_ratio": self._reused_chars / chars if chars else 0.0,
+                "size": len(self._memory),
+                "max_size": self.max_size,
+            }
+
+
+# Global instance to be used across the application
+paragraph_cache = ParagraphCache(
+    annotation_store,
+    max_size=config.paragraph_cache_size,
+    max_call_chars=config.annotation_chunk_chars * config.annotation_chunks_in_flight,
+)
@@ -0,0 +1,135 @@
+"""Registry of the metrics computed by the analysis endpoints."""
+
+from enum import Enum
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple, Union
+
+
+class CostClass(str, Enum):
+    """How expensive a metric is to compute, by the slowest stage it needs."""
+
+    # Tokenization only
+    CHEAP = "cheap"
+    # Tagging, lemmatization or parsing
+    NLP = "nlp"
+    # A call to the LLM
+    LLM = "llm"
+
+
+class MetricSpec(NamedTuple):
+    """A registered metric."""
+
+    metric_id: int
+    # Short name used to select the metric in requests
+    name: str
+    cost: CostClass
+    # Stanza annotation layers (processor names) the metric reads
+    layers: Tuple[str, ...]
+    func: Callable
+    # Fast, local replacement used when an async metric fails or misses the budget
+    fallback: Optional[Callable] = None
+
+
+# Registered metrics by name. Populated by the register_metric decorator when
+# the module defining the metrics (services.metrics) is imported.
+METRIC_REGISTRY: Dict[str, MetricSpec] = {}
+
+
+def register_metric(
+    metric_id: int, name: str, cost: CostClass, layers: Iterable[str] = ()
+) -> Callable:
+    """
+    Register a metric function.
+
+    The function takes a TokenTable and a `metric_id` keyword argument and
+    returns a Metric; it may be async.
+
+    Args:
+        metric_id: Id of the metric in responses
+        name: Short name used to select the metric in requests
+        cost: Cost class of the metric
+        layers: Stanza processor names the metric reads, e.g. "mwt", "pos"
+            or "depparse". Prerequisite processors are added automatically.
+
+    Raises:
+        ValueError: If the id or name is already registered
+    """
+
+    def decorator(func: Callable) -> Callable:
+        for spec in METRIC_REGISTRY.values():
+            if spec.metric_id == metric_id or spec.name == name:
+                raise ValueError(f"Metric {name} (id {metric_id}) conflicts with {spec.name}")
+        METRIC_REGISTRY[name] = MetricSpec(metric_id, name, CostClass(cost), tuple(layers), func)
+        return func
+
+    return decorator
+
+
+def register_fallback(name: str) -> Callable:
+    """
+    Register the degraded fallback of an already registered metric.
+
+    The fallback has the same signature as the metric but must be
+    synchronous and cheap, and must not call the LLM.
+
+    Args:
+        name: Name of the registered metric
+    """
+
+    def decorator(func: Callable) -> Callable:
+        METRIC_REGISTRY[name] = METRIC_REGISTRY[name]._replace(fallback=func)
+        return func
+
+    return decorator
+
+
+def select_metrics(selection: Union[None, str, Iterable[str]] = None) -> List[MetricSpec]:
+    """
+    Resolve a metric selection into registered metrics.
+
+    Args:
+        selection: Metric names and/or cost classes ("cheap", "nlp", "llm"),
+            as an iterable or a comma-separated string. None or an empty
+            selection means every metric.
+
+    Returns:
+        Selected metrics, sorted by id
+
+    Raises:
+        ValueError: If a name is neither a registered metric nor a cost class
+    """
+    if isinstance(selection, str):
+        selection = selection.split(",")
+    names = {name.strip() for name in selection or () if name.strip()}
+    if not names:
+        return sorted(METRIC_REGISTRY.values(), key=lambda spec: spec.metric_id)
+
+    cost_classes = {cost.value for cost in CostClass}
+    unknown = names - set(METRIC_REGISTRY) - cost_classes
+    if unknown:
+        raise ValueError(
+            f"Unknown metrics: {', '.join(sorted(unknown))}. "
+            f"Available: {', '.join(METRIC_REGISTRY)} or a cost class ({', '.join(sorted(cost_classes))})."
+        )
+    return sorted(
+        (
+            spec
+            for spec in METRIC_REGISTRY.values()
+            if spec.name in names or spec.cost.value in names
+        ),
+        key=lambda spec: spec.metric_id,
+    )
+
+
+def required_layers(metrics: Optional[Iterable[MetricSpec]] = None) -> Set[str]:
+    """
+    Return the union of the annotation layers needed by some metrics.
+
+    Args:
+        metrics: Registered metrics, or None for every registered metric
+
+    Returns:
+        Set of Stanza processor names
+    """
+    if metrics is None:
+        metrics = METRIC_REGISTRY.values()
+    return {layer for spec in metrics for layer in spec.layers}
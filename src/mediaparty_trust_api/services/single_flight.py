@@ -0,0 +1,79 @@
+"""Coalescing of identical concurrent computations."""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable, TypeVar
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Runs at most one computation per key at a time.
+
+    The first caller for a key starts the computation; callers arriving for
+    the same key while it is in flight wait on the same result instead of
+    starting their own. Errors are raised to every waiter. Cancelling a
+    waiter (e.g. a client disconnecting) does not cancel the shared
+    computation, which keeps running for the others.
+
+    Must be used from a single event loop.
+    """
+
+    def __init__(self):
+        """Initialize with no computation in flight."""
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self._started = 0
+        self._coalesced = 0
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run func() for a key, or join the run already in flight for it.
+
+        Args:
+            key: Identifies equal computations, e.g. an article content hash
+            func: Coroutine function computing the result
+
+        Returns:
+            Result of the shared computation
+
+        Raises:
+            Exception: Whatever the shared computation raised
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self._inflight[key] = task
+            self._started += 1
+            task.add_done_callback(lambda done: self._finish(key, done))
+        else:
+            self._coalesced += 1
+            logger.debug(f"Joining in-flight computation for {key}")
+
+        # Shield so that a cancelled waiter leaves the computation running
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: asyncio.Task) -> None:
+        """Forget a finished computation so later calls start a fresh one."""
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark the exception as retrieved in case every waiter was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the number of started, coalesced and in-flight computations."""
+        calls = self._started + self._coalesced
+        return {
+            "in_flight": len(self._inflight),
+            "started": self._started,
+            "coalesced": self._coalesced,
+            "coalesced_ratio": self._coalesced / calls if calls else 0.0,
+        }
+
+
+# Global instance coalescing /analyze requests by article content hash
+analysis_flight = SingleFlight()
@@ -0,0 +1,350 @@
+"""Adaptive micro-batching of single-text Stanza annotations across requests."""
+
+import asyncio
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from mediaparty_trust_api.services.executor import ExecutorBusyError
+from mediaparty_trust_api.services.telemetry import Spans, telemetry
+from mediaparty_trust_api.services.token_table import TokenTable
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+# Annotation options a batch must share: processors, max_chunk_chars, chunks_in_flight
+BatchKey = Tuple[Optional[str], int, int]
+
+# Weight of the newest inter-arrival time in the moving average
+_ARRIVAL_SMOOTHING = 0.2
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token count estimate: whitespace-separated words."""
+    return text.count(" ") + text.count("\n") + 1
+
+
+class _Request:
+    """One text waiting to be annotated, and the future its caller waits on."""
+
+    __slots__ = ("text", "key", "tokens", "future", "enqueued_at", "dispatched_at")
+
+    def __init__(self, text: str, key: BatchKey):
+        self.text = text
+        self.key = key
+        self.tokens = estimate_tokens(text)
+        self.future: Future = Future()
+        self.enqueued_at = time.perf_counter()
+        self.dispatched_at = self.enqueued_at
+
+
+class StanzaBatcher:
+    """
+    Collects texts submitted by concurrent callers into shared pipeline calls.
+
+    A background thread takes submitted texts off a queue and annotates them
+    in batches, so the tokenizer and taggers run over many texts at once
+    instead of once per request. At most `max_batches_in_flight` batches run
+    at a time (one per Stanza worker in worker-pool mode); texts arriving
+    while every slot is busy simply pile up and form the next batch.
+
+    When a slot is free, the batch is sent right away unless texts have
+    recently been arriving faster than one per `max_window_seconds`, in
+    which case it waits up to that long (from the first text's arrival) for
+    more. A batch stops growing at `max_batch_tokens` estimated tokens. At
+    low traffic texts therefore go straight to the pipeline, as before.
+
+    At most `max_pending` texts may be queued or annotated at a time;
+    submissions that would exceed it are rejected with ExecutorBusyError,
+    like a full NLP executor queue. A submission larger than the cap is
+    accepted when nothing else is pending.
+
+    Callers on the event loop should use submit_many(), which awaits the
+    tables without holding a thread: with the blocking submit(), at most
+    one text per calling thread can be waiting, so batches never grow past
+    the number of threads submitting.
+    """
+
+    def __init__(
+        self,
+        annotate: Callable[[List[str], Optional[str], int, int], List[TokenTable]],
+        max_window_seconds: float = 0.005,
+        max_batch_tokens: int = 8000,
+        max_batches_in_flight: int = 1,
+        max_pending: int = 0,
+        retry_after_seconds: int = 1,
+    ):
+        """
+        Initialize the batcher and start its thread.
+
+        Args:
+            annotate: Annotates a list of texts into token tables, with
+                (texts, processors, max_chunk_chars, chunks_in_flight)
+            max_window_seconds: Longest time a batch waits for more texts
+            max_batch_tokens: Estimated token budget of one batch
+            max_batches_in_flight: Batches annotated at the same time
+            max_pending: Maximum number of texts queued or being annotated (0 for no limit)
+            retry_after_seconds: Value of the Retry-After hint given to rejected clients
+        """
+        self.annotate = annotate
+        self.max_window_seconds = max_window_seconds
+        self.max_batch_tokens = max_batch_tokens
+        self.max_batches_in_flight = max(1, max_batches_in_flight)
+        self.max_pending = max_pending
+        self.retry_after_seconds = retry_after_seconds
+        self._queue: "queue.SimpleQueue[Optional[_Request]]" = queue.SimpleQueue()
+        self._slots = threading.Semaphore(self.max_batches_in_flight)
+        self._pool = ThreadPoolExecutor(
+            max_workers=self.max_batches_in_flight, thread_name_prefix="stanza-batch"
+        )
+        self._lock = threading.Lock()
+        self._closed = False
+        # Moving average of the time between submissions
+        self._arrival_interval: Optional[float] = None
+        self._last_arrival: Optional[float] = None
+        self._batches = 0
+        self._texts = 0
+        self._waited_batches = 0
+        self._pending = 0
+        self._rejected = 0
+        self._thread = threading.Thread(target=self._collect, name="stanza-batcher", daemon=True)
+        self._thread.start()
+
+    def _enqueue(self, texts: List[str], key: BatchKey) -> List[_Request]:
+        """
+        Queue texts for the batcher thread, updating the arrival rate estimate.
+
+        Raises:
+            RuntimeError: If the batcher has been shut down
+            ExecutorBusyError: If the texts would exceed max_pending
+        """
+        requests = [_Request(text, key) for text in texts]
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Stanza batcher is shut down")
+            if (
+                self.max_pending > 0
+                and self._pending > 0
+                and self._pending + len(requests) > self.max_pending
+            ):
+                self._rejected += 1
+                raise ExecutorBusyError(self.retry_after_seconds)
+            self._pending += len(requests)
+            for request in requests:
+                if self._last_arrival is not None:
+                    interval = request.enqueued_at - self._last_arrival
+                    self._arrival_interval = (
+                        interval
+                        if self._arrival_interval is None
+                        else _ARRIVAL_SMOOTHING * interval
+                        + (1 - _ARRIVAL_SMOOTHING) * self._arrival_interval
+                    )
+                self._last_arrival = request.enqueued_at
+        for request in requests:
+            # Resolved, failed or cancelled: the text no longer counts as pending
+            request.future.add_done_callback(self._release)
+            self._queue.put(request)
+        return requests
+
+    def _release(self, future: Future) -> None:
+        with self._lock:
+            self._pending -= 1
+
+    @staticmethod
+    def _record_wait(request: _Request) -> None:
+        telemetry.record("stanza.batch_wait", request.dispatched_at - request.enqueued_at)
+
+    def submit(
+        self,
+        text: str,
+        processors: Optional[str] = None,
+        max_chunk_chars: int = 0,
+        chunks_in_flight: int = 8,
+    ) -> TokenTable:
+        """
+        Annotate one text as part of a batch, blocking until its table is ready.
+
+        The time spent queued is recorded as the `stanza.batch_wait` span, and
+        the spans of the shared batch are added to the current request.
+
+        Args:
+            text: Input text to process
+            processors: Subset of the loaded processors to run (all when None)
+            max_chunk_chars: Maximum chunk length in characters (0 disables chunking)
+            chunks_in_flight: Maximum number of chunks annotated at the same time
+
+        Returns:
+            TokenTable of the text
+
+        Raises:
+            RuntimeError: If the batcher has been shut down
+            ExecutorBusyError: If max_pending texts are already pending
+        """
+        request = self._enqueue([text], (processors, max_chunk_chars, chunks_in_flight))[0]
+        table, spans = request.future.result()
+        self._record_wait(request)
+        telemetry.add_to_request(spans)
+        return table
+
+    async def submit_many(
+        self,
+        texts: List[str],
+        processors: Optional[str] = None,
+        max_chunk_chars: int = 0,
+        chunks_in_flight: int = 8,
+    ) -> List[Union[TokenTable, Exception]]:
+        """
+        Annotate texts as part of batches, awaiting their tables on the event loop.
+
+        Every text is queued on its own, so the texts of one caller may be
+        spread over several batches and share them with those of any number
+        of concurrent callers. Spans are recorded as in submit(). Texts
+        whose caller is cancelled before their batch starts are dropped
+        from it.
+
+        Args:
+            texts: Input texts to process
+            processors: Subset of the loaded processors to run (all when None)
+            max_chunk_chars: Maximum chunk length in characters (0 disables chunking)
+            chunks_in_flight: Maximum number of chunks annotated at the same time
+
+        Returns:
+            Tables (or the failure of their annotation), in input order
+
+        Raises:
+            RuntimeError: If the batcher has been shut down
+            ExecutorBusyError: If the texts would exceed max_pending (none is queued then)
+        """
+        requests = self._enqueue(texts, (processors, max_chunk_chars, chunks_in_flight))
+        results: List[Union[TokenTable, Exception]] = []
+        # Texts annotated in the same batch share its spans: add them once
+        added_spans = set()
+        try:
+            for request in requests:
+                try:
+                    table, spans = await asyncio.wrap_future(request.future)
+                except Exception as e:
+                    results.append(e)
+                    continue
+                self._record_wait(request)
+                if id(spans) not in added_spans:
+                    added_spans.add(id(spans))
+                    telemetry.add_to_request(spans)
+                results.append(table)
+        except asyncio.CancelledError:
+            for request in requests:
+                request.future.cancel()
+            raise
+        return results
+
+    def _busy(self) -> bool:
+        """Whether another text is expected within the batching window."""
+        with self._lock:
+            interval = self._arrival_interval
+        return interval is not None and interval < self.max_window_seconds
+
+    def _collect(self) -> None:
+        """Batcher thread: form batches from the queue and dispatch them."""
+        while True:
+            first = self._queue.get()
+            if first is None:
+                break
+            # Wait for a free slot; texts arriving meanwhile join this batch
+            self._slots.acquire()
+            batch = [first]
+            tokens = first.tokens
+            deadline = first.enqueued_at + self.max_window_seconds if self._busy() else None
+            stop = False
+            while tokens < self.max_batch_tokens:
+                timeout = 0.0 if deadline is None else deadline - time.perf_counter()
+                try:
+                    if timeout > 0:
+                        request = self._queue.get(timeout=timeout)
+                    else:
+                        request = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if request is None:
+                    stop = True
+                    break
+                batch.append(request)
+                tokens += request.tokens
+
+            with self._lock:
+                self._batches += 1
+                self._texts += len(batch)
+                self._waited_batches += deadline is not None
+            telemetry.batch_texts.observe(len(batch))
+            telemetry.batch_tokens.observe(tokens)
+            dispatched_at = time.perf_counter()
+            for request in batch:
+                request.dispatched_at = dispatched_at
+            self._pool.submit(self._run, batch)
+            if stop:
+                break
+
+    def _run(self, batch: List[_Request]) -> None:
+        """Annotate a batch, one pipeline call per set of annotation options."""
+        try:
+            groups: Dict[BatchKey, List[_Request]] = {}
+            for request in batch:
+                # Skip texts whose caller gave up while they were queued
+                if not request.future.set_running_or_notify_cancel():
+                    continue
+                groups.setdefault(request.key, []).append(request)
+            for key, requests in groups.items():
+                self._run_group(key, requests)
+        finally:
+            self._slots.release()
+
+    def _run_group(self, key: BatchKey, requests: List[_Request]) -> None:
+        """Annotate texts sharing annotation options and resolve their callers' futures."""
+        spans: Spans
+        with telemetry.track_request() as spans:
+            try:
+                results = self.annotate([request.text for request in requests], *key)
+            except Exception as e:
+                # Retry one by one so a single bad text only fails its own caller
+                logger.warning(f"Batched annotation of {len(requests)} texts failed ({e}), retrying one by one")
+                results = []
+                for request in requests:
+                    try:
+                        results.append(self.annotate([request.text], *key)[0])
+                    except Exception as e:
+                        results.append(e)
+        batch_spans = list(spans)
+        for request, result in zip(requests, results):
+            if isinstance(result, Exception):
+                request.future.set_exception(result)
+            else:
+                request.future.set_result((result, batch_spans))
+
+    def shutdown(self) -> None:
+        """Annotate the texts already submitted, then stop the batcher thread."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+        self._pool.shutdown(wait=True)
+
+    def stats(self) -> Dict[str, object]:
+        """Return batch counters, the pending texts and the current arrival rate estimate."""
+        with self._lock:
+            return {
+                "max_window_seconds": self.max_window_seconds,
+                "max_batch_tokens": self.max_batch_tokens,
+                "max_batches_in_flight": self.max_batches_in_flight,
+                "batches": self._batches,
+                "texts": self._texts,
+                "avg_batch_texts": self._texts / self._batches if self._batches else 0.0,
+                "waited_batches": self._waited_batches,
+                "pending": self._pending,
+                "max_pending": self.max_pending,
+                "rejected": self._rejected,
+                "arrival_interval_seconds": self._arrival_interval,
+            }
@@ -1,9 +1,172 @@
 """Stanza NLP service for Spanish text analysis."""
 
+import logging
+import multiprocessing
+import signal
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
 import stanza
-from stanza import Document
+from stanza import Document, DownloadMethod
+from stanza.resources.common import DEFAULT_MODEL_DIR
 
 from mediaparty_trust_api.models import Metric
+from mediaparty_trust_api.services.chunking import split_text
+from mediaparty_trust_api.services.stanza_batcher import StanzaBatcher
+from mediaparty_trust_api.services.telemetry import Spans, telemetry
+from mediaparty_trust_api.services.token_table import TokenTable
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+# Stanza processors in pipeline order, and the processors each one needs to
+# run before it
+PIPELINE_PROCESSORS = ("tokenize", "mwt", "pos", "lemma", "depparse")
+_PROCESSOR_REQUIREMENTS = {
+    "tokenize": (),
+    "mwt": ("tokenize",),
+    "pos": ("tokenize", "mwt"),
+    "lemma": ("tokenize", "mwt", "pos"),
+    "depparse": ("tokenize", "mwt", "pos", "lemma"),
+}
+DEFAULT_PROCESSORS = ",".join(PIPELINE_PROCESSORS)
+
+
+def resolve_processors(layers: Iterable[str]) -> str:
+    """
+    Turn the annotation layers requested by metrics into a processor list.
+
+    Adds every prerequisite processor and orders them as Stanza expects.
+    Tokenization is always included.
+
+    Args:
+        layers: Stanza processor names needed by the metrics
+
+    Returns:
+        Comma-separated processor list for stanza.Pipeline
+    """
+    needed = {"tokenize"}
+    for layer in layers:
+        if layer not in _PROCESSOR_REQUIREMENTS:
+            raise ValueError(f"Unknown Stanza processor: {layer}")
+        needed.add(layer)
+        needed.update(_PROCESSOR_REQUIREMENTS[layer])
+    return ",".join(name for name in PIPELINE_PROCESSORS if name in needed)
+
+
+# Short Spanish text annotated once at startup so the first real request does
+# not pay for lazy initialization inside torch and Stanza
+WARMUP_TEXT = (
+    "El gobierno anunció ayer una nueva medida económica. "
+    "Los analistas consideran que es un paso necesario."
+)
+
+
+def download_models(processors: str = DEFAULT_PROCESSORS, model_dir: Optional[str] = None) -> None:
+    """
+    Download the Spanish models for some processors into a model directory.
+
+    Run this at image build time to pre-bake a directory that the API can
+    later load with `offline=True`.
+
+    Args:
+        processors: Comma-separated Stanza processors to download
+        model_dir: Target directory (Stanza's default when None)
+    """
+    stanza.download(
+        "es", model_dir=model_dir or DEFAULT_MODEL_DIR, processors=processors, verbose=True
+    )
+
+
+# Word fields shipped back from annotation workers. Everything else that
+# Stanza attaches to a word (offsets, misc, ...) is dropped to keep the
+# payload small.
+_COMPACT_WORD_FIELDS = ("id", "text", "lemma", "upos", "xpos", "feats", "head", "deprel")
+
+# Compact annotation of one document: a list of sentences, each a list of word dicts
+CompactAnnotation = List[List[Dict[str, object]]]
+
+
+def _compact_annotation(doc: Document) -> CompactAnnotation:
+    """Reduce a Stanza Document to the word fields the metrics read."""
+    return [
+        [
+            {
+                field: getattr(word, field)
+                for field in _COMPACT_WORD_FIELDS
+                if getattr(word, field) is not None
+            }
+            for word in sentence.words
+        ]
+        for sentence in doc.sentences
+    ]
+
+
+def _init_annotation_worker() -> None:
+    """Prepare a freshly forked annotation worker."""
+    import torch
+
+    # The parent process handles shutdown signals for the whole pool
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    # One intra-op thread per worker: parallelism comes from the pool itself
+    torch.set_num_threads(1)
+
+
+def _run_pipeline(
+    nlp: stanza.Pipeline, docs: List[Document], processors: Optional[str] = None
+) -> List[Document]:
+    """
+    Run a pipeline over documents one processor at a time, timing each processor.
+
+    Equivalent to `nlp(docs, processors=processors)`, which runs the same
+    processors in the same order, but records a `stanza.<processor>` span
+    for each of them.
+    """
+    names = set(PIPELINE_PROCESSORS if processors is None else processors.split(","))
+    # Stanza adds mwt itself whenever the language needs it
+    if "tokenize" in names and "mwt" in nlp.processors:
+        names.add("mwt")
+    for name in PIPELINE_PROCESSORS:
+        processor = nlp.processors.get(name)
+        if name in names and processor is not None:
+            with telemetry.span(f"stanza.{name}"):
+                docs = processor.bulk_process(docs)
+    return docs
+
+
+def _tables_from_docs(docs: List[Document]) -> List[TokenTable]:
+    """Extract the token tables of annotated documents, timing the extraction."""
+    with telemetry.span("stanza.token_table"):
+        return [TokenTable.from_doc(doc) for doc in docs]
+
+
+def _annotate_in_worker(
+    texts: List[str], processors: Optional[str] = None
+) -> Tuple[List[CompactAnnotation], Spans]:
+    """Annotate texts with the pipeline inherited from the parent process."""
+    with telemetry.track_request() as spans:
+        docs = _run_pipeline(
+            stanza_service._nlp, [Document([], text=text) for text in texts], processors
+        )
+        return [_compact_annotation(doc) for doc in docs], spans
+
+
+def _tables_in_worker(
+    texts: List[str], processors: Optional[str] = None
+) -> Tuple[List[TokenTable], Spans]:
+    """Annotate texts in a worker and return their token tables."""
+    with telemetry.track_request() as spans:
+        docs = _run_pipeline(
+            stanza_service._nlp, [Document([], text=text) for text in texts], processors
+        )
+        return _tables_from_docs(docs), spans
+
+
+def _ping_worker() -> bool:
+    return stanza_service._nlp is not None
 
 
 class StanzaService:
@@ -12,33 +175,212 @@ class StanzaService:
 
     This service manages the Stanza Spanish language model and provides
     methods for text analysis.
+
+    By default texts are annotated in the calling process. In worker-pool
+    mode the models are loaded once in this process and N annotation
+    workers are forked from it, sharing the model weights copy-on-write.
+    Texts are then sent to the workers, which return compact annotations
+    that are rebuilt into lightweight Documents.
+
+    Optionally, texts annotated with create_table() or create_tables_batched()
+    by concurrent callers are collected by a StanzaBatcher and annotated
+    together.
     """
 
     def __init__(self):
         """Initialize the StanzaService with no model loaded."""
         self._nlp = None
+        self._processors: Optional[str] = None
+        self._ready = False
+        self.startup_timings: Dict[str, float] = {}
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._num_workers = 0
+        self._batcher: Optional[StanzaBatcher] = None
 
-    def initialize(self):
+    def initialize(
+        self,
+        processors: str = DEFAULT_PROCESSORS,
+        num_workers: int = 0,
+        model_dir: Optional[str] = None,
+        offline: bool = False,
+        batch_window_seconds: Optional[float] = None,
+        batch_max_tokens: int = 8000,
+        batch_max_pending: int = 0,
+    ):
         """
         Initialize the Spanish Stanza model.
 
-        This method downloads the Spanish model if not present and loads it.
-        Should be called during application startup.
+        This method downloads the Spanish model if not present and loads it,
+        then runs a warm-up document through the pipeline. Should be called
+        during application startup. The duration of every phase is logged
+        and kept in `startup_timings`. Equivalent to load() followed by
+        complete_startup().
+
+        Args:
+            processors: Comma-separated Stanza processors to load, usually
+                resolve_processors() applied to the layers the metrics need
+            num_workers: Number of annotation worker processes to fork after
+                loading the models (0 annotates in the calling process)
+            model_dir: Stanza model directory (Stanza's default when None)
+            offline: Load models and resources.json from model_dir only,
+                never touching the network. The directory must be pre-baked
+                with download_models().
+            batch_window_seconds: Start a StanzaBatcher for create_table() and
+                create_tables_batched() calls waiting at most this long for
+                more texts (no batching when None)
+            batch_max_tokens: Estimated token budget of one batch
+            batch_max_pending: Maximum number of texts waiting for or in a
+                batch, beyond which submissions are rejected (0 for no limit)
+        """
+        self.load(processors, num_workers=num_workers, model_dir=model_dir, offline=offline)
+        self.complete_startup(
+            batch_window_seconds=batch_window_seconds,
+            batch_max_tokens=batch_max_tokens,
+            batch_max_pending=batch_max_pending,
+        )
+
+    def load(
+        self,
+        processors: str = DEFAULT_PROCESSORS,
+        num_workers: int = 0,
+        model_dir: Optional[str] = None,
+        offline: bool = False,
+    ):
+        """
+        Download (unless offline) and load the models, then fork the workers, if any.
+
+        In worker-pool mode, call this from the main thread before any other
+        thread of the process is busy (e.g. before an application starts
+        serving): forking copies the locks other threads hold at that moment.
+
+        Args:
+            processors: Comma-separated Stanza processors to load
+            num_workers: Number of annotation worker processes to fork
+                (0 annotates in the calling process)
+            model_dir: Stanza model directory (Stanza's default when None)
+            offline: Load models and resources.json from model_dir only
+        """
+        model_dir = model_dir or DEFAULT_MODEL_DIR
+        self._ready = False
+        self.startup_timings = {}
+
+        if offline:
+            download_method = None
+        else:
+            # Download Spanish model if not already downloaded
+            with self._phase("download"):
+                download_models(processors, model_dir)
+            download_method = DownloadMethod.REUSE_RESOURCES
+
+        # Initialize the Spanish pipeline with only the processors in use
+        with self._phase("load"):
+            self._nlp = stanza.Pipeline(
+                lang="es",
+                dir=model_dir,
+                processors=processors,
+                download_method=download_method,
+                verbose=False,
+            )
+        self._processors = processors
+        logger.info(f"Stanza pipeline loaded with processors: {processors}")
+
+        if num_workers > 0:
+            with self._phase("fork_workers"):
+                self.start_workers(num_workers)
+
+    def complete_startup(
+        self,
+        batch_window_seconds: Optional[float] = None,
+        batch_max_tokens: int = 8000,
+        batch_max_pending: int = 0,
+        retry_after_seconds: int = 1,
+    ) -> None:
+        """
+        Warm the loaded pipeline up, start the batcher and mark the service ready.
+
+        Args:
+            batch_window_seconds: Start a StanzaBatcher waiting at most this
+                long for more texts (no batching when None)
+            batch_max_tokens: Estimated token budget of one batch
+            batch_max_pending: Maximum number of texts waiting for or in a
+                batch, beyond which submissions are rejected (0 for no limit)
+            retry_after_seconds: Value of the Retry-After hint given to rejected clients
+        """
+        with self._phase("warm_up"):
+            self.warm_up()
+
+        if batch_window_seconds is not None:
+            self._batcher = StanzaBatcher(
+                self.create_tables,
+                max_window_seconds=batch_window_seconds,
+                max_batch_tokens=batch_max_tokens,
+                # One batch per worker, so every worker is kept busy
+                max_batches_in_flight=max(1, self._num_workers),
+                max_pending=batch_max_pending,
+                retry_after_seconds=retry_after_seconds,
+            )
+        self._ready = True
+
+    @contextmanager
+    def _phase(self, name: str):
+        """Time one startup phase and log its duration."""
+        started = time.perf_counter()
+        yield
+        elapsed = time.perf_counter() - started
+        self.startup_timings[name] = elapsed
+        logger.info(f"Stanza startup phase '{name}' took {elapsed:.2f}s")
+
+    def warm_up(self) -> None:
+        """
+        Run a short dummy document through the pipeline.
+
+        In worker-pool mode every worker gets one, so each of them has paid
+        its lazy initialization before real traffic arrives.
+        """
+        self.create_tables([WARMUP_TEXT] * max(1, self._num_workers))
+
+    def start_workers(self, num_workers: int) -> None:
         """
-        # Download Spanish model if not already downloaded
-        stanza.download("es", verbose=True)
+        Fork annotation workers that share the already loaded models.
 
-        # Initialize the Spanish pipeline with common processors
-        self._nlp = stanza.Pipeline(
-            lang="es", processors="tokenize,mwt,pos,lemma,depparse", verbose=False
+        Must run before this process annotates anything: torch's thread
+        pools are not fork-safe once they have been used.
+
+        Args:
+            num_workers: Number of worker processes
+        """
+        if self._nlp is None:
+            raise RuntimeError("Stanza model not initialized. Call initialize() first.")
+
+        self._pool = ProcessPoolExecutor(
+            max_workers=num_workers,
+            mp_context=multiprocessing.get_context("fork"),
+            initializer=_init_annotation_worker,
         )
+        # With the fork start method the whole pool is forked on the first
+        # submission, so do it now while the process is still quiet.
+        self._pool.submit(_ping_worker).result()
+        self._num_workers = num_workers
+        logger.info(f"Forked {num_workers} Stanza annotation workers")
+
+    def shutdown(self) -> None:
+        """Stop the batcher and the annotation workers, if any."""
+        self._ready = False
+        if self._batcher is not None:
+            self._batcher.shutdown()
+            self._batcher = None
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+            self._num_workers = 0
 
-    def create_doc(self, text: str) -> Document:
+    def create_doc(self, text: str, processors: Optional[str] = None) -> Document:
         """
         Create a Stanza Document from input text.
 
         Args:
             text: Input text to process
+            processors: Subset of the loaded processors to run (all when None)
 
         Returns:
             Stanza Document object with linguistic annotations
@@ -49,13 +391,233 @@ class StanzaService:
         if self._nlp is None:
             raise RuntimeError("Stanza model not initialized. Call initialize() first.")
 
-        return self._nlp(text)
+        return self.create_docs([text], processors=processors)[0]
+
+    def create_docs(
+        self, texts: List[str], processors: Optional[str] = None
+    ) -> List[Document]:
+        """
+        Create Stanza Documents for several texts in one pipeline call.
+
+        The texts are annotated together, so the tokenizer and tagger run
+        with full batches instead of once per text. In worker-pool mode the
+        texts are split evenly across the workers.
+
+        Args:
+            texts: Input texts to process
+            processors: Subset of the loaded processors to run (all when None)
+
+        Returns:
+            Stanza Document objects, in the same order as the input texts
+
+        Raises:
+            RuntimeError: If the model hasn't been initialized
+        """
+        if self._nlp is None:
+            raise RuntimeError("Stanza model not initialized. Call initialize() first.")
+
+        if not texts:
+            return []
+
+        if self._pool is not None:
+            annotations = self._map_workers(
+                partial(_annotate_in_worker, processors=processors), texts
+            )
+            return [
+                Document(annotation, text=text)
+                for annotation, text in zip(annotations, texts)
+            ]
+
+        return _run_pipeline(
+            self._nlp, [Document([], text=text) for text in texts], processors
+        )
+
+    def create_table(
+        self,
+        text: str,
+        processors: Optional[str] = None,
+        max_chunk_chars: int = 0,
+        chunks_in_flight: int = 8,
+    ) -> TokenTable:
+        """
+        Annotate a text and extract its token table.
+
+        In worker-pool mode the table is built inside the worker, so only
+        the compact arrays cross the process boundary. Long texts are
+        annotated in chunks (see create_tables()). When batching is enabled,
+        the text is annotated together with those of concurrent callers.
+
+        Args:
+            text: Input text to process
+            processors: Subset of the loaded processors to run (all when None)
+            max_chunk_chars: Maximum chunk length in characters (0 disables chunking)
+            chunks_in_flight: Maximum number of chunks annotated at the same time
+
+        Returns:
+            TokenTable with one row per word
+
+        Raises:
+            RuntimeError: If the model hasn't been initialized
+        """
+        if self._batcher is not None:
+            return self._batcher.submit(
+                text,
+                processors=processors,
+                max_chunk_chars=max_chunk_chars,
+                chunks_in_flight=chunks_in_flight,
+            )
+        return self.create_tables(
+            [text],
+            processors=processors,
+            max_chunk_chars=max_chunk_chars,
+            chunks_in_flight=chunks_in_flight,
+        )[0]
+
+    async def create_tables_batched(
+        self,
+        texts: List[str],
+        processors: Optional[str] = None,
+        max_chunk_chars: int = 0,
+        chunks_in_flight: int = 8,
+    ) -> List[Union[TokenTable, Exception]]:
+        """
+        Annotate texts together with those of concurrent callers, from the event loop.
+
+        Each text joins the batcher's queue and its table is awaited without
+        holding a thread, so the texts of every request in flight can share
+        one pipeline call. Requires batching (see is_batching).
+
+        Args:
+            texts: Input texts to process
+            processors: Subset of the loaded processors to run (all when None)
+            max_chunk_chars: Maximum chunk length in characters (0 disables chunking)
+            chunks_in_flight: Maximum number of chunks annotated at the same time
+
+        Returns:
+            TokenTables (or the failure of their annotation), in input order
+
+        Raises:
+            RuntimeError: If batching is not enabled
+        """
+        if self._batcher is None:
+            raise RuntimeError("Stanza batching is not enabled.")
+        return await self._batcher.submit_many(
+            texts,
+            processors=processors,
+            max_chunk_chars=max_chunk_chars,
+            chunks_in_flight=chunks_in_flight,
+        )
+
+    def create_tables(
+        self,
+        texts: List[str],
+        processors: Optional[str] = None,
+        max_chunk_chars: int = 0,
+        chunks_in_flight: int = 8,
+    ) -> List[TokenTable]:
+        """
+        Annotate several texts in one pipeline call and extract their token tables.
+
+        Texts longer than max_chunk_chars are split into chunks at paragraph
+        boundaries. Chunks are annotated in
+        groups of chunks_in_flight, spread across the workers in worker-pool
+        mode, and only their compact tables are kept, so a very long text
+        never becomes one huge Stanza Document. The chunk tables of each
+        text are then joined back into a single table.
+
+        Args:
+            texts: Input texts to process
+            processors: Subset of the loaded processors to run (all when None)
+            max_chunk_chars: Maximum chunk length in characters (0 disables chunking)
+            chunks_in_flight: Maximum number of chunks annotated at the same time
+
+        Returns:
+            TokenTables, in the same order as the input texts
+
+        Raises:
+            RuntimeError: If the model hasn't been initialized
+        """
+        if self._nlp is None:
+            raise RuntimeError("Stanza model not initialized. Call initialize() first.")
+
+        if not texts:
+            return []
+
+        chunked = [split_text(text, max_chunk_chars) for text in texts]
+        chunks = [chunk for text_chunks in chunked for chunk in text_chunks]
+        if len(chunks) == len(texts):
+            return self._annotate_tables(texts, processors)
+
+        chunk_tables: List[TokenTable] = []
+        group_size = max(1, chunks_in_flight)
+        for start in range(0, len(chunks), group_size):
+            chunk_tables.extend(
+                self._annotate_tables(chunks[start : start + group_size], processors)
+            )
+
+        tables = []
+        start = 0
+        for text_chunks in chunked:
+            tables.append(TokenTable.concat(chunk_tables[start : start + len(text_chunks)]))
+            start += len(text_chunks)
+        return tables
+
+    def _annotate_tables(
+        self, texts: List[str], processors: Optional[str]
+    ) -> List[TokenTable]:
+        """Annotate texts in one pipeline call (or one call per worker) into tables."""
+        if self._pool is not None:
+            return self._map_workers(
+                partial(_tables_in_worker, processors=processors), texts
+            )
+
+        return _tables_from_docs(self.create_docs(texts, processors=processors))
+
+    def _map_workers(self, func, texts: List[str]) -> list:
+        """
+        Split texts evenly across the workers and gather results in input order.
+
+        The spans timed inside the workers are recorded in this process.
+        """
+        num_chunks = min(self._num_workers, len(texts))
+        chunks = [texts[i::num_chunks] for i in range(num_chunks)]
+        futures = [self._pool.submit(func, chunk) for chunk in chunks]
+        results: list = [None] * len(texts)
+        for i, future in enumerate(futures):
+            chunk_results, spans = future.result()
+            for name, seconds in spans:
+                telemetry.record(name, seconds)
+            for j, result in enumerate(chunk_results):
+                results[i + j * num_chunks] = result
+        return results
 
     @property
     def is_initialized(self) -> bool:
         """Check if the Stanza model is initialized."""
         return self._nlp is not None
 
+    @property
+    def is_ready(self) -> bool:
+        """Check if the Stanza model is initialized and warmed up."""
+        return self._ready
+
+    @property
+    def is_batching(self) -> bool:
+        """Check if annotations of concurrent callers are batched."""
+        return self._batcher is not None
+
+    def stats(self) -> Dict[str, object]:
+        """Return the annotation mode, worker count and batching counters."""
+        return {
+            "initialized": self.is_initialized,
+            "ready": self.is_ready,
+            "processors": self._processors,
+            "mode": "worker_pool" if self._pool is not None else "in_process",
+            "workers": self._num_workers,
+            "batching": self._batcher.stats() if self._batcher is not None else None,
+            "startup_timings": self.startup_timings,
+        }
+
 
 # Global instance to be used across the application
 stanza_service = StanzaService()
@@ -0,0 +1,207 @@
+"""Timing spans, histograms and Prometheus text export for the analysis hot path."""
+
+import bisect
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+# Span durations, in seconds, from sub-millisecond metric loops to slow LLM calls
+DURATION_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0
+)
+
+# Analyzed text lengths, in characters, from short posts to live blogs
+TEXT_LENGTH_BUCKETS = (500, 1000, 2500, 5000, 10000, 25000, 50000, 100000, 250000)
+
+# Stanza batch sizes, in texts and in (estimated) tokens
+BATCH_TEXTS_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
+BATCH_TOKENS_BUCKETS = (100, 250, 500, 1000, 2500, 5000, 10000, 25000, 50000)
+
+# (name, seconds) spans recorded while handling the current request, or None
+# outside a request. The list is shared with executor jobs, which run in a
+# copy of the request's context.
+Spans = List[Tuple[str, float]]
+_request_spans: contextvars.ContextVar[Optional[Spans]] = contextvars.ContextVar(
+    "request_spans", default=None
+)
+
+
+class Histogram:
+    """Prometheus-style cumulative histogram with one optional label. Thread-safe."""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        buckets: Sequence[float],
+        label: Optional[str] = None,
+    ):
+        """
+        Initialize an empty histogram.
+
+        Args:
+            name: Metric name in the exposition format
+            documentation: HELP text
+            buckets: Sorted upper bounds of the buckets (+Inf is implicit)
+            label: Name of the label distinguishing series, if any
+        """
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(buckets)
+        self.label = label
+        # Per label value: bucket counts (the last bucket is +Inf) and sum
+        self._counts: Dict[str, List[int]] = {}
+        self._sums: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, label_value: str = "") -> None:
+        """Record one observation."""
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._counts.get(label_value)
+            if counts is None:
+                counts = self._counts[label_value] = [0] * (len(self.buckets) + 1)
+                self._sums[label_value] = 0.0
+            counts[index] += 1
+            self._sums[label_value] += value
+
+    def render(self) -> List[str]:
+        """Return the histogram in Prometheus text exposition format."""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = [
+                (label_value, list(counts), self._sums[label_value])
+                for label_value, counts in sorted(self._counts.items())
+            ]
+        bounds = [repr(float(bound)) for bound in self.buckets] + ["+Inf"]
+        for label_value, counts, total in series:
+            label = f'{self.label}="{label_value}"' if self.label else ""
+            cumulative = 0
+            for bound, bucket_count in zip(bounds, counts):
+                cumulative += bucket_count
+                le = f'{label},le="{bound}"' if label else f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{{{le}}} {cumulative}")
+            suffix = f"{{{label}}}" if label else ""
+            lines.append(f"{self.name}_sum{suffix} {total}")
+            lines.append(f"{self.name}_count{suffix} {cumulative}")
+        return lines
+
+
+class Telemetry:
+    """
+    Timing spans of the analysis hot path.
+
+    Every span (a Stanza processor, a metric function, an LLM call...) is
+    recorded in a duration histogram labelled by stage name, and appended
+    to the spans of the current request when one is being tracked, so they
+    can be returned in a Server-Timing header.
+    """
+
+    def __init__(self):
+        """Initialize empty histograms."""
+        self.stage_seconds = Histogram(
+            "mediaparty_stage_duration_seconds",
+            "Duration of analysis stages (Stanza processors, metrics, LLM calls).",
+            DURATION_BUCKETS,
+            label="stage",
+        )
+        self.text_length = Histogram(
+            "mediaparty_text_length_chars",
+            "Length of the analyzed texts in characters.",
+            TEXT_LENGTH_BUCKETS,
+        )
+        self.batch_texts = Histogram(
+            "mediaparty_stanza_batch_texts",
+            "Texts annotated together in one batch of the Stanza batcher.",
+            BATCH_TEXTS_BUCKETS,
+        )
+        self.batch_tokens = Histogram(
+            "mediaparty_stanza_batch_tokens",
+            "Estimated tokens annotated together in one batch of the Stanza batcher.",
+            BATCH_TOKENS_BUCKETS,
+        )
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        """Time the enclosed block as the stage `name`."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def record(self, name: str, seconds: float) -> None:
+        """Record a stage duration measured elsewhere (e.g. in a worker process)."""
+        self.stage_seconds.observe(seconds, name)
+        spans = _request_spans.get()
+        if spans is not None:
+            spans.append((name, seconds))
+
+    def add_to_request(self, spans: Iterable[Tuple[str, float]]) -> None:
+        """
+        Append spans already recorded elsewhere to the current request, if any.
+
+        Used for work shared by several requests (e.g. one Stanza batch): the
+        histograms count it once, but every request shows it in its timings.
+        """
+        request_spans = _request_spans.get()
+        if request_spans is not None:
+            request_spans.extend(spans)
+
+    def observe_text_length(self, length: int) -> None:
+        """Record the length of an analyzed text."""
+        self.text_length.observe(length)
+
+    @contextmanager
+    def track_request(self) -> Iterator[Spans]:
+        """Collect the spans recorded in the current context (request) into a list."""
+        spans: Spans = []
+        token = _request_spans.set(spans)
+        try:
+            yield spans
+        finally:
+            _request_spans.reset(token)
+
+    def render(self, samples: Iterable[Tuple[str, str, str, float]] = ()) -> str:
+        """
+        Render every histogram plus extra samples in Prometheus text format.
+
+        Args:
+            samples: (name, type, help, value) of gauges and counters owned
+                by other services, e.g. queue depth or cache hits
+
+        Returns:
+            Text exposition body
+        """
+        lines = []
+        for histogram in (
+            self.stage_seconds,
+            self.text_length,
+            self.batch_texts,
+            self.batch_tokens,
+        ):
+            lines.extend(histogram.render())
+        for name, kind, documentation, value in samples:
+            lines.append(f"# HELP {name} {documentation}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def server_timing(spans: Iterable[Tuple[str, float]]) -> str:
+    """
+    Format request spans as a Server-Timing header value.
+
+    Spans with the same name (e.g. several chunks or documents) are summed.
+    Durations are in milliseconds.
+    """
+    totals: Dict[str, float] = {}
+    for name, seconds in spans:
+        totals[name] = totals.get(name, 0.0) + seconds
+    return ", ".join(f"{name};dur={seconds * 1000:.1f}" for name, seconds in totals.items())
+
+
+# Global instance to be used across the application
+telemetry = Telemetry()
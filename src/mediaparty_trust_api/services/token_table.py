@@ -0,0 +1,202 @@
+"""Compact, array-backed view of a Stanza document for metric calculations."""
+
+from typing import Dict, List
+
+import numpy as np
+from stanza import Document
+
+# Universal POS tags, encoded as their index in this tuple
+UPOS_TAGS = (
+    "ADJ",
+    "ADP",
+    "ADV",
+    "AUX",
+    "CCONJ",
+    "DET",
+    "INTJ",
+    "NOUN",
+    "NUM",
+    "PART",
+    "PRON",
+    "PROPN",
+    "PUNCT",
+    "SCONJ",
+    "SYM",
+    "VERB",
+    "X",
+)
+UPOS_CODES: Dict[str, int] = {tag: code for code, tag in enumerate(UPOS_TAGS)}
+UNKNOWN_UPOS = len(UPOS_TAGS)
+
+# Morphological features interned as bit flags. Features not listed here are
+# dropped from the table; add them here when a metric needs them.
+FEATURES = (
+    "Tense=Past",
+    "Tense=Pres",
+    "Tense=Fut",
+    "Tense=Imp",
+    "Mood=Ind",
+    "Mood=Sub",
+    "Mood=Cnd",
+    "Mood=Imp",
+    "VerbForm=Fin",
+    "VerbForm=Inf",
+    "VerbForm=Part",
+    "VerbForm=Ger",
+    "Degree=Cmp",
+    "Degree=Sup",
+)
+FEATURE_FLAGS: Dict[str, int] = {feat: 1 << bit for bit, feat in enumerate(FEATURES)}
+
+
+class TokenTable:
+    """
+    Columnar token table extracted from a Stanza Document in a single pass.
+
+    Each word of the document is one row. Columns are NumPy arrays:
+
+    - `upos`: UPOS tag code (see UPOS_TAGS), uint8
+    - `feats`: bit set of interned morphological features (see FEATURES), uint32
+    - `text`: index of the word text in `vocab`, int32
+    - `lemma`: index of the lowercased lemma in `vocab`, int32 (the lowercased
+      text when the pipeline ran without the lemma processor)
+    - `sentence_offsets`: start row of every sentence plus a final end row, int64
+
+    Metric functions work on these arrays with vectorized reductions instead
+    of walking Stanza's Python objects again.
+    """
+
+    __slots__ = ("upos", "feats", "text", "lemma", "sentence_offsets", "vocab")
+
+    def __init__(
+        self,
+        upos: np.ndarray,
+        feats: np.ndarray,
+        text: np.ndarray,
+        lemma: np.ndarray,
+        sentence_offsets: np.ndarray,
+        vocab: List[str],
+    ):
+        self.upos = upos
+        self.feats = feats
+        self.text = text
+        self.lemma = lemma
+        self.sentence_offsets = sentence_offsets
+        self.vocab = vocab
+
+    @classmethod
+    def from_doc(cls, doc: Document) -> "TokenTable":
+        """
+        Build a table from an annotated Stanza Document.
+
+        Args:
+            doc: Stanza Document object with linguistic annotations
+
+        Returns:
+            TokenTable with one row per word
+        """
+        num_words = doc.num_words
+        upos = np.empty(num_words, dtype=np.uint8)
+        feats = np.zeros(num_words, dtype=np.uint32)
+        text = np.empty(num_words, dtype=np.int32)
+        lemma = np.empty(num_words, dtype=np.int32)
+        sentence_offsets = np.empty(len(doc.sentences) + 1, dtype=np.int64)
+        vocab: List[str] = []
+        vocab_index: Dict[str, int] = {}
+
+        row = 0
+        for sentence_index, sentence in enumerate(doc.sentences):
+            sentence_offsets[sentence_index] = row
+            for word in sentence.words:
+                upos[row] = UPOS_CODES.get(word.upos, UNKNOWN_UPOS)
+                if word.feats:
+                    flags = 0
+                    for feat in word.feats.split("|"):
+                        flags |= FEATURE_FLAGS.get(feat, 0)
+                    feats[row] = flags
+                for column, value in (
+                    (text, word.text),
+                    (lemma, (word.lemma or word.text).lower()),
+                ):
+                    index = vocab_index.get(value)
+                    if index is None:
+                        index = vocab_index[value] = len(vocab)
+                        vocab.append(value)
+                    column[row] = index
+                row += 1
+        sentence_offsets[-1] = row
+
+        return cls(upos, feats, text, lemma, sentence_offsets, vocab)
+
+    @classmethod
+    def concat(cls, tables: List["TokenTable"]) -> "TokenTable":
+        """
+        Join the tables of consecutive chunks of a text into one table.
+
+        Rows and sentences are appended in order and the vocabularies are
+        merged, so the result is equivalent to the table of the whole text.
+
+        Args:
+            tables: Tables of consecutive chunks, in text order
+
+        Returns:
+            TokenTable covering every chunk
+        """
+        if len(tables) == 1:
+            return tables[0]
+
+        vocab: List[str] = []
+        vocab_index: Dict[str, int] = {}
+        texts, lemmas, offsets = [], [], []
+        row = 0
+        for table in tables:
+            # Map this table's vocabulary indices to the merged vocabulary
+            remap = np.empty(len(table.vocab), dtype=np.int32)
+            for old_index, value in enumerate(table.vocab):
+                index = vocab_index.get(value)
+                if index is None:
+                    index = vocab_index[value] = len(vocab)
+                    vocab.append(value)
+                remap[old_index] = index
+            texts.append(remap[table.text])
+            lemmas.append(remap[table.lemma])
+            offsets.append(table.sentence_offsets[:-1] + row)
+            row += table.num_words
+        offsets.append(np.array([row], dtype=np.int64))
+
+        return cls(
+            np.concatenate([table.upos for table in tables]).astype(np.uint8, copy=False),
+            np.concatenate([table.feats for table in tables]).astype(np.uint32, copy=False),
+            np.concatenate(texts).astype(np.int32, copy=False),
+            np.concatenate(lemmas).astype(np.int32, copy=False),
+            np.concatenate(offsets).astype(np.int64, copy=False),
+            vocab,
+        )
+
+    @property
+    def num_words(self) -> int:
+        """Number of words in the document."""
+        return int(self.upos.shape[0])
+
+    @property
+    def num_sentences(self) -> int:
+        """Number of sentences in the document."""
+        return int(self.sentence_offsets.shape[0]) - 1
+
+    def upos_mask(self, tag: str) -> np.ndarray:
+        """Boolean mask of the words tagged with the given UPOS tag."""
+        return self.upos == UPOS_CODES[tag]
+
+    def feature_mask(self, feat: str) -> np.ndarray:
+        """Boolean mask of the words carrying the given interned feature."""
+        return (self.feats & FEATURE_FLAGS[feat]) != 0
+
+    def words(self, mask: np.ndarray) -> List[str]:
+        """Texts of the words selected by a boolean mask, in document order."""
+        vocab = self.vocab
+        return [vocab[index] for index in self.text[mask].tolist()]
+
+    def lemmas(self, mask: np.ndarray) -> List[str]:
+        """Lemmas of the words selected by a boolean mask, in document order."""
+        vocab = self.vocab
+        return [vocab[index] for index in self.lemma[mask].tolist()]
@@ -0,0 +1,92 @@
+"""Shared test helpers: token tables built without loading Stanza models, and sample articles."""
+
+from typing import Dict, List
+
+import numpy as np
+import pytest
+from stanza import Document
+
+import mediaparty_trust_api.api.v1.endpoints as endpoints
+from mediaparty_trust_api.services.annotation_store import AnnotationStore
+from mediaparty_trust_api.services.cache import result_cache
+from mediaparty_trust_api.services.chunking import split_paragraphs
+from mediaparty_trust_api.services.paragraph_cache import ParagraphCache
+from mediaparty_trust_api.services.stanza_service import StanzaService, stanza_service
+from mediaparty_trust_api.services.token_table import TokenTable
+
+
+def toy_annotate(text: str) -> TokenTable:
+    """
+    Annotate a text without Stanza: one sentence per paragraph, one word per token.
+
+    Tokens are split on whitespace. A token written `word/UPOS` gets that
+    tag (its lemma is the lowercased word); any other token is a NOUN.
+    """
+    sentences = []
+    for paragraph in split_paragraphs(text):
+        words = []
+        for token in paragraph.split():
+            word, _, upos = token.partition("/")
+            words.append(
+                {"id": len(words) + 1, "text": word, "lemma": word.lower(), "upos": upos or "NOUN"}
+            )
+        if words:
+            sentences.append(words)
+    return TokenTable.from_doc(Document(sentences, text=text))
+
+
+def assert_tables_equal(table: TokenTable, expected: TokenTable) -> None:
+    """Check two tables hold the same words, lemmas, tags and sentences."""
+    assert table.num_words == expected.num_words
+    assert table.upos.tolist() == expected.upos.tolist()
+    assert table.feats.tolist() == expected.feats.tolist()
+    assert table.sentence_offsets.tolist() == expected.sentence_offsets.tolist()
+    everything = np.ones(table.num_words, dtype=bool)
+    assert table.words(everything) == expected.words(everything)
+    assert table.lemmas(everything) == expected.lemmas(everything)
+
+
+@pytest.fixture
+def annotate_texts():
+    """Toy annotate function for a list of texts, recording the size of every call."""
+    calls: List[int] = []
+
+    def annotate(texts: List[str], *options) -> List[TokenTable]:
+        calls.append(len(texts))
+        return [toy_annotate(text) for text in texts]
+
+    annotate.calls = calls
+    return annotate
+
+
+@pytest.fixture
+def article() -> Dict[str, str]:
+    """A valid ArticleInput payload, as sent to the API."""
+    return {
+        "title": "Título",
+        "body": "Cuerpo de la nota.",
+        "author": "Redacción",
+        "link": "https://example.com/nota",
+        "date": "2025-10-04",
+        "media_type": "news",
+    }
+
+
+@pytest.fixture
+def toy_stanza(monkeypatch) -> StanzaService:
+    """
+    The global Stanza service, ready and annotating with toy_annotate().
+
+    Batching is off (tests may install a batcher on `_batcher`), the
+    result cache starts and ends empty and the API gets a paragraph cache of
+    its own, so no paragraph is ever found from an earlier test.
+    """
+    monkeypatch.setattr(stanza_service, "_ready", True)
+    monkeypatch.setattr(stanza_service, "_batcher", None)
+    monkeypatch.setattr(
+        stanza_service, "create_tables", lambda texts, **options: [toy_annotate(t) for t in texts]
+    )
+    monkeypatch.setattr(endpoints, "paragraph_cache", ParagraphCache(AnnotationStore(path=None)))
+    result_cache.clear()
+    yield stanza_service
+    result_cache.clear()
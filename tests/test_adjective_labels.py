@@ -0,0 +1,108 @@
+"""Tests for LLM adjective labelling, its batching and label persistence."""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+
+import mediaparty_trust_api.services.llm as llm
+import mediaparty_trust_api.services.metrics as metrics
+from conftest import toy_annotate
+from mediaparty_trust_api.services.adjective_store import AdjectiveLabelStore
+from mediaparty_trust_api.services.llm_batcher import LLMBatcher
+from mediaparty_trust_api.services.metrics import AdjectiveMode, adjective_mode_scope
+from mediaparty_trust_api.services.openrouter import OpenRouterClient
+
+ARTICLE = "Una casa bonita/ADJ y roja/ADJ junto a un árbol enorme/ADJ"
+
+
+def stub_llm(monkeypatch, answer):
+    """Route LLM calls to a stub answering `answer(lemmas)`; returns the request payloads."""
+    payloads = []
+
+    def handler(request):
+        payload = json.loads(request.content)
+        payloads.append(payload)
+        prompt = payload["messages"][-1]["content"]
+        lemmas = prompt.split("[[ ## adjectives ## ]]\n", 1)[1].split("\n\n", 1)[0].split(", ")
+        content = (
+            "[[ ## reasoning ## ]]\nStub answer.\n\n"
+            f"[[ ## labels ## ]]\n{answer(lemmas)}\n\n"
+            "[[ ## completed ## ]]"
+        )
+        return httpx.Response(200, json={"choices": [{"message": {"content": content}}]})
+
+    monkeypatch.setenv("OPENROUTER_API_KEY", "test-key")
+    monkeypatch.setattr(
+        llm, "openrouter_client", OpenRouterClient(max_retries=0, transport=httpx.MockTransport(handler))
+    )
+    return payloads
+
+
+def test_parse_labels_keeps_complete_entries_of_a_truncated_answer():
+    assert llm._parse_labels('{"bonito": true, "rojo": false}') == {"bonito": True, "rojo": False}
+    assert llm._parse_labels('{"bonito": true, "rojo": false, "enor') == {
+        "bonito": True,
+        "rojo": False,
+    }
+    assert llm._parse_labels("Bonito: true\nrojo: maybe") == {"bonito": True}
+
+
+def test_label_adjectives_returns_only_covered_lemmas(monkeypatch):
+    stub_llm(monkeypatch, lambda lemmas: '{"bonita": true, "roja": fal')
+    labels = asyncio.run(llm.label_adjectives(["bonita", "roja", "enorme"]))
+    assert labels == {"bonita": True}
+
+
+def test_completion_budget_grows_with_the_batch(monkeypatch):
+    payloads = stub_llm(monkeypatch, lambda lemmas: json.dumps(dict.fromkeys(lemmas, False)))
+    asyncio.run(llm.label_adjectives(["bonita"]))
+    asyncio.run(llm.label_adjectives([f"adjetivo{i}" for i in range(64)]))
+    assert payloads[1]["max_tokens"] > payloads[0]["max_tokens"]
+    assert payloads[1]["max_tokens"] >= 64 * llm._MAX_TOKENS_PER_LEMMA
+
+
+def test_batcher_leaves_omitted_items_out():
+    async def label_func(items):
+        return {item: True for item in items if item != "roja"}
+
+    batcher = LLMBatcher(label_func, window_seconds=0.0)
+
+    async def main():
+        return await asyncio.gather(
+            batcher.label(["bonita", "roja"]), batcher.label(["roja", "enorme"])
+        )
+
+    assert asyncio.run(main()) == [{"bonita": True}, {"enorme": True}]
+
+
+def test_omitted_lemmas_are_not_stored_and_asked_again(monkeypatch):
+    store = AdjectiveLabelStore(path=None)
+    monkeypatch.setattr(metrics, "adjective_label_store", store)
+    monkeypatch.setattr(
+        metrics, "adjective_label_batcher", LLMBatcher(metrics._label_and_store, window_seconds=0.0)
+    )
+    asked = []
+
+    def answer(lemmas):
+        asked.append(lemmas)
+        # Leave "roja" out of the first answer
+        answered = lemmas if len(asked) > 1 else [lemma for lemma in lemmas if lemma != "roja"]
+        return json.dumps({lemma: lemma == "bonita" for lemma in answered})
+
+    stub_llm(monkeypatch, answer)
+    table = toy_annotate(ARTICLE)
+
+    async def score():
+        with adjective_mode_scope(AdjectiveMode.LLM):
+            return await metrics.get_adjective_count(table)
+
+    first = asyncio.run(score())
+    assert first.degraded
+    assert store.all_labels() == {"bonita": True, "enorme": False}
+
+    second = asyncio.run(score())
+    assert not second.degraded
+    assert asked == [["bonita", "enorme", "roja"], ["roja"]]
+    assert store.all_labels() == {"bonita": True, "enorme": False, "roja": False}
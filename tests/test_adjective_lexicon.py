@@ -0,0 +1,81 @@
+"""Tests for the fast adjective mode: the lexicon classifier and its use in place of the LLM."""
+
+import asyncio
+
+import pytest
+
+from conftest import toy_annotate
+from mediaparty_trust_api.api.v1.endpoints import _cache_key
+from mediaparty_trust_api.models import ArticleInput
+from mediaparty_trust_api.services.adjective_lexicon import lemma_label, qualitative_mask
+from mediaparty_trust_api.services.metrics import (
+    AdjectiveMode,
+    adjective_mode_scope,
+    effective_adjective_mode,
+    get_adjective_count,
+)
+from mediaparty_trust_api.services.registry import select_metrics
+
+
+@pytest.mark.parametrize(
+    "lemma, label",
+    [
+        # Lexicons
+        ("escandaloso", True),
+        ("económico", False),
+        # Evaluative suffixes
+        ("grandísimo", True),
+        ("celebérrimo", True),
+        ("amistoso", True),
+        ("lavable", True),
+        ("temible", True),
+        # No evidence either way
+        ("azul", None),
+        ("redondo", None),
+    ],
+)
+def test_lemma_label(lemma, label):
+    assert lemma_label(lemma) is label
+
+
+def qualitative_words(text):
+    table = toy_annotate(text)
+    return table.words(qualitative_mask(table))
+
+
+def test_unknown_adjectives_count_only_after_an_intensifier():
+    assert qualitative_words("una casa azul/ADJ") == []
+    assert qualitative_words("una casa muy azul/ADJ") == ["azul"]
+    assert qualitative_words("una casa tan redonda/ADJ y azul/ADJ") == ["redonda"]
+
+
+def test_intensifier_does_not_reach_across_sentences():
+    assert qualitative_words("lo dijo muy\n\nazul/ADJ fue") == []
+
+
+def test_lexicon_labels_ignore_intensifiers():
+    assert qualitative_words("un plan escandaloso/ADJ") == ["escandaloso"]
+    assert qualitative_words("un plan muy económico/ADJ") == []
+
+
+def test_llm_mode_without_api_key_runs_and_is_cached_as_fast_mode(monkeypatch, article):
+    monkeypatch.delenv("OPENROUTER_API_KEY", raising=False)
+    assert effective_adjective_mode(AdjectiveMode.LLM) == AdjectiveMode.FAST
+    table = toy_annotate("una casa muy azul/ADJ y escandalosa/ADJ")
+    with adjective_mode_scope(AdjectiveMode.LLM):
+        llm_metric = asyncio.run(get_adjective_count(table))
+    with adjective_mode_scope(AdjectiveMode.FAST):
+        fast_metric = asyncio.run(get_adjective_count(table))
+    assert llm_metric == fast_metric
+
+    selected = select_metrics()
+    article = ArticleInput(**article)
+    assert _cache_key(article, selected, AdjectiveMode.LLM) == _cache_key(
+        article, selected, AdjectiveMode.FAST
+    )
+
+    monkeypatch.setenv("OPENROUTER_API_KEY", "test-key")
+    assert effective_adjective_mode(AdjectiveMode.LLM) == AdjectiveMode.LLM
+    assert _cache_key(article, selected, AdjectiveMode.LLM) != _cache_key(
+        article, selected, AdjectiveMode.FAST
+    )
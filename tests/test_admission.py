@@ -0,0 +1,83 @@
+"""Tests for admission control and the request size caps."""
+
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from mediaparty_trust_api.core.config import config
+from mediaparty_trust_api.main import app
+from mediaparty_trust_api.services.admission import (
+    AdmissionController,
+    AdmissionRejectedError,
+    ArticleTooLargeError,
+)
+
+
+def test_work_waits_for_budget_in_order():
+    controller = AdmissionController(budget_bytes=100, max_wait_seconds=1.0)
+    order = []
+
+    async def work(name, cost, hold):
+        async with controller.admit(cost):
+            order.append(name)
+            await asyncio.sleep(hold)
+
+    async def scenario():
+        first = asyncio.create_task(work("first", 80, 0.05))
+        await asyncio.sleep(0)
+        # "second" does not fit next to "first"; "third" would, but must not overtake it
+        await asyncio.gather(first, work("second", 50, 0), work("third", 10, 0))
+
+    asyncio.run(scenario())
+    assert order == ["first", "second", "third"]
+    stats = controller.stats()
+    assert stats["in_use_bytes"] == 0
+    assert stats["in_flight"] == 0
+    assert stats["admitted"] == 3
+
+
+def test_work_is_rejected_when_the_wait_runs_out():
+    controller = AdmissionController(budget_bytes=100, max_wait_seconds=0.01)
+
+    async def scenario():
+        async with controller.admit(100):
+            with pytest.raises(AdmissionRejectedError):
+                async with controller.admit(1):
+                    pass
+
+    asyncio.run(scenario())
+    assert controller.stats()["rejected"] == 1
+    assert controller.stats()["waiting"] == 0
+
+
+def test_work_above_the_whole_budget_runs_alone():
+    controller = AdmissionController(budget_bytes=100)
+
+    async def scenario():
+        async with controller.admit(10_000):
+            return controller.stats()["in_use_bytes"]
+
+    assert asyncio.run(scenario()) == 100
+
+
+def test_oversized_article_is_refused():
+    controller = AdmissionController(budget_bytes=100, max_article_chars=10)
+    controller.check_size("x" * 10)
+    with pytest.raises(ArticleTooLargeError):
+        controller.check_size("x" * 11)
+    assert controller.stats()["too_large"] == 1
+
+
+def test_size_caps_are_enforced_by_the_api(monkeypatch, article):
+    client = TestClient(app)
+
+    monkeypatch.setattr(config, "max_request_bytes", 10)
+    response = client.post("/api/v1/articles/analyze", json=article)
+    assert response.status_code == 413
+    monkeypatch.undo()
+
+    response = client.post(
+        "/api/v1/articles/analyze/batch", json=[article] * (config.max_batch_size + 1)
+    )
+    assert response.status_code == 422
@@ -0,0 +1,97 @@
+"""Tests for concurrent metric execution under the latency budget."""
+
+import asyncio
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from conftest import toy_annotate
+from mediaparty_trust_api.core.config import config
+from mediaparty_trust_api.main import app
+from mediaparty_trust_api.models import Metric
+from mediaparty_trust_api.services.analysis import compute_metrics
+from mediaparty_trust_api.services.cache import result_cache
+from mediaparty_trust_api.services.registry import METRIC_REGISTRY, CostClass, MetricSpec
+
+TABLE = toy_annotate("Una nota breve.")
+
+
+def metric(metric_id, explanation):
+    return Metric(
+        id=metric_id, criteria_name=f"Metric {metric_id}", explanation=explanation, flag=1, score=1.0
+    )
+
+
+def count_words(table, metric_id):
+    return metric(metric_id, f"{table.num_words} words")
+
+
+def local_fallback(table, metric_id):
+    return metric(metric_id, "local estimate")
+
+
+def spec(metric_id, func, fallback=None, cost=CostClass.LLM):
+    return MetricSpec(metric_id, f"metric_{metric_id}", cost, (), func, fallback)
+
+
+def test_metric_missing_the_budget_gets_its_degraded_fallback():
+    cancelled = []
+
+    async def slow_llm(table, metric_id):
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.append(metric_id)
+            raise
+        return metric(metric_id, "from the LLM")
+
+    async def fast_llm(table, metric_id):
+        await asyncio.sleep(0.01)
+        return metric(metric_id, "from the LLM")
+
+    selected = [
+        spec(0, slow_llm, local_fallback),
+        spec(1, count_words, cost=CostClass.CHEAP),
+        spec(2, fast_llm, local_fallback),
+    ]
+    started = time.perf_counter()
+    results = asyncio.run(compute_metrics(TABLE, selected, budget_seconds=0.1))
+
+    assert time.perf_counter() - started < 1
+    assert [result.id for result in results] == [0, 1, 2]
+    assert [result.explanation for result in results] == [
+        "local estimate",
+        "3 words",
+        "from the LLM",
+    ]
+    assert [result.degraded for result in results] == [True, False, False]
+    assert cancelled == [0]
+
+
+def test_failing_metric_gets_its_degraded_fallback():
+    async def failing_llm(table, metric_id):
+        raise ConnectionError("upstream down")
+
+    results = asyncio.run(compute_metrics(TABLE, [spec(0, failing_llm, local_fallback)]))
+    assert results[0].explanation == "local estimate"
+    assert results[0].degraded
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(compute_metrics(TABLE, [spec(0, failing_llm)]))
+
+
+def test_degraded_result_is_neither_cached_nor_tagged(toy_stanza, monkeypatch, article):
+    async def slow_llm(table, metric_id):
+        await asyncio.sleep(5)
+
+    adjectives = METRIC_REGISTRY["qualitative_adjectives"]
+    monkeypatch.setitem(METRIC_REGISTRY, adjectives.name, adjectives._replace(func=slow_llm))
+    monkeypatch.setattr(config, "metric_budget_seconds", 0.05)
+
+    response = TestClient(app).post("/api/v1/articles/analyze?metrics=llm", json=article)
+    assert response.status_code == 200
+    assert [metric["degraded"] for metric in response.json()] == [True]
+    assert response.headers["Cache-Control"] == "no-store"
+    assert "ETag" not in response.headers
+    assert result_cache.stats()["size"] == 0
@@ -0,0 +1,49 @@
+"""Tests for the on-disk annotation store."""
+
+import os
+
+import pytest
+
+from conftest import assert_tables_equal, toy_annotate
+from mediaparty_trust_api.services.annotation_store import AnnotationStore, read_table, write_table
+from mediaparty_trust_api.services.paragraph_cache import ParagraphCache
+
+PROCESSORS = "tokenize,pos"
+
+
+def test_table_round_trip(tmp_path):
+    table = toy_annotate("Una nota breve/ADJ\n\ncon dos párrafos y eñes")
+    path = str(tmp_path / "table.ttab")
+    write_table(path, table)
+    assert_tables_equal(read_table(path), table)
+
+
+def test_empty_table_round_trip(tmp_path):
+    table = toy_annotate("")
+    path = str(tmp_path / "empty.ttab")
+    write_table(path, table)
+    assert read_table(path).num_words == 0
+
+
+def test_superset_processors_serve_a_lookup(tmp_path):
+    store = AnnotationStore(str(tmp_path))
+    table = toy_annotate("Texto anotado con todo")
+    store.put("Texto anotado con todo", "tokenize,mwt,pos,lemma", table)
+    assert_tables_equal(store.get("Texto anotado con todo", "tokenize,mwt,pos"), table)
+    assert store.get("Texto anotado con todo", "tokenize,mwt,pos,lemma,depparse") is None
+
+
+@pytest.mark.skipif(not os.path.isdir("/proc/self/fd"), reason="needs /proc/self/fd")
+def test_cached_tables_hold_no_file_descriptors(tmp_path):
+    paragraphs = [f"Párrafo número {i} de la nota" for i in range(400)]
+    store = AnnotationStore(str(tmp_path))
+    for paragraph in paragraphs:
+        store.put(paragraph, PROCESSORS, toy_annotate(paragraph))
+
+    open_fds = len(os.listdir("/proc/self/fd"))
+    cache = ParagraphCache(AnnotationStore(str(tmp_path)), max_size=len(paragraphs))
+    lookup = cache.lookup(paragraphs, PROCESSORS)
+
+    assert lookup.missing == {}
+    assert cache.stats()["size"] == len(paragraphs)
+    assert len(os.listdir("/proc/self/fd")) <= open_fds
@@ -0,0 +1,51 @@
+"""Tests for the batch analysis endpoint."""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from conftest import toy_annotate
+from mediaparty_trust_api.main import app
+from mediaparty_trust_api.services.cache import result_cache
+from mediaparty_trust_api.services.registry import select_metrics
+
+URL = "/api/v1/articles/analyze/batch?metrics=cheap"
+
+
+@pytest.fixture
+def failing_stanza(toy_stanza, monkeypatch):
+    """The toy Stanza service, failing on any text that mentions a broken paragraph."""
+    calls = []
+
+    def create_tables(texts, **options):
+        calls.append(len(texts))
+        if any("párrafo roto" in text for text in texts):
+            raise RuntimeError("pipeline failed")
+        return [toy_annotate(text) for text in texts]
+
+    monkeypatch.setattr(toy_stanza, "create_tables", create_tables)
+    toy_stanza.calls = calls
+    return toy_stanza
+
+
+def test_bad_item_fails_alone(failing_stanza, article):
+    articles = [
+        {**article, "body": f"Lote con un párrafo {label}, número {i}."}
+        for i, label in enumerate(["sano", "roto", "sano"])
+    ]
+    response = TestClient(app).post(URL, json=articles)
+
+    assert response.status_code == 200
+    results = response.json()
+    assert [result["index"] for result in results] == [0, 1, 2]
+    assert results[1]["metrics"] is None
+    assert results[1]["error"] == "Error processing article: pipeline failed"
+    for result in (results[0], results[2]):
+        assert result["error"] is None
+        assert [metric["id"] for metric in result["metrics"]] == [
+            spec.metric_id for spec in select_metrics("cheap")
+        ]
+    # One shared call, then the retry of every new paragraph on its own
+    assert failing_stanza.calls[0] > 1
+    assert set(failing_stanza.calls[1:]) == {1}
+    # Only the articles that succeeded are cached
+    assert result_cache.stats()["size"] == 2
@@ -0,0 +1,61 @@
+"""Tests for chunked annotation of long texts."""
+
+import asyncio
+import re
+
+from stanza import Document
+
+from mediaparty_trust_api.services.analysis import compute_metrics
+from mediaparty_trust_api.services.chunking import split_text
+from mediaparty_trust_api.services.registry import select_metrics
+from mediaparty_trust_api.services.stanza_service import StanzaService
+from mediaparty_trust_api.services.token_table import TokenTable
+
+# Abbreviations the stand-in tokenizer, like Stanza's, does not end a sentence at
+ABBREVIATIONS = {"Sr.", "Sra.", "Dr.", "EE.UU."}
+
+PARAGRAPH = (
+    "El Sr. García llegó temprano. La Dra. Pérez habló con la Sra. López sobre el viaje a EE.UU. "
+    "El Dr. Ruiz no opinó. Todos volvieron tarde."
+)
+TEXT = "\n\n".join([PARAGRAPH] * 3 + ["Breve cierre de la nota."])
+
+
+def annotate(text: str) -> TokenTable:
+    """Annotate a text like Stanza would split it: by paragraph, then sentence, skipping abbreviations."""
+    sentences = []
+    for paragraph in re.split(r"\n\s*\n", text):
+        words = []
+        for token in paragraph.split():
+            words.append({"id": len(words) + 1, "text": token, "lemma": token.lower(), "upos": "NOUN"})
+            if token[-1] in ".!?" and token not in ABBREVIATIONS:
+                sentences.append(words)
+                words = []
+        if words:
+            sentences.append(words)
+    return TokenTable.from_doc(Document(sentences, text=text))
+
+
+def annotating_service() -> StanzaService:
+    service = StanzaService()
+    service._nlp = object()
+    service._annotate_tables = lambda texts, processors: [annotate(text) for text in texts]
+    return service
+
+
+def test_oversized_paragraph_is_kept_whole():
+    chunks = split_text(TEXT, max_chars=60)
+    assert chunks[:3] == [PARAGRAPH] * 3
+    assert all(len(chunk) <= 60 or chunk == PARAGRAPH for chunk in chunks)
+
+
+def test_chunked_metrics_equal_whole_document_metrics():
+    service = annotating_service()
+    whole = service.create_tables([TEXT])[0]
+    chunked = service.create_tables([TEXT], max_chunk_chars=60, chunks_in_flight=2)[0]
+    assert chunked.sentence_offsets.tolist() == whole.sentence_offsets.tolist()
+
+    selected = select_metrics("cheap,nlp")
+    assert asyncio.run(compute_metrics(chunked, selected)) == asyncio.run(
+        compute_metrics(whole, selected)
+    )
@@ -0,0 +1,118 @@
+"""Tests for the bulk analysis command line, run in rescore mode without Stanza."""
+
+import asyncio
+import json
+
+import pytest
+
+from conftest import toy_annotate
+from mediaparty_trust_api import cli
+from mediaparty_trust_api.cli import Checkpoint, run_bulk
+from mediaparty_trust_api.services.analysis import processors_for
+from mediaparty_trust_api.services.annotation_store import AnnotationStore
+from mediaparty_trust_api.services.chunking import split_paragraphs
+from mediaparty_trust_api.services.registry import select_metrics
+
+SELECTED = select_metrics("cheap")
+
+
+def article(i):
+    return {
+        "title": f"Nota {i}",
+        "body": f"Primer párrafo de la nota {i}.\n\nSegundo párrafo.",
+        "author": "Redacción",
+        "link": f"https://example.com/{i}",
+        "date": "2025-10-04",
+        "media_type": "news",
+    }
+
+
+def write_input(tmp_path):
+    """Write six input lines (one of them invalid) and store the annotations of all but one."""
+    store = AnnotationStore(str(tmp_path / "store"))
+    processors = processors_for(SELECTED)
+    lines = []
+    for i in range(6):
+        if i == 3:
+            lines.append("{not json}\n")
+            continue
+        record = article(i)
+        lines.append(json.dumps(record, ensure_ascii=False) + "\n")
+        if i != 4:
+            for paragraph in split_paragraphs(f"{record['title']}. {record['body']}"):
+                store.put(paragraph, processors, toy_annotate(paragraph))
+    input_path = tmp_path / "articles.jsonl"
+    input_path.write_text("".join(lines), encoding="utf-8")
+    return str(input_path), store
+
+
+def run(input_path, output_path, store, **options):
+    asyncio.run(
+        run_bulk(
+            input_path, output_path, SELECTED, batch_size=2, store=store, rescore=True, **options
+        )
+    )
+    with open(output_path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_one_result_per_input_line(tmp_path):
+    input_path, store = write_input(tmp_path)
+    results = run(input_path, str(tmp_path / "results.jsonl"), store)
+
+    assert [result["line"] for result in results] == [1, 2, 3, 4, 5, 6]
+    assert [("error" in result) for result in results] == [False, False, False, True, True, False]
+    assert "No stored annotation" in results[4]["error"]
+    assert [metric["id"] for metric in results[0]["metrics"]] == [spec.metric_id for spec in SELECTED]
+
+
+def test_resumed_run_drops_the_partial_batch(tmp_path):
+    input_path, store = write_input(tmp_path)
+    expected = run(input_path, str(tmp_path / "expected.jsonl"), store)
+
+    # A run interrupted after its first batch, in the middle of writing the second
+    output_path = tmp_path / "results.jsonl"
+    first_batch = "".join(json.dumps(result, ensure_ascii=False) + "\n" for result in expected[:2])
+    output_path.write_text(first_batch + '{"line": 3, "met', encoding="utf-8")
+    Checkpoint(f"{output_path}.checkpoint").save(2, len(first_batch.encode("utf-8")))
+
+    assert run(input_path, str(output_path), store) == expected
+    assert Checkpoint(f"{output_path}.checkpoint").load()["lines_done"] == 6
+
+
+def test_existing_output_is_only_replaced_on_request(tmp_path):
+    input_path, store = write_input(tmp_path)
+    output_path = tmp_path / "results.jsonl"
+    output_path.write_text("earlier results\n", encoding="utf-8")
+
+    with pytest.raises(FileExistsError):
+        run(input_path, str(output_path), store)
+    assert output_path.read_text(encoding="utf-8") == "earlier results\n"
+
+    assert len(run(input_path, str(output_path), store, overwrite=True)) == 6
+
+
+def test_metrics_of_a_batch_run_concurrently_in_input_order(tmp_path, monkeypatch):
+    input_path, store = write_input(tmp_path)
+    running = []
+    peak = []
+    compute_metrics = cli.compute_metrics
+
+    async def slow_compute_metrics(table, selected):
+        running.append(1)
+        peak.append(len(running))
+        # Earlier articles finish last
+        await asyncio.sleep(0.01 * (10 - len(peak)))
+        running.pop()
+        return await compute_metrics(table, selected)
+
+    monkeypatch.setattr(cli, "compute_metrics", slow_compute_metrics)
+    output_path = str(tmp_path / "results.jsonl")
+    results = run(input_path, output_path, store, metrics_concurrency=2)
+    expected = run(input_path, str(tmp_path / "expected.jsonl"), store, metrics_concurrency=1)
+
+    assert [result["line"] for result in results] == [1, 2, 3, 4, 5, 6]
+    assert results == expected
+    # Four articles have tables in each run: two at a time, then one at a time
+    assert max(peak[:4]) == 2
+    assert max(peak[4:]) == 1
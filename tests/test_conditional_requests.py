@@ -0,0 +1,53 @@
+"""Tests for ETag conditional requests and the result check endpoint."""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from mediaparty_trust_api.api.v1.endpoints import _cache_key
+from mediaparty_trust_api.main import app
+from mediaparty_trust_api.models import ArticleInput, Metric
+from mediaparty_trust_api.services.cache import result_cache, result_etag
+from mediaparty_trust_api.services.registry import select_metrics
+
+METRICS = [Metric(id=0, criteria_name="Word count", explanation="Long enough.", flag=1, score=0.9)]
+
+
+@pytest.fixture
+def cached_etag(article):
+    """Prime the result cache with the article, so no request needs Stanza."""
+    key = _cache_key(ArticleInput(**article), select_metrics(), None)
+    result_cache.set(key, METRICS)
+    yield result_etag(key)
+    result_cache.clear()
+
+
+def test_cached_result_carries_its_etag(cached_etag, article):
+    response = TestClient(app).post("/api/v1/articles/analyze", json=article)
+    assert response.status_code == 200
+    assert response.headers["ETag"] == cached_etag
+    assert [Metric(**item) for item in response.json()] == METRICS
+
+
+def test_matching_if_none_match_gets_a_304(cached_etag, article):
+    client = TestClient(app)
+    for if_none_match in (cached_etag, f'"other", W/{cached_etag}'):
+        response = client.post(
+            "/api/v1/articles/analyze", json=article, headers={"If-None-Match": if_none_match}
+        )
+        assert response.status_code == 304
+        assert response.headers["ETag"] == cached_etag
+        assert response.content == b""
+
+
+def test_result_check_endpoint(cached_etag):
+    client = TestClient(app)
+    url = f"/api/v1/articles/results/{cached_etag.strip(chr(34))}"
+
+    assert client.get(url, headers={"If-None-Match": cached_etag}).status_code == 304
+    response = client.get(url)
+    assert response.status_code == 200
+    assert [Metric(**item) for item in response.json()] == METRICS
+
+    result_cache.clear()
+    assert client.get(url).status_code == 404
+    assert client.get("/api/v1/articles/results/0.not-a-tag").status_code == 404
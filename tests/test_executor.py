@@ -0,0 +1,58 @@
+"""Tests for the bounded NLP executor and its fast rejection by the API."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import mediaparty_trust_api.api.v1.endpoints as endpoints
+from mediaparty_trust_api.main import app
+from mediaparty_trust_api.services.executor import BoundedExecutor, ExecutorBusyError
+
+
+@pytest.fixture
+def busy_executor(monkeypatch):
+    """A one-worker executor without a queue, installed in the API and kept busy until released."""
+    executor = BoundedExecutor(max_workers=1, max_queue_size=0, retry_after_seconds=5)
+    monkeypatch.setattr(endpoints, "nlp_executor", executor)
+    release = threading.Event()
+    holder = threading.Thread(target=asyncio.run, args=(executor.run(release.wait),))
+    holder.start()
+    while executor.stats()["running"] == 0:
+        time.sleep(0.001)
+    executor.release = release
+    yield executor
+    release.set()
+    holder.join()
+    executor.shutdown()
+
+
+def test_jobs_beyond_the_queue_are_rejected(busy_executor):
+    with pytest.raises(ExecutorBusyError) as error:
+        asyncio.run(busy_executor.run(sum, [1, 2]))
+    assert error.value.retry_after_seconds == 5
+
+    busy_executor.release.set()
+    while busy_executor.stats()["running"]:
+        time.sleep(0.001)
+    assert asyncio.run(busy_executor.run(sum, [1, 2])) == 3
+    stats = busy_executor.stats()
+    assert stats["rejected"] == 1
+    assert stats["completed"] == 2
+    assert stats["queue_depth"] == 0
+
+
+def test_full_executor_queue_returns_503(busy_executor, toy_stanza, article):
+    client = TestClient(app)
+    response = client.post("/api/v1/articles/analyze?metrics=cheap", json=article)
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "5"
+    assert busy_executor.stats()["rejected"] == 1
+
+    busy_executor.release.set()
+    while busy_executor.stats()["running"]:
+        time.sleep(0.001)
+    response = client.post("/api/v1/articles/analyze?metrics=cheap", json=article)
+    assert response.status_code == 200
@@ -0,0 +1,147 @@
+"""Tests for the OpenRouter client's error handling and circuit breaker."""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from mediaparty_trust_api.services.openrouter import (
+    CircuitBreaker,
+    CircuitOpenError,
+    OpenRouterClient,
+    OpenRouterError,
+)
+
+MESSAGES = [{"role": "user", "content": "hola"}]
+
+
+def make_client(responses, reset_seconds=0.0):
+    """Client whose upstream answers with the given responses (or raises them), in order."""
+
+    def handler(request):
+        response = responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    return OpenRouterClient(
+        max_retries=0,
+        breaker=CircuitBreaker(failure_threshold=1, reset_seconds=reset_seconds),
+        transport=httpx.MockTransport(handler),
+    )
+
+
+def completion(content):
+    return httpx.Response(200, json={"choices": [{"message": {"content": content}}]})
+
+
+@pytest.fixture(autouse=True)
+def api_key(monkeypatch):
+    monkeypatch.setenv("OPENROUTER_API_KEY", "test-key")
+
+
+@pytest.mark.parametrize(
+    "response",
+    [
+        httpx.Response(200, text="<html>upstream hiccup</html>"),
+        httpx.Response(200, json={"error": "overloaded"}),
+        httpx.Response(200, json={"choices": []}),
+        httpx.Response(200, json={"choices": [{"message": {}}]}),
+        httpx.Response(200, json={"choices": [{"message": {"content": None}}]}),
+    ],
+)
+def test_malformed_success_response_is_an_openrouter_error(response):
+    client = make_client([response])
+    with pytest.raises(OpenRouterError):
+        asyncio.run(client.chat(MESSAGES))
+    assert client.stats()["failures"] == 1
+
+
+def test_half_open_probe_recovers_after_parse_errors():
+    client = make_client(
+        [
+            httpx.Response(200, text="not json"),
+            httpx.Response(200, text="still not json"),
+            completion("ok"),
+        ]
+    )
+    # Opens the circuit; with no reset delay the next call is a half-open probe
+    with pytest.raises(OpenRouterError):
+        asyncio.run(client.chat(MESSAGES))
+    assert client.breaker.state == "half_open"
+
+    # A failed probe opens the circuit again, and lets the next probe through
+    with pytest.raises(OpenRouterError):
+        asyncio.run(client.chat(MESSAGES))
+    assert client.breaker.state == "half_open"
+
+    assert asyncio.run(client.chat(MESSAGES)) == "ok"
+    assert client.breaker.state == "closed"
+
+
+def test_probe_ending_in_an_unexpected_error_is_released():
+    client = make_client(
+        [httpx.Response(503), RuntimeError("transport bug"), completion("ok")]
+    )
+    with pytest.raises(OpenRouterError):
+        asyncio.run(client.chat(MESSAGES))
+    with pytest.raises(RuntimeError):
+        asyncio.run(client.chat(MESSAGES))
+    assert asyncio.run(client.chat(MESSAGES)) == "ok"
+
+
+def test_open_circuit_fails_fast():
+    client = make_client([httpx.Response(500)], reset_seconds=60.0)
+    with pytest.raises(OpenRouterError):
+        asyncio.run(client.chat(MESSAGES))
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(client.chat(MESSAGES))
+    assert client.stats()["short_circuited"] == 1
+
+
+def test_call_started_before_the_probe_does_not_release_it():
+    gates = {}
+
+    async def handler(request):
+        name = json.loads(request.content)["messages"][0]["content"]
+        if name == "slow":
+            await gates["slow"].wait()
+            raise RuntimeError("transport bug")
+        if name == "failing":
+            return httpx.Response(500)
+        if name == "probe":
+            await gates["probe"].wait()
+        return completion(name)
+
+    client = OpenRouterClient(
+        max_retries=0,
+        breaker=CircuitBreaker(failure_threshold=1, reset_seconds=0.0),
+        transport=httpx.MockTransport(handler),
+    )
+
+    def chat(name):
+        return client.chat([{"role": "user", "content": name}])
+
+    async def scenario():
+        gates.update(slow=asyncio.Event(), probe=asyncio.Event())
+        # Starts while the circuit is closed, and ends without a verdict later
+        slow = asyncio.create_task(chat("slow"))
+        await asyncio.sleep(0.01)
+        with pytest.raises(OpenRouterError):
+            await chat("failing")
+        probe = asyncio.create_task(chat("probe"))
+        await asyncio.sleep(0.01)
+
+        gates["slow"].set()
+        with pytest.raises(RuntimeError):
+            await slow
+        # The probe is still in flight: no second probe may go through
+        with pytest.raises(CircuitOpenError):
+            await chat("second probe")
+
+        gates["probe"].set()
+        assert await probe == "probe"
+        assert client.breaker.state == "closed"
+
+    asyncio.run(scenario())
@@ -0,0 +1,81 @@
+"""Tests for the paragraph-level annotation cache."""
+
+from conftest import assert_tables_equal, toy_annotate
+from mediaparty_trust_api.services.annotation_store import AnnotationStore
+from mediaparty_trust_api.services.paragraph_cache import ParagraphCache
+
+PROCESSORS = "tokenize,pos"
+
+ARTICLE = "Título. Primer párrafo de la nota\n\nSegundo párrafo\n\n  Tercer párrafo final  "
+
+
+def recording_annotate(calls):
+    def annotate(paragraphs):
+        calls.append(list(paragraphs))
+        return [toy_annotate(paragraph) for paragraph in paragraphs]
+
+    return annotate
+
+
+def test_joined_table_equals_whole_text_annotation():
+    cache = ParagraphCache(AnnotationStore(None))
+    table = cache.create_tables([ARTICLE], PROCESSORS, recording_annotate([]))[0]
+    assert_tables_equal(table, toy_annotate(ARTICLE))
+
+
+def test_only_new_paragraphs_are_annotated():
+    cache = ParagraphCache(AnnotationStore(None))
+    cache.create_tables([ARTICLE], PROCESSORS, recording_annotate([]))
+
+    calls = []
+    edited = ARTICLE.replace("Segundo párrafo", "Segundo párrafo corregido")
+    table = cache.create_tables([edited], PROCESSORS, recording_annotate(calls))[0]
+
+    assert calls == [["Segundo párrafo corregido"]]
+    assert_tables_equal(table, toy_annotate(edited))
+
+
+def test_shared_paragraphs_are_annotated_once():
+    calls = []
+    cache = ParagraphCache(AnnotationStore(None))
+    cache.create_tables(
+        ["Firma común\n\nNota uno", "Firma común\n\nNota dos"], PROCESSORS, recording_annotate(calls)
+    )
+    assert calls == [["Firma común", "Nota uno", "Nota dos"]]
+
+
+def test_lookup_and_complete_match_create_tables():
+    cache = ParagraphCache(AnnotationStore(None))
+    lookup = cache.lookup([ARTICLE], PROCESSORS)
+    annotated = [toy_annotate(paragraph) for paragraph in lookup.missing.values()]
+    table = cache.complete(lookup, PROCESSORS, annotated)[0]
+    assert_tables_equal(table, toy_annotate(ARTICLE))
+    assert cache.lookup([ARTICLE], PROCESSORS).missing == {}
+
+
+def test_failed_paragraph_fails_its_text_and_is_not_kept(tmp_path):
+    store = AnnotationStore(str(tmp_path))
+    cache = ParagraphCache(store)
+    results = cache.create_tables(
+        ["Bueno\n\nRoto", "Bueno"],
+        PROCESSORS,
+        lambda paragraphs: [
+            LookupError("failed") if paragraph == "Roto" else toy_annotate(paragraph)
+            for paragraph in paragraphs
+        ],
+    )
+    assert isinstance(results[0], LookupError)
+    assert_tables_equal(results[1], toy_annotate("Bueno"))
+    assert list(cache.lookup(["Roto"], PROCESSORS).missing.values()) == ["Roto"]
+
+
+def test_store_hits_survive_a_new_cache(tmp_path):
+    ParagraphCache(AnnotationStore(str(tmp_path))).create_tables(
+        [ARTICLE], PROCESSORS, recording_annotate([])
+    )
+    calls = []
+    cache = ParagraphCache(AnnotationStore(str(tmp_path)), max_size=0)
+    table = cache.create_tables([ARTICLE], PROCESSORS, recording_annotate(calls))[0]
+    assert calls == []
+    assert cache.stats()["store_hits"] == 3
+    assert_tables_equal(table, toy_annotate(ARTICLE))
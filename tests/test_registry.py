@@ -0,0 +1,62 @@
+"""Tests for the metric registry, metric selection and processor resolution."""
+
+import pytest
+
+import mediaparty_trust_api.services as services
+from mediaparty_trust_api.services.analysis import processors_for
+from mediaparty_trust_api.services.registry import METRIC_REGISTRY, CostClass, select_metrics
+from mediaparty_trust_api.services.stanza_service import DEFAULT_PROCESSORS, resolve_processors
+
+
+def names(specs):
+    return [spec.name for spec in specs]
+
+
+def test_selection_by_name_and_cost_class():
+    assert names(select_metrics()) == [
+        "qualitative_adjectives",
+        "word_count",
+        "sentence_complexity",
+        "verb_tense",
+    ]
+    assert names(select_metrics("cheap")) == ["word_count", "sentence_complexity"]
+    assert names(select_metrics("verb_tense, cheap")) == [
+        "word_count",
+        "sentence_complexity",
+        "verb_tense",
+    ]
+    assert names(select_metrics(["llm"])) == ["qualitative_adjectives"]
+    assert names(select_metrics("")) == names(select_metrics())
+
+
+def test_unknown_metric_is_rejected():
+    with pytest.raises(ValueError, match="Available"):
+        select_metrics("word_count,sentiment")
+
+
+@pytest.mark.parametrize(
+    "selection, processors",
+    [
+        ("cheap", "tokenize,mwt"),
+        ("verb_tense", "tokenize,mwt,pos"),
+        ("llm", "tokenize,mwt,pos,lemma"),
+        (None, "tokenize,mwt,pos,lemma"),
+    ],
+)
+def test_only_the_processors_of_the_selected_metrics_are_run(selection, processors):
+    assert processors_for(select_metrics(selection)) == processors
+
+
+def test_resolve_processors_adds_prerequisites_in_pipeline_order():
+    assert resolve_processors([]) == "tokenize"
+    assert resolve_processors(["lemma", "mwt"]) == "tokenize,mwt,pos,lemma"
+    assert resolve_processors(["depparse"]) == DEFAULT_PROCESSORS
+    with pytest.raises(ValueError):
+        resolve_processors(["ner"])
+
+
+def test_every_registered_metric_is_exported_by_the_services_package():
+    for spec in METRIC_REGISTRY.values():
+        assert isinstance(spec.cost, CostClass)
+        assert getattr(services, spec.func.__name__) is spec.func
+        assert spec.func.__name__ in services.__all__
@@ -0,0 +1,77 @@
+"""Tests for the two-tier analysis result cache."""
+
+import asyncio
+import sqlite3
+
+from mediaparty_trust_api.models import Metric
+from mediaparty_trust_api.services.cache import ResultCache
+
+METRICS = [Metric(id=0, criteria_name="Word count", explanation="Long enough.", flag=1, score=0.9)]
+
+
+def count_rows(path):
+    with sqlite3.connect(path) as db:
+        return db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+
+def test_memory_hit():
+    cache = ResultCache(max_size=4)
+    assert cache.get("key") is None
+    cache.set("key", METRICS)
+    assert cache.get("key") == METRICS
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_disk_tier_survives_a_new_instance(tmp_path):
+    path = str(tmp_path / "results.sqlite3")
+    ResultCache(path=path).set("key", METRICS)
+
+    cache = ResultCache(path=path)
+    assert cache.get("key") == METRICS
+    assert cache.stats()["disk_hits"] == 1
+    # Promoted to memory: the next lookup does not touch the disk
+    assert cache.get("key") == METRICS
+    assert cache.stats()["disk_hits"] == 1
+
+
+def test_expired_entries_are_not_returned(tmp_path):
+    cache = ResultCache(ttl_seconds=-1.0, path=str(tmp_path / "results.sqlite3"))
+    cache.set("key", METRICS)
+    assert cache.get("key") is None
+
+
+def test_created_column_is_indexed(tmp_path):
+    path = str(tmp_path / "results.sqlite3")
+    ResultCache(path=path).set("key", METRICS)
+    with sqlite3.connect(path) as db:
+        indexes = [row[1] for row in db.execute("PRAGMA index_list(results)")]
+    assert "results_created" in indexes
+
+
+def test_expired_rows_are_purged_occasionally(tmp_path):
+    path = str(tmp_path / "results.sqlite3")
+    cache = ResultCache(ttl_seconds=-1.0, path=path, purge_interval_seconds=3600.0)
+    for i in range(5):
+        cache.set(f"key-{i}", METRICS)
+    # Only the first write purged; the rows written since are left for the next purge
+    assert count_rows(path) == 4
+
+    cache = ResultCache(ttl_seconds=-1.0, path=path, purge_interval_seconds=0.0)
+    cache.set("key-5", METRICS)
+    assert count_rows(path) == 0
+
+
+def test_async_access_matches_sync_access(tmp_path):
+    path = str(tmp_path / "results.sqlite3")
+
+    async def scenario():
+        await ResultCache(path=path).aset("key", METRICS)
+        cache = ResultCache(path=path)
+        return await cache.aget("key"), await cache.aget("other"), cache.stats()
+
+    found, missing, stats = asyncio.run(scenario())
+    assert found == METRICS
+    assert missing is None
+    assert stats["disk_hits"] == 1
+    assert stats["misses"] == 1
@@ -0,0 +1,74 @@
+"""Tests for the coalescing of identical concurrent computations."""
+
+import asyncio
+
+import pytest
+
+from mediaparty_trust_api.services.single_flight import SingleFlight
+
+
+def test_concurrent_calls_share_one_computation():
+    flight = SingleFlight()
+    runs = []
+
+    async def compute():
+        runs.append(1)
+        await asyncio.sleep(0.01)
+        return "result"
+
+    async def scenario():
+        return await asyncio.gather(*(flight.do("key", compute) for _ in range(5)))
+
+    assert asyncio.run(scenario()) == ["result"] * 5
+    assert len(runs) == 1
+    assert flight.stats()["coalesced"] == 4
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_finished_computation_is_not_reused():
+    flight = SingleFlight()
+    runs = []
+
+    async def compute():
+        runs.append(1)
+        return len(runs)
+
+    async def scenario():
+        return await flight.do("key", compute), await flight.do("key", compute)
+
+    assert asyncio.run(scenario()) == (1, 2)
+
+
+def test_errors_reach_every_waiter():
+    flight = SingleFlight()
+
+    async def compute():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def scenario():
+        return await asyncio.gather(
+            flight.do("key", compute), flight.do("key", compute), return_exceptions=True
+        )
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(result, ValueError) for result in results)
+
+
+def test_cancelled_waiter_leaves_the_computation_running():
+    flight = SingleFlight()
+
+    async def compute():
+        await asyncio.sleep(0.02)
+        return "result"
+
+    async def scenario():
+        first = asyncio.create_task(flight.do("key", compute))
+        second = asyncio.create_task(flight.do("key", compute))
+        await asyncio.sleep(0)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(scenario()) == "result"
@@ -0,0 +1,141 @@
+"""Tests for the cross-request Stanza batcher."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from conftest import assert_tables_equal, toy_annotate
+from mediaparty_trust_api.main import app
+from mediaparty_trust_api.services.executor import ExecutorBusyError
+from mediaparty_trust_api.services.stanza_batcher import StanzaBatcher
+
+
+def test_concurrent_submits_share_one_pipeline_call(annotate_texts):
+    release = threading.Event()
+    started = threading.Event()
+
+    def annotate(texts, *options):
+        # Hold the only slot with the first text until the others are queued
+        if not annotate_texts.calls:
+            started.set()
+            release.wait(5)
+        return annotate_texts(texts, *options)
+
+    batcher = StanzaBatcher(annotate, max_window_seconds=0.0, max_batches_in_flight=1)
+
+    async def main():
+        first = asyncio.ensure_future(batcher.submit_many(["primera nota"]))
+        await asyncio.to_thread(started.wait, 5)
+        texts = [f"nota número {i}" for i in range(20)]
+        tasks = [asyncio.ensure_future(batcher.submit_many([text])) for text in texts]
+        # Every task queues its text before its first await
+        await asyncio.sleep(0)
+        release.set()
+        return texts, await first, await asyncio.gather(*tasks)
+
+    try:
+        texts, first, results = asyncio.run(main())
+    finally:
+        batcher.shutdown()
+
+    assert annotate_texts.calls == [1, 20]
+    assert_tables_equal(first[0], toy_annotate("primera nota"))
+    for text, result in zip(texts, results):
+        assert_tables_equal(result[0], toy_annotate(text))
+
+
+def test_submit_many_returns_failures_in_place(annotate_texts):
+    def annotate(texts, *options):
+        if any("roto" in text for text in texts):
+            raise ValueError("bad text")
+        return annotate_texts(texts, *options)
+
+    batcher = StanzaBatcher(annotate, max_window_seconds=0.0)
+    try:
+        results = asyncio.run(batcher.submit_many(["texto bueno", "texto roto", "otro bueno"]))
+    finally:
+        batcher.shutdown()
+
+    assert_tables_equal(results[0], toy_annotate("texto bueno"))
+    assert isinstance(results[1], ValueError)
+    assert_tables_equal(results[2], toy_annotate("otro bueno"))
+
+
+def test_blocking_submit_from_threads(annotate_texts):
+    batcher = StanzaBatcher(annotate_texts, max_window_seconds=0.0)
+    try:
+        tables = [batcher.submit(f"texto {i}") for i in range(3)]
+    finally:
+        batcher.shutdown()
+
+    for i, table in enumerate(tables):
+        assert_tables_equal(table, toy_annotate(f"texto {i}"))
+    assert sum(annotate_texts.calls) == 3
+
+
+def test_submit_after_shutdown_fails(annotate_texts):
+    batcher = StanzaBatcher(annotate_texts)
+    batcher.shutdown()
+    with pytest.raises(RuntimeError):
+        batcher.submit("texto")
+
+
+def test_submissions_beyond_max_pending_are_rejected(annotate_texts):
+    release = threading.Event()
+
+    def annotate(texts, *options):
+        release.wait(5)
+        return annotate_texts(texts, *options)
+
+    batcher = StanzaBatcher(annotate, max_window_seconds=0.0, max_pending=3, retry_after_seconds=2)
+
+    async def main():
+        held = asyncio.ensure_future(batcher.submit_many(["uno", "dos"]))
+        await asyncio.sleep(0)
+        with pytest.raises(ExecutorBusyError) as rejected:
+            await batcher.submit_many(["tres", "cuatro"])
+        assert rejected.value.retry_after_seconds == 2
+        assert batcher.stats()["pending"] == 2
+        release.set()
+        await held
+        # Once drained, a submission larger than the cap is accepted on its own
+        return await batcher.submit_many(["a", "b", "c", "d"])
+
+    try:
+        results = asyncio.run(main())
+    finally:
+        release.set()
+        batcher.shutdown()
+
+    assert len(results) == 4
+    assert batcher.stats()["pending"] == 0
+    assert batcher.stats()["rejected"] == 1
+
+
+def test_full_batcher_queue_returns_503(toy_stanza, article):
+    release = threading.Event()
+
+    def annotate(texts, *options):
+        release.wait(5)
+        return [toy_annotate(text) for text in texts]
+
+    batcher = StanzaBatcher(annotate, max_window_seconds=0.0, max_pending=1, retry_after_seconds=3)
+    toy_stanza._batcher = batcher
+    holder = threading.Thread(target=batcher.submit, args=("párrafo en curso",))
+    holder.start()
+    while batcher.stats()["pending"] == 0:
+        time.sleep(0.001)
+    try:
+        response = TestClient(app).post(
+            "/api/v1/articles/analyze", params={"metrics": "cheap"}, json=article
+        )
+    finally:
+        release.set()
+        holder.join()
+        batcher.shutdown()
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "3"
@@ -0,0 +1,75 @@
+"""Tests for the NDJSON streaming analysis endpoint."""
+
+import asyncio
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from mediaparty_trust_api.api.v1.endpoints import NDJSON_MEDIA_TYPE
+from mediaparty_trust_api.main import app
+from mediaparty_trust_api.models import Metric
+from mediaparty_trust_api.services.cache import result_cache
+from mediaparty_trust_api.services.registry import METRIC_REGISTRY
+
+URL = "/api/v1/articles/analyze/stream"
+
+
+def stream(article):
+    response = TestClient(app).post(URL, json=article)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == NDJSON_MEDIA_TYPE
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+@pytest.fixture
+def slow_adjectives(monkeypatch):
+    """Replace the LLM-backed metric with one that answers after the others."""
+
+    async def slow_llm(table, metric_id):
+        await asyncio.sleep(0.05)
+        return Metric(
+            id=metric_id,
+            criteria_name="Qualitative adjectives",
+            explanation="From the LLM.",
+            flag=1,
+            score=1.0,
+        )
+
+    adjectives = METRIC_REGISTRY["qualitative_adjectives"]
+    monkeypatch.setitem(METRIC_REGISTRY, adjectives.name, adjectives._replace(func=slow_llm))
+
+
+def test_metrics_stream_in_completion_order_then_come_from_the_cache(
+    toy_stanza, slow_adjectives, article
+):
+    lines = stream(article)
+    # The local metrics first, then the LLM one
+    assert [line["id"] for line in lines] == [1, 2, 3, 0]
+    assert lines[-1]["explanation"] == "From the LLM."
+    assert not any(Metric(**line).degraded for line in lines)
+
+    # The full result is cached in id order, and replayed as is
+    cached = stream(article)
+    assert [line["id"] for line in cached] == [0, 1, 2, 3]
+    assert sorted(lines, key=lambda line: line["id"]) == cached
+    assert result_cache.stats()["size"] == 1
+
+
+def test_failure_after_the_response_started_is_reported_in_band(
+    toy_stanza, monkeypatch, article
+):
+    async def failing_llm(table, metric_id):
+        raise ConnectionError("upstream down")
+
+    adjectives = METRIC_REGISTRY["qualitative_adjectives"]
+    monkeypatch.setitem(
+        METRIC_REGISTRY,
+        adjectives.name,
+        adjectives._replace(func=failing_llm, fallback=None),
+    )
+
+    lines = stream(article)
+    assert [line.get("id") for line in lines] == [1, 2, 3, None]
+    assert lines[-1] == {"error": "Error processing article: upstream down"}
+    assert result_cache.stats()["size"] == 0
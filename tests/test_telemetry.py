@@ -0,0 +1,93 @@
+"""Tests for timing spans, the Server-Timing header and the Prometheus export."""
+
+import re
+
+from fastapi.testclient import TestClient
+
+from mediaparty_trust_api.main import app
+from mediaparty_trust_api.services.telemetry import Histogram, server_timing
+
+# Every series /metrics exports, by name and type: dashboards and alerts depend on them
+EXPORTED_METRICS = {
+    "mediaparty_stage_duration_seconds": "histogram",
+    "mediaparty_text_length_chars": "histogram",
+    "mediaparty_stanza_batch_texts": "histogram",
+    "mediaparty_stanza_batch_tokens": "histogram",
+    "mediaparty_executor_queue_depth": "gauge",
+    "mediaparty_executor_running": "gauge",
+    "mediaparty_executor_rejected_total": "counter",
+    "mediaparty_stanza_batch_pending": "gauge",
+    "mediaparty_stanza_batch_rejected_total": "counter",
+    "mediaparty_admission_budget_bytes": "gauge",
+    "mediaparty_admission_in_use_bytes": "gauge",
+    "mediaparty_admission_waiting": "gauge",
+    "mediaparty_admission_rejected_total": "counter",
+    "mediaparty_admission_too_large_total": "counter",
+    "mediaparty_cache_hits_total": "counter",
+    "mediaparty_cache_misses_total": "counter",
+    "mediaparty_cache_size": "gauge",
+    "mediaparty_coalesced_requests_total": "counter",
+    "mediaparty_annotation_store_hits_total": "counter",
+    "mediaparty_annotation_store_misses_total": "counter",
+    "mediaparty_paragraph_cache_hits_total": "counter",
+    "mediaparty_paragraph_cache_misses_total": "counter",
+    "mediaparty_openrouter_calls_total": "counter",
+    "mediaparty_openrouter_failures_total": "counter",
+    "mediaparty_llm_batch_requests_total": "counter",
+    "mediaparty_llm_batch_calls_total": "counter",
+    "mediaparty_llm_batch_items_total": "counter",
+    "mediaparty_openrouter_circuit_open": "gauge",
+    "mediaparty_adjective_labels": "gauge",
+}
+
+
+def test_server_timing_sums_spans_by_name_in_milliseconds():
+    spans = [
+        ("stanza.tokenize", 0.010),
+        ("metric.get_word_count", 0.0002),
+        ("stanza.tokenize", 0.0055),
+    ]
+    assert server_timing(spans) == "stanza.tokenize;dur=15.5, metric.get_word_count;dur=0.2"
+    assert server_timing([]) == ""
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram("test_seconds", "Test durations.", (0.1, 1.0), label="stage")
+    for value in (0.05, 0.5, 0.5, 3.0):
+        histogram.observe(value, "pos")
+    assert histogram.render() == [
+        "# HELP test_seconds Test durations.",
+        "# TYPE test_seconds histogram",
+        'test_seconds_bucket{stage="pos",le="0.1"} 1',
+        'test_seconds_bucket{stage="pos",le="1.0"} 3',
+        'test_seconds_bucket{stage="pos",le="+Inf"} 4',
+        'test_seconds_sum{stage="pos"} 4.05',
+        'test_seconds_count{stage="pos"} 4',
+    ]
+
+
+def test_analysis_response_carries_its_stage_timings(toy_stanza, article):
+    response = TestClient(app).post("/api/v1/articles/analyze?metrics=cheap", json=article)
+    assert response.status_code == 200
+
+    timings = dict(entry.split(";dur=") for entry in response.headers["Server-Timing"].split(", "))
+    assert {"executor.wait", "metric.get_word_count", "metric.get_sentence_complexity"} <= set(
+        timings
+    )
+    assert all(float(duration) >= 0 for duration in timings.values())
+
+
+def test_prometheus_export_names(toy_stanza, article):
+    client = TestClient(app)
+    client.post("/api/v1/articles/analyze?metrics=cheap", json=article)
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+
+    types = dict(re.findall(r"^# TYPE (\S+) (\S+)$", response.text, re.MULTILINE))
+    assert types == EXPORTED_METRICS
+    assert re.search(
+        r'^mediaparty_stage_duration_seconds_count\{stage="metric.get_word_count"\} [1-9]',
+        response.text,
+        re.MULTILINE,
+    )
@@ -0,0 +1,251 @@
+"""Equivalence of the table-based metrics with the original per-word Document metrics."""
+
+import asyncio
+
+import pytest
+from stanza import Document
+
+from mediaparty_trust_api.models import Metric
+from mediaparty_trust_api.services.metrics import (
+    AdjectiveMode,
+    adjective_mode_scope,
+    get_adjective_count,
+    get_sentence_complexity,
+    get_verb_tense_analysis,
+    get_word_count,
+)
+from mediaparty_trust_api.services.token_table import TokenTable
+
+PAST = "Mood=Ind|Number=Sing|Person=3|Tense=Past|VerbForm=Fin"
+PRESENT = "Mood=Ind|Number=Sing|Person=3|Tense=Pres|VerbForm=Fin"
+PAST_PLURAL = "Mood=Ind|Number=Plur|Person=3|Tense=Past|VerbForm=Fin"
+
+
+def word(text, upos, feats=None, lemma=None):
+    return {"text": text, "lemma": lemma or text.lower(), "upos": upos, "feats": feats}
+
+
+# Sentences of a fixed sample: a multiword token ("del"), past and present
+# verbs, a verb without features, a past auxiliary (not a VERB) and adjectives
+SENTENCES = [
+    [
+        word("El", "DET"),
+        word("ministro", "NOUN"),
+        word("anunció", "VERB", PAST, "anunciar"),
+        word("un", "DET"),
+        word("plan", "NOUN"),
+        word("ambicioso", "ADJ", "Gender=Masc|Number=Sing"),
+        {"text": "del", "mwt": ["de", "el"]},
+        word("gobierno", "NOUN"),
+        word(".", "PUNCT"),
+    ],
+    [
+        word("Los", "DET"),
+        word("analistas", "NOUN"),
+        word("dicen", "VERB", PRESENT, "decir"),
+        word("que", "SCONJ"),
+        word("fue", "AUX", PAST, "ser"),
+        word("escandaloso", "ADJ"),
+        word("y", "CCONJ"),
+        word("costoso", "ADJ"),
+        word(".", "PUNCT"),
+    ],
+    [
+        word("Habrá", "VERB", None, "haber"),
+        word("elecciones", "NOUN"),
+        word("nuevas", "ADJ", "Gender=Fem|Number=Plur", "nuevo"),
+        word("y", "CCONJ"),
+        word("votaron", "VERB", PAST_PLURAL, "votar"),
+        word("muchos", "PRON"),
+        word(".", "PUNCT"),
+    ],
+]
+
+
+def build_doc(sentences):
+    """Build a Stanza Document, expanding multiword tokens into their words."""
+    annotated = []
+    for sentence in sentences:
+        entries = []
+        for entry in sentence:
+            start = sum(1 for item in entries if isinstance(item["id"], int)) + 1
+            if "mwt" in entry:
+                parts = entry["mwt"]
+                entries.append({"id": (start, start + len(parts) - 1), "text": entry["text"]})
+                entries.extend(
+                    {"id": start + i, **word(part, "ADP" if i == 0 else "DET")}
+                    for i, part in enumerate(parts)
+                )
+            else:
+                entries.append({"id": start, **entry})
+        annotated.append(entries)
+    return Document(annotated, text=" ".join(e["text"] for s in sentences for e in s))
+
+
+def sample_sentences(copies):
+    """The fixed sample, its sentences repeated to reach the other thresholds."""
+    return [sentence for _ in range(copies) for sentence in SENTENCES]
+
+
+# Reference implementations: the original metrics, walking every word of the Document
+
+
+def reference_word_count(doc, metric_id):
+    total_words = sum(len(sentence.words) for sentence in doc.sentences)
+    if total_words >= 500:
+        flag, score = 1, 0.9
+        explanation = f"The article has {total_words} words, indicating comprehensive coverage."
+    elif total_words >= 300:
+        flag, score = 0, 0.6
+        explanation = f"The article has {total_words} words, which is adequate."
+    else:
+        flag, score = -1, 0.3
+        explanation = f"The article has only {total_words} words, which may be too brief."
+    return Metric(
+        id=metric_id, criteria_name="Word Count", explanation=explanation, flag=flag, score=score
+    )
+
+
+def reference_sentence_complexity(doc, metric_id):
+    sentence_count = len(doc.sentences)
+    if sentence_count == 0:
+        return Metric(
+            id=metric_id,
+            criteria_name="Sentence Complexity",
+            explanation="No sentences found in the text.",
+            flag=-1,
+            score=0.0,
+        )
+    average = sum(len(sentence.words) for sentence in doc.sentences) / sentence_count
+    if 15 <= average <= 25:
+        flag, score = 1, 0.9
+        explanation = f"Average sentence length ({average:.1f} words) is optimal for readability."
+    elif 10 <= average < 15 or 25 < average <= 35:
+        flag, score = 0, 0.6
+        explanation = f"Average sentence length ({average:.1f} words) is acceptable."
+    else:
+        flag, score = -1, 0.3
+        if average < 10:
+            explanation = (
+                f"Sentences are too short ({average:.1f} words on average), "
+                "suggesting oversimplification."
+            )
+        else:
+            explanation = (
+                f"Sentences are too long ({average:.1f} words on average), "
+                "which may affect readability."
+            )
+    return Metric(
+        id=metric_id,
+        criteria_name="Sentence Complexity",
+        explanation=explanation,
+        flag=flag,
+        score=score,
+    )
+
+
+def reference_verb_tense(doc, metric_id):
+    verb_count = past_tense_count = 0
+    for sentence in doc.sentences:
+        for doc_word in sentence.words:
+            if doc_word.upos == "VERB":
+                verb_count += 1
+                if doc_word.feats and "Tense=Past" in doc_word.feats:
+                    past_tense_count += 1
+    if verb_count == 0:
+        return Metric(
+            id=metric_id,
+            criteria_name="Verb Tense",
+            explanation="No verbs found in the text.",
+            flag=-1,
+            score=0.0,
+        )
+    ratio = past_tense_count / verb_count
+    if 0.4 <= ratio <= 0.7:
+        flag, score = 1, 0.85
+        explanation = f"Past tense usage ({ratio:.1%}) suggests appropriate news reporting style."
+    elif 0.2 <= ratio < 0.4 or 0.7 < ratio <= 0.85:
+        flag, score = 0, 0.6
+        explanation = f"Past tense usage ({ratio:.1%}) is acceptable but could be more balanced."
+    else:
+        flag, score = -1, 0.3
+        explanation = f"Past tense usage ({ratio:.1%}) is unusual for news reporting."
+    return Metric(
+        id=metric_id, criteria_name="Verb Tense", explanation=explanation, flag=flag, score=score
+    )
+
+
+def reference_adjective_count(doc, metric_id):
+    """The original metric without an API key: every adjective counts as qualitative."""
+    words = [doc_word for sentence in doc.sentences for doc_word in sentence.words]
+    adjectives = [doc_word.text for doc_word in words if doc_word.upos == "ADJ"]
+    if not adjectives:
+        return Metric(
+            id=metric_id,
+            criteria_name="Qualitative Adjectives",
+            explanation="No adjectives found in the text.",
+            flag=1,
+            score=1.0,
+        )
+    ratio = len(adjectives) / len(words)
+    if ratio <= 0.05:
+        flag, score = 1, 0.9
+        explanation = (
+            f"The qualitative adjective ratio ({ratio:.1%}) is excellent, "
+            "indicating objective writing."
+        )
+    elif ratio <= 0.10:
+        flag, score = 0, 0.6
+        explanation = f"The qualitative adjective ratio ({ratio:.1%}) is moderate."
+    else:
+        flag, score = -1, 0.3
+        explanation = (
+            f"The qualitative adjective ratio ({ratio:.1%}) is too high, "
+            "suggesting opinionated or sensationalist content."
+        )
+    return Metric(
+        id=metric_id,
+        criteria_name="Qualitative Adjectives",
+        explanation=explanation,
+        flag=flag,
+        score=score,
+    )
+
+
+def table_metrics(table):
+    with adjective_mode_scope(AdjectiveMode.RAW):
+        adjectives = asyncio.run(get_adjective_count(table, metric_id=0))
+    return [
+        adjectives,
+        get_word_count(table, metric_id=1),
+        get_sentence_complexity(table, metric_id=2),
+        get_verb_tense_analysis(table, metric_id=3),
+    ]
+
+
+def reference_metrics(doc):
+    return [
+        reference_adjective_count(doc, 0),
+        reference_word_count(doc, 1),
+        reference_sentence_complexity(doc, 2),
+        reference_verb_tense(doc, 3),
+    ]
+
+
+@pytest.mark.parametrize("copies", [1, 15, 25])
+def test_table_metrics_equal_document_metrics(copies):
+    doc = build_doc(sample_sentences(copies))
+    assert doc.num_words == 26 * copies
+    assert table_metrics(TokenTable.from_doc(doc)) == reference_metrics(doc)
+
+
+def test_concatenated_tables_give_the_metrics_of_the_whole_document():
+    sentences = sample_sentences(15)
+    parts = [build_doc(sentences[start : start + 7]) for start in range(0, len(sentences), 7)]
+    table = TokenTable.concat([TokenTable.from_doc(part) for part in parts])
+    assert table_metrics(table) == reference_metrics(build_doc(sentences))
+
+
+def test_empty_document():
+    doc = Document([], text="")
+    assert table_metrics(TokenTable.from_doc(doc)) == reference_metrics(doc)